@@ -0,0 +1,102 @@
+"""
+Замер времени запуска: импорт модуля бота в чистом интерпретаторе.
+
+Каждый замер выполняется в отдельном процессе, чтобы модули не брались
+из кэша уже запущенного интерпретатора. Кроме времени проверяется, что
+при запуске не загружаются тяжёлые зависимости, нужные только при первом
+запросе к модели.
+
+Запуск (с --budget завершается с ошибкой, если импорт дольше бюджета):
+    python -m benchmarks.import_time --runs 5 --budget 0.6
+"""
+import argparse
+import json
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Модуль, с которого начинается запуск бота
+ENTRY_MODULE = "src.main"
+
+# Пакеты, которые не должны загружаться при запуске
+HEAVY_MODULES = ("langchain", "langchain_core", "langchain_community", "gigachat")
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+loaded = sorted({{name.split(".")[0] for name in sys.modules}})
+print(json.dumps({{"seconds": elapsed, "modules": loaded}}))
+"""
+
+
+@dataclass
+class ImportTimeReport:
+    """Результаты замеров."""
+    module: str
+    timings: List[float]
+    heavy_loaded: List[str]
+
+    @property
+    def best(self) -> float:
+        """Лучшее время импорта, в секундах (меньше всего зависит от шума)."""
+        return min(self.timings)
+
+    def format(self) -> str:
+        """Отчёт в текстовом виде."""
+        heavy = ", ".join(self.heavy_loaded) or "нет"
+        return (
+            f"Импорт {self.module}: лучший {self.best * 1000:.0f} мс, "
+            f"худший {max(self.timings) * 1000:.0f} мс "
+            f"({len(self.timings)} замеров)\n"
+            f"Тяжёлые зависимости при запуске: {heavy}"
+        )
+
+
+def measure_import_time(
+    module: str = ENTRY_MODULE,
+    runs: int = 3,
+    heavy_modules: Sequence[str] = HEAVY_MODULES,
+) -> ImportTimeReport:
+    """Замер времени импорта модуля в отдельных процессах."""
+    timings: List[float] = []
+    loaded: List[str] = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module)],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        data = json.loads(result.stdout.strip().splitlines()[-1])
+        timings.append(data["seconds"])
+        loaded = data["modules"]
+    return ImportTimeReport(
+        module=module,
+        timings=timings,
+        heavy_loaded=[name for name in heavy_modules if name in loaded],
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Запуск замера из командной строки."""
+    parser = argparse.ArgumentParser(description="Замер времени запуска бота")
+    parser.add_argument("--module", default=ENTRY_MODULE)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=None,
+                        help="допустимое время импорта, с")
+    args = parser.parse_args(argv)
+    report = measure_import_time(args.module, args.runs)
+    print(report.format())
+    if args.budget is not None and report.best >= args.budget:
+        sys.exit(f"Импорт дольше бюджета {args.budget} с")
+
+
+if __name__ == "__main__":
+    main()
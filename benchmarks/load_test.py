@@ -0,0 +1,436 @@
+"""
+Нагрузочный тест обработчика сообщений.
+
+Прогоняет множество пользователей через полный сценарий заказа
+(START → SPECS_SELECTION → GET_NAME → GET_PHONE → CONFIRMATION) в настоящем
+MessageHandler. Первое сообщение - вопрос о модели: на него отвечает
+GigaChat (или кэш ответов), остальные этапы обходятся без модели.
+Внешние системы заменены локальными имитациями с настраиваемой задержкой:
+- Telegram Bot API - транспорт запросов python-telegram-bot;
+- GigaChat - клиент библиотеки gigachat под общим GigaChatClient;
+- API_ENDPOINT - транспорт httpx.
+
+Запуск:
+    python -m benchmarks.load_test --users 2000 --llm-latency 0.5
+"""
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, cast
+
+import httpx
+from telegram import Bot, Update
+from telegram.request import BaseRequest, RequestData
+
+from src.bot.message_handler import MessageHandler
+from src.core import config
+from src.core.config import Settings
+from src.core.metrics import ERRORS
+from src.services.chat_service import ChatService
+from src.services.gigachat_client import GigaChatClient
+
+# Сообщения пользователя на каждом этапе сценария (после /start)
+SCENARIO = (
+    "Хочу айфон {model}, какая у него камера?",
+    "256 гб, черный",
+    "Иван",
+    "8916{number:07d}",
+)
+MODELS = ("13", "14", "15", "15 pro", "16")
+
+# Контекст python-telegram-bot: обработчик сообщений его не использует
+_NO_CONTEXT = cast(Any, None)
+
+
+@dataclass
+class LoadTestConfig:
+    """Параметры нагрузочного теста."""
+    users: int = 1000
+    concurrency: int = 32
+    telegram_latency: float = 0.05
+    llm_latency: float = 0.5
+    api_latency: float = 0.1
+    think_time: float = 0.0
+    streaming: bool = False
+    response_cache: bool = True
+    trace_memory: bool = False
+    # Сколько секунд после прогона ждать отправки заказов из очереди
+    drain_timeout: float = 30.0
+    seed: int = 1
+
+
+@dataclass
+class LoadTestReport:
+    """Результаты нагрузочного теста."""
+    users: int
+    messages: int
+    errors: int
+    duration: float
+    latencies: List[float] = field(repr=False)
+    llm_calls: int = 0
+    telegram_calls: int = 0
+    orders_delivered: int = 0
+    # Заказы, оставшиеся в очереди после drain_timeout
+    orders_pending: int = 0
+    memory_per_user: Optional[float] = None
+
+    @property
+    def messages_per_second(self) -> float:
+        """Пропускная способность обработчика."""
+        return self.messages / self.duration if self.duration else 0.0
+
+    def percentile(self, percent: float) -> float:
+        """Перцентиль задержки обработки сообщения, в секундах."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * percent / 100))
+        return ordered[index]
+
+    def format(self) -> str:
+        """Текстовый отчёт."""
+        lines = [
+            f"Пользователей: {self.users}, сообщений: {self.messages}, "
+            f"ошибок: {self.errors}",
+            f"Время: {self.duration:.2f} с, {self.messages_per_second:.1f} сообщ./с",
+            "Задержка обработки: "
+            f"p50={self.percentile(50) * 1000:.1f} мс, "
+            f"p95={self.percentile(95) * 1000:.1f} мс, "
+            f"p99={self.percentile(99) * 1000:.1f} мс",
+            f"Запросов к GigaChat: {self.llm_calls}, "
+            f"к Telegram: {self.telegram_calls}, "
+            f"доставлено заказов: {self.orders_delivered}",
+        ]
+        if self.orders_pending:
+            lines.append(f"Не доставлено заказов: {self.orders_pending}")
+        if self.memory_per_user is not None:
+            lines.append(
+                "Память на активного пользователя: "
+                f"{self.memory_per_user / 1024:.2f} КБ"
+            )
+        return "\n".join(lines)
+
+
+def _jitter(latency: float) -> float:
+    """Задержка со случайным разбросом ±50%."""
+    return latency * random.uniform(0.5, 1.5) if latency > 0 else 0.0
+
+
+class FakeTelegramRequest(BaseRequest):
+    """Имитация Telegram Bot API на уровне транспорта python-telegram-bot."""
+
+    def __init__(self, latency: float) -> None:
+        """Инициализация имитации."""
+        self._latency = latency
+        self._message_id = 0
+        self.calls = 0
+
+    @property
+    def read_timeout(self) -> Optional[float]:
+        """Таймаут чтения по умолчанию."""
+        return None
+
+    async def initialize(self) -> None:
+        """Инициализация (не требуется)."""
+
+    async def shutdown(self) -> None:
+        """Освобождение ресурсов (не требуется)."""
+
+    async def do_request(
+        self,
+        url: str,
+        method: str,
+        request_data: Optional[RequestData] = None,
+        read_timeout: Any = None,
+        write_timeout: Any = None,
+        connect_timeout: Any = None,
+        pool_timeout: Any = None,
+    ) -> Tuple[int, bytes]:
+        """Ответ на вызов метода Bot API."""
+        self.calls += 1
+        await asyncio.sleep(_jitter(self._latency))
+        endpoint = url.rsplit("/", 1)[-1]
+        params = request_data.parameters if request_data else {}
+        if endpoint == "getMe":
+            result: Any = {
+                "id": 1,
+                "is_bot": True,
+                "first_name": "Бот",
+                "username": "load_test_bot",
+            }
+        elif endpoint in ("sendMessage", "editMessageText"):
+            self._message_id += 1
+            result = {
+                "message_id": params.get("message_id", self._message_id),
+                "date": int(time.time()),
+                "chat": {"id": params.get("chat_id", 0), "type": "private"},
+                "text": params.get("text", ""),
+            }
+        else:
+            result = True
+        return 200, json.dumps({"ok": True, "result": result}).encode()
+
+
+class FakeGigaChat:
+    """Имитация клиента библиотеки gigachat с задержкой ответа."""
+
+    def __init__(self, latency: float) -> None:
+        """Инициализация имитации."""
+        self._latency = latency
+        self.calls = 0
+
+    async def achat(self, payload: Dict[str, Any]) -> Any:
+        """Ответ модели."""
+        self.calls += 1
+        await asyncio.sleep(_jitter(self._latency))
+        return _completion(self._reply(payload), chunk=False)
+
+    async def astream(self, payload: Dict[str, Any]) -> AsyncIterator[Any]:
+        """Потоковый ответ модели из нескольких фрагментов."""
+        self.calls += 1
+        words = self._reply(payload).split(" ")
+        for word in words:
+            await asyncio.sleep(_jitter(self._latency) / len(words))
+            yield _completion(word + " ", chunk=True)
+
+    async def aget_token(self) -> Any:
+        """Токен доступа на час вперёд."""
+        return SimpleNamespace(expires_at=int((time.time() + 3600) * 1000))
+
+    def _reset_token(self) -> None:
+        """Сброс токена (не требуется)."""
+
+    async def aclose(self) -> None:
+        """Закрытие соединений (не требуется)."""
+
+    @staticmethod
+    def _reply(payload: Dict[str, Any]) -> str:
+        """Текст ответа на последнее сообщение пользователя."""
+        question = payload["messages"][-1]["content"]
+        return f"Отличный выбор: {question}! Какой объём памяти и цвет вам нужны?"
+
+
+def _completion(text: str, chunk: bool) -> SimpleNamespace:
+    """Ответ GigaChat в форме моделей библиотеки gigachat."""
+    content = SimpleNamespace(content=text)
+    if chunk:
+        return SimpleNamespace(choices=[SimpleNamespace(delta=content)])
+    return SimpleNamespace(choices=[SimpleNamespace(message=content)])
+
+
+class FakeOrderApi:
+    """Имитация API_ENDPOINT для транспорта httpx."""
+
+    def __init__(self, latency: float) -> None:
+        """Инициализация имитации."""
+        self._latency = latency
+        self.orders = 0
+        self.transport = httpx.MockTransport(self._handle)
+
+    async def _handle(self, request: httpx.Request) -> httpx.Response:
+        """Приём заказа (одиночного или пакета)."""
+        await asyncio.sleep(_jitter(self._latency))
+        if request.method == "POST":
+            self.orders += len(json.loads(request.content)["orders"])
+        else:
+            self.orders += 1
+        return httpx.Response(200, json={"status": "ok"})
+
+
+def _make_settings(load: LoadTestConfig, workdir: Path) -> Settings:
+    """Настройки бота для теста; файлы баз создаются во временном каталоге."""
+    return Settings(
+        TELEGRAM_TOKEN="1:load-test",
+        GIGACHAT_TOKEN="load-test",
+        API_ENDPOINT="https://orders.load-test/api",
+        ORDER_OUTBOX_PATH=str(workdir / "outbox.db"),
+        STATE_DB_PATH=str(workdir / "states.db"),
+        STREAMING_ENABLED=load.streaming,
+        STREAM_EDIT_INTERVAL_MS=50,
+        RESPONSE_CACHE_ENABLED=load.response_cache,
+        # Тест измеряет обработку, а не отбрасывание сообщений ограничителем
+        RATE_LIMIT_ENABLED=False,
+        MAX_CONCURRENT_UPDATES=load.concurrency,
+        GIGACHAT_MAX_CONCURRENCY=max(8, load.concurrency),
+    )
+
+
+def _make_update(bot: Bot, user_id: int, update_id: int, text: str) -> Update:
+    """Обновление Telegram с сообщением пользователя."""
+    data = {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "Тест"},
+            "text": text,
+        },
+    }
+    update = Update.de_json(data, bot)
+    assert update is not None
+    return update
+
+
+async def run_load_test(load: LoadTestConfig) -> LoadTestReport:
+    """Прогон нагрузочного теста."""
+    random.seed(load.seed)
+    telegram = FakeTelegramRequest(load.telegram_latency)
+    giga = FakeGigaChat(load.llm_latency)
+    order_api = FakeOrderApi(load.api_latency)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        settings = _make_settings(load, Path(workdir))
+        previous = config._settings
+        config._store_settings(settings)
+        try:
+            bot = Bot(
+                settings.TELEGRAM_TOKEN, request=telegram, get_updates_request=telegram
+            )
+            await bot.initialize()
+            chat_service = ChatService(client=GigaChatClient(
+                credentials=settings.GIGACHAT_TOKEN,
+                max_concurrency=settings.GIGACHAT_MAX_CONCURRENCY,
+                # Имитация повторяет нужную часть интерфейса клиента gigachat
+                client=cast(Any, giga),
+            ))
+            handler = MessageHandler(chat_service)
+            # Заказы уходят в имитацию API вместо сети
+            order_service = handler._order_service
+            if order_service._client is not None:
+                await order_service._client.aclose()
+            order_service._client = httpx.AsyncClient(transport=order_api.transport)
+
+            await handler.initialize()
+
+            report = await _drive_users(load, bot, handler)
+            # Дожидаемся, пока фоновая задача отправит заказы из очереди;
+            # недоставленные к сроку попадают в отчёт
+            outbox = order_service._outbox
+            deadline = time.monotonic() + load.drain_timeout
+            pending = await asyncio.to_thread(outbox.pending_count)
+            while pending and time.monotonic() < deadline:
+                await asyncio.sleep(0.1)
+                pending = await asyncio.to_thread(outbox.pending_count)
+            report.orders_pending = pending
+            await handler.close()
+        finally:
+            config._settings = previous
+
+    report.llm_calls = giga.calls
+    report.telegram_calls = telegram.calls
+    report.orders_delivered = order_api.orders
+    return report
+
+
+async def _drive_users(
+    load: LoadTestConfig, bot: Bot, handler: MessageHandler
+) -> LoadTestReport:
+    """Параллельный прогон сценария для всех пользователей."""
+    # Как и PerUserUpdateProcessor, ограничиваем число обновлений в обработке
+    slots = asyncio.Semaphore(load.concurrency)
+    latencies: List[float] = []
+    # MessageHandler перехватывает ошибки обработки и отвечает текстом
+    # об ошибке, поэтому они считаются по метрике ERRORS
+    errors_before = ERRORS.value(source="handler")
+    update_ids = iter(range(1, 10 * load.users * (len(SCENARIO) + 1)))
+
+    async def process(user_id: int, text: str) -> None:
+        update = _make_update(bot, user_id, next(update_ids), text)
+        async with slots:
+            started = time.perf_counter()
+            if text == "/start":
+                await handler.start(update, _NO_CONTEXT)
+            else:
+                await handler.handle_message(update, _NO_CONTEXT)
+            latencies.append(time.perf_counter() - started)
+
+    async def user_flow(user_id: int) -> None:
+        await process(user_id, "/start")
+        for template in SCENARIO:
+            if load.think_time:
+                await asyncio.sleep(_jitter(load.think_time))
+            text = template.format(model=MODELS[user_id % len(MODELS)], number=user_id)
+            await process(user_id, text)
+
+    baseline = 0
+    if load.trace_memory:
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user_flow(user_id) for user_id in range(1, load.users + 1)))
+    duration = time.perf_counter() - started
+
+    memory_per_user: Optional[float] = None
+    if load.trace_memory:
+        # Состояния и истории всех пользователей ещё в памяти (до истечения TTL)
+        memory_per_user = (tracemalloc.get_traced_memory()[0] - baseline) / load.users
+        tracemalloc.stop()
+
+    return LoadTestReport(
+        users=load.users,
+        messages=len(latencies),
+        errors=int(ERRORS.value(source="handler") - errors_before),
+        duration=duration,
+        latencies=latencies,
+        memory_per_user=memory_per_user,
+    )
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> LoadTestConfig:
+    """Разбор аргументов командной строки."""
+    defaults = LoadTestConfig()
+    parser = argparse.ArgumentParser(
+        description="Нагрузочный тест обработчика сообщений"
+    )
+    parser.add_argument("--users", type=int, default=defaults.users)
+    parser.add_argument("--concurrency", type=int, default=defaults.concurrency,
+                        help="одновременно обрабатываемых обновлений")
+    parser.add_argument("--telegram-latency", type=float,
+                        default=defaults.telegram_latency, help="задержка Bot API, с")
+    parser.add_argument("--llm-latency", type=float, default=defaults.llm_latency,
+                        help="задержка ответа GigaChat, с")
+    parser.add_argument("--api-latency", type=float, default=defaults.api_latency,
+                        help="задержка API_ENDPOINT, с")
+    parser.add_argument("--think-time", type=float, default=defaults.think_time,
+                        help="пауза пользователя между сообщениями, с")
+    parser.add_argument("--streaming", action="store_true", help="потоковые ответы")
+    parser.add_argument("--no-cache", action="store_true", help="без кэша ответов")
+    parser.add_argument("--memory", action="store_true",
+                        help="замер памяти через tracemalloc (замедляет прогон)")
+    parser.add_argument("--drain-timeout", type=float, default=defaults.drain_timeout,
+                        help="ожидание отправки заказов после прогона, с")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    args = parser.parse_args(argv)
+    return replace(
+        defaults,
+        users=args.users,
+        concurrency=args.concurrency,
+        telegram_latency=args.telegram_latency,
+        llm_latency=args.llm_latency,
+        api_latency=args.api_latency,
+        think_time=args.think_time,
+        streaming=args.streaming,
+        response_cache=not args.no_cache,
+        trace_memory=args.memory,
+        drain_timeout=args.drain_timeout,
+        seed=args.seed,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Запуск нагрузочного теста из командной строки."""
+    report = asyncio.run(run_load_test(_parse_args(argv)))
+    print(report.format())
+
+
+if __name__ == "__main__":
+    main()
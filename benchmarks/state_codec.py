@@ -0,0 +1,105 @@
+"""
+Замер памяти на состояние диалога и скорости его кодирования.
+
+Сравнивает двоичный формат DialogState.to_bytes() с прежним JSON
+(to_dict + json.dumps) по размеру и времени кодирования и разбора,
+а также замеряет память, занимаемую состояниями в процессе.
+
+Запуск:
+    python -m benchmarks.state_codec --states 100000
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, List, Optional, TypeVar
+
+from src.models.dialog_state import DialogState, DialogStep, OrderData
+
+T = TypeVar("T")
+
+
+@dataclass
+class CodecReport:
+    """Результаты замеров."""
+    states: int
+    memory_per_state: float
+    binary_size: float
+    json_size: float
+    encode_us: float
+    decode_us: float
+    json_encode_us: float
+    json_decode_us: float
+
+    def format(self) -> str:
+        """Отчёт в текстовом виде."""
+        return (
+            f"Состояний: {self.states}\n"
+            f"Память на состояние: {self.memory_per_state:.0f} байт\n"
+            f"Размер: двоичный {self.binary_size:.0f} байт, "
+            f"JSON {self.json_size:.0f} байт\n"
+            f"Кодирование: {self.encode_us:.2f} мкс "
+            f"(JSON {self.json_encode_us:.2f} мкс)\n"
+            f"Разбор: {self.decode_us:.2f} мкс (JSON {self.json_decode_us:.2f} мкс)"
+        )
+
+
+def make_states(count: int) -> List[DialogState]:
+    """Состояния на разных этапах сценария заказа."""
+    states = []
+    for i in range(count):
+        order = OrderData(phone_model=f"iPhone {13 + i % 3} Pro")
+        step = DialogStep.SPECS_SELECTION
+        if i % 2:
+            order.specifications = "256 гб, черный"
+            order.client_name = "Иван"
+            step = DialogStep.GET_PHONE
+        states.append(DialogState(current_step=step, order_data=order))
+    return states
+
+
+def _per_item_us(function: Callable[[T], object], items: List[T]) -> float:
+    """Среднее время вызова функции на одном элементе, в микросекундах."""
+    started = time.perf_counter()
+    for item in items:
+        function(item)
+    return (time.perf_counter() - started) / len(items) * 1e6
+
+
+def run_benchmark(states: int = 100000) -> CodecReport:
+    """Замер памяти и скорости кодирования на states состояниях."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sample = make_states(states)
+    memory = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    encoded = [state.to_bytes() for state in sample]
+    as_json = [json.dumps(state.to_dict(), ensure_ascii=False) for state in sample]
+    return CodecReport(
+        states=states,
+        memory_per_state=memory / states,
+        binary_size=sum(map(len, encoded)) / states,
+        json_size=sum(len(text.encode("utf-8")) for text in as_json) / states,
+        encode_us=_per_item_us(DialogState.to_bytes, sample),
+        decode_us=_per_item_us(DialogState.from_bytes, encoded),
+        json_encode_us=_per_item_us(
+            lambda state: json.dumps(state.to_dict(), ensure_ascii=False), sample
+        ),
+        json_decode_us=_per_item_us(
+            lambda text: DialogState.from_dict(json.loads(text)), as_json
+        ),
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Запуск замера из командной строки."""
+    parser = argparse.ArgumentParser(description="Замер кодирования состояний диалога")
+    parser.add_argument("--states", type=int, default=100000)
+    args = parser.parse_args(argv)
+    print(run_benchmark(args.states).format())
+
+
+if __name__ == "__main__":
+    main()
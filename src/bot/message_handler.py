@@ -1,68 +1,149 @@
 """Обработчик сообщений телеграм бота."""
 import logging
-import sys
-from datetime import datetime
-from telegram import Update
+import time
+from typing import AsyncIterator, Optional
+from telegram import Message, Update
+from telegram.constants import MessageLimit
+from telegram.error import BadRequest
 from telegram.ext import ContextTypes
+from src.core.config import Settings, get_settings
+from src.core.logging_config import mask_name, mask_phone
+from src.core.metrics import (
+    ACTIVE_CONVERSATIONS,
+    ACTIVE_DIALOG_STATES,
+    ERRORS,
+    HISTORY_MESSAGES,
+    INTENT_REPLIES,
+    RATE_LIMITED,
+    STEP_TRANSITIONS,
+    UPDATE_SECONDS,
+    VALIDATION_FAILURES,
+)
+from src.services.catalog import CatalogMatch, ProductCatalog
 from src.services.chat_service import ChatService
+from src.services.intent_classifier import IntentClassifier
 from src.services.state_service import StateService
 from src.models.dialog_state import DialogState, DialogStep
 from src.utils.phone_validator import validate_russian_phone
-from src.constants.phone_data import (
-    get_brand_by_keyword,
-    get_model_keywords,
-    is_spec_related,
-    PHONE_SPECS
+from src.constants.intents import (
+    BUY_WITHOUT_MODEL_REPLY,
+    DECLINE_REPLY,
+    GREETING_REPLY,
+    MODEL_MIN_COVERAGE,
+    MODEL_REPLY,
+    SPECS_NOT_SPECIFIED,
+    Intent,
 )
 from src.services.order_service import OrderService
+from src.services.response_cache import ResponseCache, make_cache_key
+from src.services.slot_extractor import SlotExtractor, Slots, is_valid_name
+from src.utils.rate_limiter import RateLimiter
+from src.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
 
 class MessageHandler:
     """Обработчик сообщений."""
 
+    # Этапы, на которых ответ GigaChat зависит только от сообщения и бренда
+    _CACHEABLE_STEPS = (DialogStep.START, DialogStep.SPECS_SELECTION)
+
     def __init__(self, chat_service: ChatService) -> None:
         """Инициализация обработчика."""
+        self._settings = get_settings()
         self._chat_service = chat_service
-        self._state_service = StateService()
+        self._state_service = StateService.from_settings()
+        self._order_service = OrderService(chat_service)
+        self._catalog = ProductCatalog.from_settings()
+        self._slot_extractor = SlotExtractor(self._catalog)
+        self._intent_classifier: Optional[IntentClassifier] = None
+        if self._settings.INTENT_ROUTING_ENABLED:
+            self._intent_classifier = IntentClassifier()
+        self._response_cache: Optional[ResponseCache] = None
+        if self._settings.RESPONSE_CACHE_ENABLED:
+            self._response_cache = ResponseCache(
+                max_size=self._settings.RESPONSE_CACHE_SIZE,
+                ttl=self._settings.RESPONSE_CACHE_TTL,
+                path=self._settings.RESPONSE_CACHE_PATH,
+            )
+        self._rate_limiter = self._create_rate_limiter(self._settings)
+        # Пользователи, уже предупреждённые о превышении частоты
+        self._rate_notified: TTLCache[int, bool] = TTLCache(
+            max_size=self._settings.STATE_MAX_USERS, ttl=60
+        )
+        ACTIVE_DIALOG_STATES.set_function(self._state_service.active_states)
+        ACTIVE_CONVERSATIONS.set_function(self._chat_service.active_conversations)
+        HISTORY_MESSAGES.set_function(self._chat_service.history_size)
+
+    @staticmethod
+    def _create_rate_limiter(settings: Settings) -> Optional[RateLimiter]:
+        """Ограничитель частоты по настройкам; None, если он отключён."""
+        if not settings.RATE_LIMIT_ENABLED:
+            return None
+        # Пользователи распределены по обработчикам поровну, поэтому
+        # каждому достаётся своя доля общего лимита
+        workers = settings.WORKER_COUNT if settings.BOT_ROLE == "worker" else 1
+        return RateLimiter(
+            user_rate=settings.RATE_LIMIT_USER_PER_MINUTE / 60,
+            user_burst=settings.RATE_LIMIT_USER_BURST,
+            global_rate=settings.RATE_LIMIT_GLOBAL_PER_SECOND / workers,
+            global_burst=max(1, settings.RATE_LIMIT_GLOBAL_BURST // workers),
+            max_users=settings.STATE_MAX_USERS,
+        )
+
+    def apply_settings(self, settings: Settings) -> None:
+        """
+        Применение перечитанных настроек без перезапуска.
+
+        На ходу меняются порог и включение классификатора намерений,
+        потоковая выдача, ограничение частоты (корзины пользователей при этом
+        заполняются заново), параметры отправки заказов и бюджеты истории.
+        Размеры кэшей, пути к базам и число одновременных запросов
+        действуют до перезапуска.
+        """
+        self._settings = settings
+        if settings.INTENT_ROUTING_ENABLED and self._intent_classifier is None:
+            self._intent_classifier = IntentClassifier()
+        elif not settings.INTENT_ROUTING_ENABLED:
+            self._intent_classifier = None
+        self._rate_limiter = self._create_rate_limiter(settings)
+        self._order_service.apply_settings(settings)
+        self._chat_service.apply_settings(settings)
+
+    async def initialize(self) -> None:
+        """Запуск фоновых задач обработчика."""
+        self._order_service.start()
+        self._state_service.start()
+        self._chat_service.start()
+        self._catalog.start()
+
+    async def close(self) -> None:
+        """Освобождение ресурсов обработчика."""
+        await self._order_service.close()
+        await self._state_service.close()
+        await self._catalog.close()
+        if self._response_cache is not None:
+            self._response_cache.close()
+        await self._chat_service.close()
 
     async def start(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Обработка команды /start."""
         if not update.message or not update.effective_user:
             return
 
-        # Сбрасываем состояние при старте
+        # Сбрасываем состояние и историю диалога при старте
         self._state_service.reset_state(update.effective_user.id)
-        
+        self._chat_service.reset_conversation(update.effective_user.id)
+
         await update.message.reply_text(
             "👋 Здравствуйте! Я консультант по проаже телефонов. "
             "Расскажите, какой телефон вас интересует?"
         )
 
-    def _build_prompt(self, state: DialogState, message: str) -> str:
-        """Формирование промпта для GigaChat на основе состояния диалога."""
-        system_prompt = """Ты - дружелюбный консультант по продажам телефонов. 
-        Строго следуй этим правилам при общении:
-        
-        1. СТИЛЬ ОБЩЕНИЯ:
-        - НЕ ИСПОЛЬЗУЙ приветствие "Здравствуйте" в ответах
-        - Если клиент указал модель телефона, сразу переходи к уточнению деталей
-        - При получении модели телефона спроси о желаемых характеристиках
-        - Используй фразы "Отличный выбор!", "Хороший выбор!"
-        
-        2. ПОСЛЕДОВАТЕЛЬНОСТЬ ДИАЛОГА:
-        - При указании модели: "Отличный выбор! Какие характеристики вас интересуют (память, цвет)?"
-        - Если клиент отвечает "нет" на вопрос о характеристиках: "Хорошо! Тогда давайте перейдем к оформлению. Как могу к вам обращаться?"
-        - При готовности к покупке: "Отлично! Для оформления заказа, пожалуйста, представьтесь - как могу к вам обращаться?"
-        - После получения имени: "Спасибо, {имя}! Теперь, пожалуйста, укажите ваш контактный номер телефона"
-        - После получения телефона: "Спасибо, {имя}. Ваш заказ принят. Мы свяжемся с вами в ближайшее время для подтверждения деталей."
-        
-        3. ВАЖНО:
-        - НИКОГДА не повторяй приветствие в ответах
-        - Сразу реагируй на указанную модель телефона
-        - При ответе "нет" на вопрос о характеристиках, переходи к запросу имени
-        - Строго следуй последовательности: модель -> (характеристики) -> имя -> телефон
-        """
-
-        context = f"\nТекущий этап диалога: {state.current_step.name}\n"
+    def _build_context(self, state: DialogState) -> str:
+        """Формирование контекста текущего этапа диалога для GigaChat."""
+        context = f"Текущий этап диалога: {state.current_step.name}\n"
         if state.order_data.phone_model:
             context += f"Выбранная модель: {state.order_data.phone_model}\n"
         if state.order_data.specifications:
@@ -71,152 +152,367 @@ class MessageHandler:
             context += f"Имя клиента: {state.order_data.client_name}\n"
         if state.order_data.client_phone:
             context += f"Телефон клиента: {state.order_data.client_phone}\n"
-        
-        context += f"\nСообщение пользователя: {message}"
-        
-        return system_prompt + context
 
-    async def handle_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        return context
+
+    async def handle_message(
+        self, update: Update, context: ContextTypes.DEFAULT_TYPE
+    ) -> None:
         """Обработка входящих сообщений."""
         if not update.message or not update.effective_user or not update.message.text:
             return
 
         user_id = update.effective_user.id
         message_text = update.message.text
-        
-        try:
-            state = self._state_service.get_state(user_id)
-            
-            # Обработка ошибок валидации
-            if hasattr(state, 'last_error') and state.last_error:
-                error_message = state.last_error
-                state.last_error = None
-                
-                if error_message == "name_validation_error":
-                    await update.message.reply_text(
-                        "Пожалуйста, введите ваше настоящее имя (например: Иван, Мария).\n"
-                        "Имя должно содержать только буквы."
-                    )
-                    return
-                elif state.current_step == DialogStep.GET_PHONE:
-                    await update.message.reply_text(
-                        f"❌ {error_message}\n\n"
-                        "Пожалуйста, введите номер телефона в одном из форматов:\n"
-                        "• +79XXXXXXXXX\n"
-                        "• 89XXXXXXXXX\n"
-                        "• 9XXXXXXXXX"
-                    )
-                    return
-
-            prompt = self._build_prompt(state, message_text)
-            response = await self._chat_service.generate_response(prompt)
-            
-            old_step = state.current_step
-            self._update_state(state, message_text, response)
-            
-            # Проверяем, был ли переход к следующему шагу
-            if old_step == state.current_step and state.current_step == DialogStep.GET_PHONE:
-                # Если шаг не изменился при вводе телефона, значит была ошибка валидации
+        with UPDATE_SECONDS.time():
+            try:
+                state = await self._state_service.load_state(user_id)
+                # Шаблонные ответы записываются в историю без await
+                await self._chat_service.load_history(user_id)
+                try:
+                    await self._process_message(update, user_id, state, message_text)
+                finally:
+                    # Фиксируем изменения состояния в хранилище
+                    self._state_service.save_state(user_id, state)
+            except Exception as e:
+                ERRORS.inc(source="handler")
+                logger.exception(
+                    "Ошибка обработки сообщения", extra={"user_id": user_id}
+                )
+                if update.message:
+                    await update.message.reply_text(f"😢 Произошла ошибка: {str(e)}")
+
+    async def admit_update(self, update: object) -> bool:
+        """
+        Проверка ограничения частоты до постановки сообщения в обработку.
+
+        Вызывается PerUserUpdateProcessor до очереди пользователя и общего
+        ограничения параллельности, поэтому отброшенные сообщения
+        не занимают мест обработки.
+
+        Returns:
+            bool: True, если обновление нужно обработать
+        """
+        if (
+            self._rate_limiter is None
+            or not isinstance(update, Update)
+            or not update.message
+            or not update.effective_user
+        ):
+            return True
+        user_id = update.effective_user.id
+        scope = self._rate_limiter.check(user_id)
+        if scope is None:
+            self._rate_notified.pop(user_id)
+            return True
+
+        RATE_LIMITED.inc(scope=scope)
+        # При общей перегрузке не отвечаем никому, чтобы не добавлять запросов
+        if (
+            scope == "user"
+            and self._settings.RATE_LIMIT_POLICY == "notify"
+            and self._rate_notified.get(user_id) is None
+        ):
+            self._rate_notified.set(user_id, True)
+            await update.message.reply_text(
+                "⏳ Слишком много сообщений. Пожалуйста, подождите немного "
+                "и отправьте сообщение ещё раз."
+            )
+        return False
+
+    async def _process_message(
+        self, update: Update, user_id: int, state: DialogState, message_text: str
+    ) -> None:
+        """
+        Обработка сообщения пользователя в рамках текущего состояния диалога.
+
+        Сначала сообщение проверяется и применяется к состоянию локально.
+        На этапах с фиксированными ответами (имя, телефон, оформление) GigaChat
+        не вызывается: его ответ всё равно не был бы показан пользователю.
+        """
+        if not update.message:
+            return
+
+        old_step = state.current_step
+        # Каталог просматривается один раз на сообщение
+        slots = self._slot_extractor.extract(message_text)
+        intent = self._classify(message_text, slots.match)
+        self._update_state(state, message_text, slots, intent)
+        if state.current_step != old_step:
+            STEP_TRANSITIONS.inc(
+                from_step=old_step.name, to_step=state.current_step.name
+            )
+
+        # Обработка ошибок валидации
+        if state.last_error:
+            error_message = state.last_error
+            state.last_error = None
+            VALIDATION_FAILURES.inc(
+                field="name" if error_message == "name_validation_error" else "phone"
+            )
+
+            if error_message == "name_validation_error":
                 await update.message.reply_text(
-                    "❌ Неверный формат номера телефона.\n\n"
-                    "Пожалуйста, введите номер телефона в одном из форматов:\n"
-                    "• +79XXXXXXXXX\n"
-                    "• 89XXXXXXXXX\n"
-                    "• 9XXXXXXXXX"
+                    "Пожалуйста, введите ваше настоящее имя (например: Иван, Мария).\n"
+                    "Имя должно содержать только буквы."
                 )
-                return
-            
-            # Если заказ завершен
-            if state.is_order_complete():
-                await self._handle_complete_order(update, state)
-                self._state_service.reset_state(user_id)
-            # Если переходим к запросу телефона
-            elif old_step == DialogStep.GET_NAME and state.current_step == DialogStep.GET_PHONE:
+            else:
                 await update.message.reply_text(
-                    f"Спасибо, {state.order_data.client_name}! "
-                    "Теперь, пожалуйста, укажите ваш контактный номер телефона в формате:\n"
+                    f"❌ {error_message}\n\n"
+                    "Пожалуйста, введите номер телефона в одном из форматов:\n"
                     "• +79XXXXXXXXX\n"
                     "• 89XXXXXXXXX\n"
                     "• 9XXXXXXXXX"
                 )
-            # Если запрашиваем имя
-            elif state.current_step == DialogStep.GET_NAME:
-                await update.message.reply_text(
-                    "Как могу к вам обращаться? Пожалуйста, введите ваше имя."
-                )
-            # В остальных случаях отправляем ответ от GigaChat
+            return
+
+        # Если заказ завершен
+        if state.is_order_complete():
+            await self._handle_complete_order(update, state)
+            self._state_service.reset_state(user_id)
+        # Если переходим к запросу телефона
+        elif (
+            old_step != DialogStep.GET_PHONE
+            and state.current_step == DialogStep.GET_PHONE
+        ):
+            await update.message.reply_text(
+                f"Спасибо, {state.order_data.client_name}! "
+                "Теперь, пожалуйста, укажите ваш контактный номер телефона в формате:\n"
+                "• +79XXXXXXXXX\n"
+                "• 89XXXXXXXXX\n"
+                "• 9XXXXXXXXX"
+            )
+        # Если запрашиваем имя
+        elif state.current_step == DialogStep.GET_NAME:
+            await update.message.reply_text(
+                "Как могу к вам обращаться? Пожалуйста, введите ваше имя."
+            )
+        # В остальных случаях отвечает GigaChat с учётом обновлённого состояния,
+        # если намерение не распознано уверенно
+        else:
+            template = self._template_reply(state, old_step, intent)
+            if template is not None and intent is not None:
+                INTENT_REPLIES.inc(intent=intent.value)
+                self._chat_service.remember_exchange(user_id, message_text, template)
+                await update.message.reply_text(template)
             else:
-                await update.message.reply_text(response)
-            
-        except Exception as e:
-            if update.message:
-                await update.message.reply_text(f"😢 Произошла ошибка: {str(e)}")
-
-    def _update_state(self, state: DialogState, message: str, response: str) -> None:
-        """Обновление состояния диалога."""
-        message_lower = message.lower()
-        
+                await self._reply_from_model(
+                    update.message, user_id, state, message_text, slots.match.brand
+                )
+
+    def _classify(self, message: str, match: CatalogMatch) -> Optional[Intent]:
+        """Намерение клиента, если оно распознано с достаточной уверенностью."""
+        if self._intent_classifier is None:
+            return None
+        intent, confidence = self._intent_classifier.classify(message)
+        if confidence * 100 < self._settings.INTENT_MIN_CONFIDENCE:
+            return None
+        if intent == Intent.MODEL and match.coverage <= MODEL_MIN_COVERAGE:
+            # Кроме модели в сообщении много других слов - это вопрос о ней
+            return None
+        return intent
+
+    @staticmethod
+    def _template_reply(
+        state: DialogState, old_step: DialogStep, intent: Optional[Intent]
+    ) -> Optional[str]:
+        """Шаблонный ответ на распознанное намерение (None - нужен GigaChat)."""
+        if intent == Intent.MODEL and old_step == DialogStep.START:
+            if state.current_step == DialogStep.SPECS_SELECTION:
+                return MODEL_REPLY
+            return None
+        if intent is None or state.current_step != DialogStep.START:
+            return None
+        return {
+            Intent.GREETING: GREETING_REPLY,
+            Intent.BUY: BUY_WITHOUT_MODEL_REPLY,
+            Intent.DECLINE: DECLINE_REPLY,
+        }.get(intent)
+
+    async def _reply_from_model(
+        self,
+        message: Message,
+        user_id: int,
+        state: DialogState,
+        message_text: str,
+        brand: Optional[str],
+    ) -> None:
+        """Ответ GigaChat; на типовые вопросы - из кэша ответов."""
+        cache = self._response_cache
+        cache_key: Optional[str] = None
+        if cache is not None and state.current_step in self._CACHEABLE_STEPS:
+            cache_key = make_cache_key(message_text, state.current_step, brand)
+            cached = await cache.get(cache_key)
+            if cached is not None:
+                self._chat_service.remember_exchange(user_id, message_text, cached)
+                await message.reply_text(cached)
+                return
+
+        context = self._build_context(state)
+        if self._settings.STREAMING_ENABLED:
+            chunks = self._chat_service.stream_response(
+                message_text, user_id, context=context
+            )
+            response = await self._reply_streaming(message, chunks)
+        else:
+            response = await self._chat_service.generate_response(
+                message_text, user_id, context=context
+            )
+            await message.reply_text(response)
+
+        if cache is not None and cache_key is not None and response.strip():
+            await cache.set(cache_key, response)
+
+    async def _reply_streaming(
+        self, message: Message, chunks: AsyncIterator[str]
+    ) -> str:
+        """
+        Отправка ответа по мере генерации; возвращает полный текст ответа.
+
+        Первый непустой фрагмент отправляется сразу, дальше сообщение
+        редактируется не чаще раза в STREAM_EDIT_INTERVAL_MS, чтобы
+        не упираться в ограничения Telegram на частоту правок.
+        """
+        interval = self._settings.STREAM_EDIT_INTERVAL_MS / 1000
+        text = ""
+        shown = ""
+        sent: Optional[Message] = None
+        last_edit = 0.0
+
+        async for chunk in chunks:
+            text += chunk
+            visible = self._visible_text(text)
+            if not visible or visible == shown:
+                continue
+            now = time.monotonic()
+            if sent is None:
+                sent = await message.reply_text(visible)
+                shown, last_edit = visible, now
+            elif now - last_edit >= interval:
+                await self._edit_streamed(sent, visible)
+                shown, last_edit = visible, now
+
+        visible = self._visible_text(text)
+        if sent is None:
+            await message.reply_text(visible or "😢 Не удалось получить ответ")
+        elif visible != shown:
+            await self._edit_streamed(sent, visible)
+        return text
+
+    @staticmethod
+    def _visible_text(text: str) -> str:
+        """Текст для показа: без пробелов по краям и не длиннее лимита Telegram."""
+        return text.strip()[: MessageLimit.MAX_TEXT_LENGTH]
+
+    @staticmethod
+    async def _edit_streamed(message: Message, text: str) -> None:
+        """
+        Правка отправляемого по частям ответа.
+
+        Отказ Telegram (например, «Message is not modified») не прерывает
+        генерацию: ответ всё равно попадёт в историю диалога.
+        """
+        try:
+            await message.edit_text(text)
+        except BadRequest as e:
+            logger.warning("Не удалось обновить сообщение: %s", e)
+
+    def _update_state(
+        self,
+        state: DialogState,
+        message: str,
+        slots: Slots,
+        intent: Optional[Intent] = None,
+    ) -> None:
+        """
+        Обновление состояния диалога.
+
+        Сообщение заполняет данные текущего этапа, а найденные в нём же
+        данные следующих этапов ("iPhone 15 256 гб, Иван, 89161234567")
+        сразу переводят диалог дальше.
+        """
         if state.current_step == DialogStep.START:
-            brand = get_brand_by_keyword(message)
-            if brand:
-                state.order_data.phone_model = message
+            if slots.match.brand:
+                # Названная модель сохраняется под именем из каталога
+                state.order_data.phone_model = slots.phone_model or message
                 state.current_step = DialogStep.SPECS_SELECTION
-                print(f"Выбрана модель: {message}")
-        
+                logger.debug("Выбрана модель: %s", state.order_data.phone_model)
+
         elif state.current_step == DialogStep.SPECS_SELECTION:
-            state.order_data.specifications = message
+            # Если в сообщении есть и другие данные, характеристики - только его часть
+            specifications = message
+            if slots.specifications and slots.count() > 1:
+                specifications = slots.specifications
+            elif not slots.specifications and intent in (Intent.DECLINE, Intent.BUY):
+                # "нет", "не важно", "оформляйте" - характеристики не уточняются
+                specifications = SPECS_NOT_SPECIFIED
+            elif slots.client_name or slots.client_phone:
+                # Имя и телефон - данные следующих этапов, а не характеристики
+                specifications = slots.remainder or SPECS_NOT_SPECIFIED
+            state.order_data.specifications = specifications
             state.current_step = DialogStep.GET_NAME
-            print(f"Указаны характеристики: {message}")
-        
+            logger.debug("Указаны характеристики: %s", specifications)
+
         elif state.current_step == DialogStep.GET_NAME:
-            if (2 <= len(message) <= 20 and 
-                not any(char.isdigit() for char in message) and 
-                not get_brand_by_keyword(message) and 
-                not is_spec_related(message) and 
-                message_lower not in ["да", "нет", "конечно", "хорошо", "ок"]):
-                
-                state.order_data.client_name = message
+            name = message if is_valid_name(message) else slots.client_name
+            if name:
+                state.order_data.client_name = name
                 state.current_step = DialogStep.GET_PHONE
-                print(f"Указано имя клиента: {message}")
-                return
+                logger.debug("Указано имя клиента: %s", name)
             else:
                 state.last_error = "name_validation_error"
-                print(f"Неверный формат имени: {message}")
+                logger.debug("Неверный формат имени: %s", message)
                 return
-        
+
         elif state.current_step == DialogStep.GET_PHONE:
             is_valid, result = validate_russian_phone(message)
+            if not is_valid and slots.client_phone:
+                is_valid, result = True, slots.client_phone
             if is_valid:
                 state.order_data.client_phone = result
                 state.current_step = DialogStep.CONFIRMATION
-                print(f"Указан номер телефона: {result}")
+                logger.debug("Указан номер телефона: %s", result)
             else:
                 state.last_error = result
-                print(f"Неверный формат телефона: {message}")
+                logger.debug("Неверный формат телефона: %s", message)
                 return
 
+        self._fill_slots(state, slots)
+
+    def _fill_slots(self, state: DialogState, slots: Slots) -> None:
+        """Заполнение следующих этапов данными, найденными в том же сообщении."""
+        order = state.order_data
+        if state.current_step == DialogStep.SPECS_SELECTION and slots.specifications:
+            order.specifications = slots.specifications
+            state.current_step = DialogStep.GET_NAME
+        if state.current_step == DialogStep.GET_NAME and slots.client_name:
+            order.client_name = slots.client_name
+            state.current_step = DialogStep.GET_PHONE
+        if state.current_step == DialogStep.GET_PHONE and slots.client_phone:
+            order.client_phone = slots.client_phone
+            state.current_step = DialogStep.CONFIRMATION
+
     async def _handle_complete_order(self, update: Update, state: DialogState) -> None:
         """Обработка завершённого заказа."""
         if not update.message:
             return
-        
+
         try:
             # Создаем заказ через сервис
-            order_service = OrderService(self._chat_service)
-            order_service.create_order(state.order_data)
-            
-            # Формируем информацию о заказе для логов
-            order_info = (
-                f"\n{'=' * 20} НОВЫЙ ЗАКАЗ {'=' * 20}\n"
-                f"Дата и время: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-                f"Модель: {state.order_data.phone_model}\n"
-                f"Характеристики: {state.order_data.specifications}\n"
-                f"Имя клиента: {state.order_data.client_name}\n"
-                f"Телефон: {state.order_data.client_phone}\n"
-                f"{'=' * 55}\n"
+            await self._order_service.create_order(state.order_data)
+
+            logger.info(
+                "Новый заказ",
+                extra={
+                    "phone_model": state.order_data.phone_model,
+                    "specifications": state.order_data.specifications,
+                    "client_name": mask_name(state.order_data.client_name),
+                    "client_phone": mask_phone(state.order_data.client_phone),
+                    # Заказы записываются в журнал всегда, без выборки
+                    "audit": True,
+                },
             )
-            print(order_info, flush=True)
-            
+
             # Отправляем подтверждение пользователю
             confirmation_message = (
                 f"Отличный выбор, {state.order_data.client_name}! "
@@ -225,10 +521,10 @@ class MessageHandler:
                 "Мы свяжемся с вами в ближайшее время для подтверждения деталей."
             )
             await update.message.reply_text(confirmation_message)
-            
-        except Exception as e:
-            error_message = f"Ошибка при создании заказа: {str(e)}"
-            print(error_message)
+
+        except Exception:
+            ERRORS.inc(source="order")
+            logger.exception("Ошибка при создании заказа")
             await update.message.reply_text(
                 "😢 Произошла ошибка при оформлении заказа. "
                 "Пожалуйста, попробуйте позже или свяжитесь с поддержкой."
@@ -0,0 +1,81 @@
+"""HTTP-страница с метриками для Prometheus."""
+import asyncio
+import logging
+from typing import Optional
+
+from src.utils.prometheus import MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = b"text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsServer:
+    """
+    Минимальный HTTP-сервер, отдающий метрики по GET /metrics.
+
+    Работает в цикле событий бота и не требует веб-фреймворка, поэтому
+    запускается одинаково в режимах polling и webhook.
+    """
+
+    def __init__(self, registry: MetricsRegistry, host: str, port: int) -> None:
+        """
+        Инициализация сервера.
+
+        Args:
+            registry: Реестр отдаваемых метрик
+            host: Адрес прослушивания
+            port: Порт прослушивания; 0 - любой свободный
+        """
+        self._registry = registry
+        self._host = host
+        self._port = port
+        self._server: Optional[asyncio.Server] = None
+
+    @property
+    def port(self) -> int:
+        """Фактический порт сервера."""
+        if self._server is None:
+            return self._port
+        return int(self._server.sockets[0].getsockname()[1])
+
+    async def start(self) -> None:
+        """Запуск сервера."""
+        self._server = await asyncio.start_server(self._handle, self._host, self._port)
+        logger.info("Метрики доступны на http://%s:%s/metrics", self._host, self.port)
+
+    async def close(self) -> None:
+        """Остановка сервера."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Обработка одного HTTP-запроса."""
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            # Заголовки запроса не нужны, но их надо дочитать
+            while (await asyncio.wait_for(reader.readline(), timeout=5)).strip():
+                pass
+            parts = request_line.decode("latin-1").split()
+            path = parts[1].split("?")[0] if len(parts) >= 2 else ""
+            if parts[:1] == ["GET"] and path == "/metrics":
+                body = self._registry.render().encode()
+                status = b"200 OK"
+            else:
+                body = b"not found"
+                status = b"404 Not Found"
+            writer.write(
+                b"HTTP/1.1 " + status + b"\r\n"
+                b"Content-Type: " + CONTENT_TYPE + b"\r\n"
+                b"Content-Length: " + str(len(body)).encode() + b"\r\n"
+                b"Connection: close\r\n\r\n" + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
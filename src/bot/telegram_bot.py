@@ -1,38 +1,286 @@
 """Реализация Telegram бота."""
+import asyncio
+import logging
+import signal
+from typing import Any, Dict, List, Optional, Set, Tuple
 
-from telegram.ext import Application, CommandHandler
+from telegram import Update
+from telegram.ext import Application, CommandHandler, ContextTypes, TypeHandler
 from telegram.ext import MessageHandler as TGMessageHandler
 from telegram.ext import filters
 
 from src.bot.message_handler import MessageHandler
-from src.core.config import get_settings
+from src.bot.metrics_server import MetricsServer
+from src.bot.update_processor import PerUserUpdateProcessor, update_user_id
+from src.bot.webhook import WebhookApp
+from src.core.config import get_settings, reload_settings
+from src.core.metrics import REGISTRY
 from src.services.chat_service import ChatService
+from src.services.update_queue import SqliteUpdateQueue
+
+logger = logging.getLogger(__name__)
+
+# Сколько обновлений из общей очереди обработчик держит в работе одновременно
+_PUMP_BATCH = 100
 
 
 class TelegramBot:
     """Класс Telegram бота."""
 
-    def __init__(self, chat_service: ChatService) -> None:
-        """Инициализация бота."""
+    def __init__(self, chat_service: Optional[ChatService] = None) -> None:
+        """
+        Инициализация бота.
+
+        Args:
+            chat_service: Сервис чата; не нужен только для роли dispatcher
+        """
         self._settings = get_settings()
-        self._message_handler = MessageHandler(chat_service)
+        self._role = self._settings.BOT_ROLE
+        self._message_handler: Optional[MessageHandler] = None
+        if self._role != "dispatcher":
+            if chat_service is None:
+                raise ValueError("Для обработки сообщений нужен ChatService")
+            self._message_handler = MessageHandler(chat_service)
+        self._update_queue: Optional[SqliteUpdateQueue] = None
+        if self._role != "standalone":
+            self._update_queue = SqliteUpdateQueue(
+                self._settings.UPDATE_QUEUE_PATH, self._settings.UPDATE_QUEUE_LEASE
+            )
+        # Выполняющиеся перечитывания настроек по SIGHUP
+        self._reloads: Set["asyncio.Task[None]"] = set()
+        self._metrics_server: Optional[MetricsServer] = None
+        if self._settings.METRICS_PORT:
+            port = self._settings.METRICS_PORT
+            if self._role == "worker":
+                # У каждого обработчика своя страница метрик
+                port += self._settings.WORKER_INDEX
+            self._metrics_server = MetricsServer(
+                REGISTRY, self._settings.METRICS_HOST, port
+            )
         self._application = self._create_application()
 
     def _create_application(self) -> Application:
         """Создание и настройка приложения Telegram."""
-        app = Application.builder().token(self._settings.TELEGRAM_TOKEN).build()
+        builder = (
+            Application.builder()
+            .token(self._settings.TELEGRAM_TOKEN)
+            .concurrent_updates(
+                PerUserUpdateProcessor(
+                    self._settings.MAX_CONCURRENT_UPDATES,
+                    admit=(
+                        self._message_handler.admit_update
+                        if self._message_handler is not None
+                        else None
+                    ),
+                )
+            )
+            .post_init(self._on_startup)
+            .post_shutdown(self._on_shutdown)
+        )
+        if self._settings.BOT_MODE == "webhook" or self._role == "worker":
+            # Обновления приходят через WebhookApp или общую очередь,
+            # Updater не нужен
+            builder = builder.updater(None)
+        app = builder.build()
 
         # Добавляем обработчики
-        app.add_handler(CommandHandler("start", self._message_handler.start))
-        app.add_handler(
-            TGMessageHandler(
-                filters.TEXT & ~filters.COMMAND, self._message_handler.handle_message
+        if self._message_handler is None:
+            app.add_handler(TypeHandler(Update, self._forward_update))
+        else:
+            app.add_handler(CommandHandler("start", self._message_handler.start))
+            app.add_handler(
+                TGMessageHandler(
+                    filters.TEXT & ~filters.COMMAND,
+                    self._message_handler.handle_message,
+                )
             )
-        )
 
         return app
 
+    async def _on_startup(self, application: Application) -> None:
+        """Запуск фоновых задач после инициализации приложения."""
+        if self._message_handler is not None:
+            await self._message_handler.initialize()
+        if self._metrics_server is not None:
+            await self._metrics_server.start()
+        if hasattr(signal, "SIGHUP"):
+            try:
+                asyncio.get_running_loop().add_signal_handler(
+                    signal.SIGHUP, self._schedule_reload
+                )
+            except NotImplementedError:
+                pass
+
+    async def _on_shutdown(self, application: Application) -> None:
+        """Освобождение ресурсов при остановке приложения."""
+        if hasattr(signal, "SIGHUP"):
+            try:
+                asyncio.get_running_loop().remove_signal_handler(signal.SIGHUP)
+            except NotImplementedError:
+                pass
+        if self._reloads:
+            await asyncio.wait(self._reloads)
+        if self._metrics_server is not None:
+            await self._metrics_server.close()
+        if self._message_handler is not None:
+            await self._message_handler.close()
+        if self._update_queue is not None:
+            await asyncio.to_thread(self._update_queue.close)
+
+    def _schedule_reload(self) -> None:
+        """Запуск перечитывания настроек из обработчика сигнала SIGHUP."""
+        task = asyncio.create_task(self.reload_settings())
+        self._reloads.add(task)
+        task.add_done_callback(self._reloads.discard)
+
+    async def reload_settings(self) -> None:
+        """
+        Перечитывание .env и применение новых настроек без перезапуска.
+
+        Файл читается в отдельном потоке. Применяются только настройки,
+        которые сервисы умеют менять на ходу (см. MessageHandler.apply_settings);
+        остальные, например пути к базам, роль процесса и порты, требуют
+        перезапуска. Если новые настройки некорректны, остаются прежние.
+        """
+        try:
+            settings = await asyncio.to_thread(reload_settings)
+        except (FileNotFoundError, ValueError) as e:
+            logger.warning(
+                "Не удалось перечитать настройки, используются прежние: %s", e
+            )
+            return
+        if self._message_handler is not None:
+            self._message_handler.apply_settings(settings)
+        logger.info("Настройки перечитаны из .env")
+
     def run(self) -> None:
         """Запуск бота."""
-        print("🤖 Бот успешно запущен и готов к работе!")
-        self._application.run_polling()
+        logger.info("🤖 Бот успешно запущен и готов к работе!")
+        if self._role == "worker":
+            asyncio.run(self._run_worker())
+        elif self._settings.BOT_MODE == "webhook":
+            asyncio.run(self._run_webhook())
+        else:
+            self._application.run_polling()
+
+    def create_webhook_app(self) -> WebhookApp:
+        """Создание ASGI-приложения для приёма обновлений."""
+        return WebhookApp(
+            bot=self._application.bot,
+            update_queue=self._application.update_queue,
+            path=self._settings.WEBHOOK_PATH,
+            secret_token=self._settings.WEBHOOK_SECRET,
+        )
+
+    async def _run_webhook(self) -> None:
+        """Запуск бота в режиме вебхука на локальном ASGI-сервере."""
+        import uvicorn
+
+        app = self._application
+        server = uvicorn.Server(
+            uvicorn.Config(
+                self.create_webhook_app(),
+                host=self._settings.WEBHOOK_LISTEN,
+                port=self._settings.WEBHOOK_PORT,
+                log_level="warning",
+            )
+        )
+        # post_init/post_shutdown вызываются только run_polling/run_webhook,
+        # поэтому при ручном запуске вызываем их сами
+        async with app:
+            await self._on_startup(app)
+            await app.bot.set_webhook(
+                url=self._settings.WEBHOOK_URL,
+                allowed_updates=Update.ALL_TYPES,
+                secret_token=self._settings.WEBHOOK_SECRET or None,
+            )
+            await app.start()
+            try:
+                await server.serve()
+            finally:
+                await app.stop()
+                await self._on_shutdown(app)
+
+    async def _forward_update(
+        self, update: Update, context: ContextTypes.DEFAULT_TYPE
+    ) -> None:
+        """Передача обновления в раздел обработчика его пользователя."""
+        assert self._update_queue is not None
+        partition = (update_user_id(update) or 0) % self._settings.WORKER_COUNT
+        await asyncio.to_thread(self._update_queue.put, partition, update.to_dict())
+
+    async def _run_worker(self) -> None:
+        """Запуск обработчика, получающего обновления из общей очереди."""
+        app = self._application
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except NotImplementedError:
+                # На Windows остаётся остановка по KeyboardInterrupt
+                pass
+
+        async with app:
+            await self._on_startup(app)
+            await app.start()
+            try:
+                await self._pump_updates(stop)
+            finally:
+                await app.stop()
+                await self._on_shutdown(app)
+
+    async def _pump_updates(self, stop: asyncio.Event) -> None:
+        """
+        Обработка обновлений своего раздела общей очереди.
+
+        Обновление подтверждается в очереди только после обработки, поэтому
+        при падении обработчика необработанные обновления не теряются.
+        """
+        assert self._update_queue is not None
+        app = self._application
+        partition = self._settings.WORKER_INDEX
+        interval = self._settings.UPDATE_QUEUE_POLL_MS / 1000
+        # Задача обработки -> номер обновления в очереди
+        in_flight: Dict["asyncio.Task[None]", int] = {}
+        try:
+            while not stop.is_set():
+                free = _PUMP_BATCH - len(in_flight)
+                items: List[Tuple[int, Dict[str, Any]]] = []
+                if free > 0:
+                    items = await asyncio.to_thread(
+                        self._update_queue.take, partition, free
+                    )
+                for item_id, data in items:
+                    update = Update.de_json(data, app.bot)
+                    task = asyncio.create_task(
+                        app.update_processor.process_update(
+                            update, app.process_update(update)
+                        )
+                    )
+                    in_flight[task] = item_id
+                await self._ack_processed(in_flight)
+                if not items:
+                    try:
+                        await asyncio.wait_for(stop.wait(), timeout=interval)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            if in_flight:
+                await asyncio.wait(in_flight)
+            await self._ack_processed(in_flight)
+
+    async def _ack_processed(self, in_flight: Dict["asyncio.Task[None]", int]) -> None:
+        """Подтверждение в очереди завершённых обработок."""
+        assert self._update_queue is not None
+        done = [task for task in in_flight if task.done()]
+        for task in done:
+            if not task.cancelled() and task.exception() is not None:
+                logger.error(
+                    "Ошибка при обработке обновления из очереди",
+                    exc_info=task.exception(),
+                )
+        if done:
+            await asyncio.to_thread(
+                self._update_queue.ack, [in_flight.pop(task) for task in done]
+            )
@@ -0,0 +1,106 @@
+"""Параллельная обработка обновлений с сохранением порядка для пользователя."""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+
+def update_user_id(update: object) -> Optional[int]:
+    """ID пользователя (или чата), к которому относится обновление."""
+    if not isinstance(update, Update):
+        return None
+    if update.effective_user:
+        return update.effective_user.id
+    if update.effective_chat:
+        return update.effective_chat.id
+    return None
+
+
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    """
+    Обработчик обновлений для python-telegram-bot.
+
+    Обновления разных пользователей обрабатываются параллельно (не больше
+    max_concurrent_updates одновременно), а обновления одного пользователя -
+    строго по очереди, поэтому переходы DialogState не перемешиваются.
+
+    Блокировка пользователя берётся раньше общего ограничения: ожидающие
+    своей очереди обновления одного пользователя не занимают места
+    в max_concurrent_updates и не задерживают остальных. Ещё раньше
+    обновление проверяется функцией admit (ограничение частоты): отброшенное
+    обновление не ждёт в очереди и не занимает места.
+    """
+
+    def __init__(
+        self,
+        max_concurrent_updates: int,
+        admit: Optional[Callable[[object], Awaitable[bool]]] = None,
+    ) -> None:
+        """
+        Инициализация обработчика.
+
+        Args:
+            max_concurrent_updates: Сколько обновлений обрабатывать одновременно
+            admit: Проверка, нужно ли обрабатывать обновление
+        """
+        super().__init__(max_concurrent_updates)
+        self._admit = admit
+        # user_id -> (блокировка, число ожидающих её обновлений)
+        self._locks: Dict[int, Tuple[asyncio.Lock, int]] = {}
+
+    # В базовом классе process_update сначала занимает общий семафор,
+    # поэтому метод переопределён, несмотря на пометку final
+    async def process_update(  # type: ignore[misc]
+        self, update: object, coroutine: Awaitable[Any]
+    ) -> None:
+        """Обработка обновления: блокировка пользователя, затем общий семафор."""
+        if self._admit is not None and not await self._admit(update):
+            if asyncio.iscoroutine(coroutine):
+                # Обработка отброшенного обновления не запускается
+                coroutine.close()
+            return
+
+        user_id = update_user_id(update)
+        if user_id is None:
+            async with self._semaphore:
+                await self.do_process_update(update, coroutine)
+            return
+
+        lock = self._acquire_slot(user_id)
+        try:
+            async with lock, self._semaphore:
+                await self.do_process_update(update, coroutine)
+        finally:
+            self._release_slot(user_id)
+
+    async def do_process_update(
+        self, update: object, coroutine: Awaitable[Any]
+    ) -> None:
+        """Выполнение обработки обновления."""
+        await coroutine
+
+    async def initialize(self) -> None:
+        """Инициализация ресурсов (не требуется)."""
+
+    async def shutdown(self) -> None:
+        """Освобождение ресурсов."""
+        self._locks.clear()
+
+    def pending_users(self) -> int:
+        """Количество пользователей с обновлениями в обработке."""
+        return len(self._locks)
+
+    def _acquire_slot(self, user_id: int) -> asyncio.Lock:
+        """Получение блокировки пользователя с учётом ожидающих обновлений."""
+        lock, waiters = self._locks.get(user_id, (asyncio.Lock(), 0))
+        self._locks[user_id] = (lock, waiters + 1)
+        return lock
+
+    def _release_slot(self, user_id: int) -> None:
+        """Удаление блокировки, когда у пользователя не осталось обновлений."""
+        lock, waiters = self._locks[user_id]
+        if waiters <= 1:
+            del self._locks[user_id]
+        else:
+            self._locks[user_id] = (lock, waiters - 1)
@@ -0,0 +1,127 @@
+"""Приём обновлений Telegram через вебхук."""
+import asyncio
+import hmac
+import json
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from telegram import Bot, Update
+
+Scope = Dict[str, Any]
+Message = Dict[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+
+SECRET_HEADER = b"x-telegram-bot-api-secret-token"
+# Обновления Telegram намного меньше; более крупные тела не читаются целиком
+MAX_BODY_SIZE = 1024 * 1024
+
+
+class WebhookApp:
+    """
+    ASGI-приложение, принимающее обновления от Telegram.
+
+    Обработчик запроса только разбирает обновление и кладёт его в очередь
+    приложения python-telegram-bot, поэтому ответ Telegram уходит сразу,
+    а сами обновления обрабатываются приложением независимо от HTTP-запросов.
+    Не зависит от веб-фреймворков и запускается любым ASGI-сервером.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        update_queue: "asyncio.Queue[object]",
+        path: str = "/telegram",
+        secret_token: str = "",
+    ) -> None:
+        """
+        Инициализация приложения.
+
+        Args:
+            bot: Бот, к которому привязываются разобранные обновления
+            update_queue: Очередь обновлений приложения Telegram
+            path: Путь, на который Telegram отправляет обновления
+            secret_token: Секрет из заголовка X-Telegram-Bot-Api-Secret-Token
+        """
+        self._bot = bot
+        self._update_queue = update_queue
+        self._path = path
+        self._secret_token = secret_token.encode()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Обработка ASGI-запроса."""
+        if scope["type"] == "lifespan":
+            await self._handle_lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        if scope["path"] == "/healthz" and scope["method"] == "GET":
+            await self._respond(send, 200, b"ok")
+            return
+        if scope["path"] != self._path:
+            await self._respond(send, 404, b"not found")
+            return
+        if scope["method"] != "POST":
+            await self._respond(send, 405, b"method not allowed")
+            return
+        if self._secret_token and not self._check_secret(scope):
+            await self._respond(send, 403, b"forbidden")
+            return
+
+        body = await self._read_body(receive)
+        if body is None:
+            await self._respond(send, 413, b"payload too large")
+            return
+        try:
+            data = json.loads(body)
+            if not isinstance(data, dict):
+                raise ValueError("Обновление должно быть объектом JSON")
+            update = Update.de_json(data, self._bot)
+        except (ValueError, TypeError, KeyError):
+            await self._respond(send, 400, b"bad request")
+            return
+
+        if update is not None:
+            await self._update_queue.put(update)
+        await self._respond(send, 200, b"ok")
+
+    def _check_secret(self, scope: Scope) -> bool:
+        """Проверка секретного токена Telegram."""
+        for name, value in scope.get("headers", []):
+            if name.lower() == SECRET_HEADER:
+                return hmac.compare_digest(value, self._secret_token)
+        return False
+
+    @staticmethod
+    async def _read_body(receive: Receive) -> Optional[bytes]:
+        """Чтение тела запроса; None, если оно длиннее MAX_BODY_SIZE."""
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get("body", b"")
+            if len(body) > MAX_BODY_SIZE:
+                return None
+            more_body = message.get("more_body", False)
+        return body
+
+    @staticmethod
+    async def _respond(send: Send, status: int, body: bytes) -> None:
+        """Отправка текстового ответа."""
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"text/plain; charset=utf-8")],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    @staticmethod
+    async def _handle_lifespan(receive: Receive, send: Send) -> None:
+        """Подтверждение событий запуска и остановки сервера."""
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
@@ -0,0 +1,66 @@
+"""Примеры сообщений и шаблоны ответов для локального классификатора намерений."""
+from enum import Enum
+
+
+class Intent(Enum):
+    """Намерения клиента."""
+    GREETING = "greeting"   # Приветствие
+    BUY = "buy"             # Готовность купить / согласие
+    DECLINE = "decline"     # Отказ, в том числе от уточнения характеристик
+    MODEL = "model"         # Только название модели
+    QUESTION = "question"   # Вопрос или свободный текст - отвечает GigaChat
+
+
+# Примеры сообщений для каждого намерения
+INTENT_EXAMPLES = {
+    Intent.GREETING: [
+        "привет", "здравствуйте", "добрый день", "добрый вечер", "доброе утро",
+        "приветствую", "здрасте", "хай", "hello", "hi", "салют", "здравствуйте!",
+    ],
+    Intent.BUY: [
+        "да", "давайте", "хочу купить", "хочу купить телефон", "беру",
+        "оформляйте", "оформите заказ", "готов купить", "да, беру", "покупаю",
+        "хочу заказать", "хочу оформить заказ", "конечно", "согласен", "ок",
+        "хорошо", "подходит", "меня все устраивает", "давайте оформим",
+    ],
+    Intent.DECLINE: [
+        "нет", "не надо", "неважно", "не важно", "любой", "любые",
+        "без разницы", "все равно", "нет, спасибо", "не знаю", "на ваш выбор",
+        "пропустить", "не принципиально", "какой угодно", "нет пожеланий",
+    ],
+    Intent.MODEL: [
+        "айфон 15", "айфон 15 про", "iphone 14", "iphone 15 pro max",
+        "хочу айфон 15", "хочу самсунг s24", "самсунг галакси s24 ультра",
+        "galaxy a55", "редми ноут 13", "xiaomi 14", "хонор 90", "huawei p60",
+        "интересует айфон 14", "нужен айфон 13", "хочу поко x6", "мне айфон 15 плюс",
+    ],
+    Intent.QUESTION: [
+        "что лучше айфон или самсунг?", "какая камера у айфона 15?",
+        "сколько стоит айфон 15?", "есть ли рассрочка?",
+        "чем отличается про от обычного",
+        "а доставка есть?", "какой телефон посоветуете для игр?",
+        "сколько держит батарея?", "есть гарантия?", "у вас есть магазин в москве?",
+        "какие цвета есть у s24?", "а что с поддержкой 5g?",
+        "подскажите хороший телефон",
+        "нужен телефон с хорошей камерой", "какой телефон выбрать до 30 тысяч",
+        "а есть в наличии", "хочу подешевле", "какая цена", "есть в рассрочку",
+        "расскажите про камеру", "чем он лучше", "когда будет доставка",
+    ],
+}
+
+# Сообщение считается только названием модели, если больше этой доли
+# его слов совпало с каталогом; иначе это вопрос о модели
+# ("айфон 15 есть в наличии")
+MODEL_MIN_COVERAGE = 0.5
+
+# Шаблоны ответов на намерения, для которых не нужна модель
+GREETING_REPLY = "👋 Рад помочь! Расскажите, какой телефон вас интересует?"
+MODEL_REPLY = "Отличный выбор! Какие характеристики вас интересуют (память, цвет)?"
+BUY_WITHOUT_MODEL_REPLY = (
+    "Отлично! Какую модель вы рассматриваете? "
+    "Например: iPhone 15, Galaxy S24 или Redmi Note 13."
+)
+DECLINE_REPLY = "Хорошо! Если появятся вопросы о телефонах, просто напишите."
+
+# Характеристики заказа, если клиент отказался их уточнять
+SPECS_NOT_SPECIFIED = "не указаны"
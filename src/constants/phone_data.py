@@ -1,4 +1,8 @@
 """Константы для работы с данными о телефонах."""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from src.utils.keyword_matcher import KeywordMatcher
 
 # Бренды телефонов и их возможные написания
 PHONE_BRANDS = {
@@ -25,6 +29,131 @@ PHONE_SPECS = {
     "common": ["память", "цвет", "характеристики", "объем"]
 }
 
+# Каталог по умолчанию, если CATALOG_PATH не задан: модели по брендам
+DEFAULT_CATALOG = {
+    "apple": [
+        "iPhone 15 Pro Max", "iPhone 15 Pro", "iPhone 15 Plus", "iPhone 15",
+        "iPhone 14 Pro Max", "iPhone 14 Pro", "iPhone 14 Plus", "iPhone 14",
+        "iPhone 13", "iPhone 13 mini", "iPhone 12", "iPhone 11", "iPhone SE",
+    ],
+    "samsung": [
+        "Galaxy S24 Ultra", "Galaxy S24+", "Galaxy S24", "Galaxy S23 FE",
+        "Galaxy Z Fold5", "Galaxy Z Flip5", "Galaxy A55", "Galaxy A35",
+        "Galaxy A15", "Galaxy M34",
+    ],
+    "xiaomi": [
+        "Xiaomi 14 Ultra", "Xiaomi 14", "Redmi Note 13 Pro+", "Redmi Note 13 Pro",
+        "Redmi Note 13", "Redmi 13C", "POCO X6 Pro", "POCO F6",
+    ],
+    "huawei": [
+        "Huawei P60 Pro", "Huawei Mate 60 Pro", "Huawei nova 12", "Huawei nova 11",
+    ],
+    "honor": ["Honor Magic6 Pro", "Honor 90", "Honor X9b", "Honor X8b"],
+}
+
+# Русские написания слов из названий моделей
+MODEL_TERM_SYNONYMS = {
+    "про": "pro",
+    "макс": "max",
+    "плюс": "plus",
+    "мини": "mini",
+    "ультра": "ultra",
+    "фолд": "fold",
+    "флип": "flip",
+    "редми": "redmi",
+    "поко": "poco",
+    "ноут": "note",
+    "нот": "note",
+    "мейт": "mate",
+    "мэйт": "mate",
+    "нова": "nova",
+    "меджик": "magic",
+    "мэджик": "magic",
+}
+
+
+@dataclass
+class KeywordMatch:
+    """Результат поиска ключевых слов в сообщении."""
+    brand: Optional[str] = None
+    models: List[str] = field(default_factory=list)
+    specs: List[str] = field(default_factory=list)
+
+
+class PhoneKeywordMatcher:
+    """
+    Поиск брендов, моделей и характеристик за один проход по тексту.
+
+    Бренды и характеристики ищутся как подстроки, модели - как отдельные
+    слова (среди них есть однобуквенные: "s", "a", "x"). Если упомянуто
+    несколько брендов, выбирается первый по порядку в словаре брендов.
+    """
+
+    def __init__(
+        self,
+        brands: Dict[str, List[str]],
+        models: Dict[str, List[str]],
+        specs: Dict[str, List[str]],
+    ) -> None:
+        """Построение автомата по словарям ключевых слов."""
+        self._brand_order = {brand: i for i, brand in enumerate(brands)}
+        # ключевое слово -> список (тип, название)
+        self._entries: Dict[str, List[Tuple[str, str]]] = {}
+        for kind, groups in (("brand", brands), ("model", models), ("spec", specs)):
+            for name, keywords in groups.items():
+                for keyword in keywords:
+                    self._entries.setdefault(keyword.lower(), []).append((kind, name))
+        self._matcher = KeywordMatcher(self._entries)
+
+    def match(self, text: str) -> KeywordMatch:
+        """Поиск всех ключевых слов в тексте."""
+        text_lower = text.lower()
+        brands = set()
+        models: Dict[str, List[str]] = {}
+        specs: List[str] = []
+        for start, keyword in self._matcher.find_all(text_lower):
+            for kind, name in self._entries[keyword]:
+                if kind == "brand":
+                    brands.add(name)
+                elif kind == "spec":
+                    if name not in specs:
+                        specs.append(name)
+                elif _is_whole_word(text_lower, start, len(keyword)):
+                    models.setdefault(name, []).append(keyword)
+
+        brand = min(brands, key=self._brand_order.__getitem__) if brands else None
+        return KeywordMatch(
+            brand=brand,
+            models=models.get(brand, []) if brand else [],
+            specs=specs,
+        )
+
+
+def _is_whole_word(text: str, start: int, length: int) -> bool:
+    """Проверка, что вхождение не является частью другого слова."""
+    end = start + length
+    before = text[start - 1] if start > 0 else " "
+    after = text[end] if end < len(text) else " "
+    return not before.isalnum() and not after.isalnum()
+
+
+_MATCHER = PhoneKeywordMatcher(PHONE_BRANDS, PHONE_MODELS, PHONE_SPECS)
+
+
+def match_keywords(text: str) -> KeywordMatch:
+    """
+    Поиск бренда, моделей и характеристик в тексте за один проход.
+
+    Args:
+        text: Текст сообщения
+
+    Returns:
+        KeywordMatch: Найденный бренд, ключевые слова моделей этого бренда
+            и категории характеристик
+    """
+    return _MATCHER.match(text)
+
+
 def get_brand_by_keyword(text: str) -> str | None:
     """
     Определяет бренд телефона по ключевому слову.
@@ -35,11 +164,7 @@ def get_brand_by_keyword(text: str) -> str | None:
     Returns:
         str | None: Название бренда или None, если бренд не найден
     """
-    text_lower = text.lower()
-    for brand, keywords in PHONE_BRANDS.items():
-        if any(keyword in text_lower for keyword in keywords):
-            return brand
-    return None
+    return _MATCHER.match(text).brand
 
 def get_model_keywords(brand: str) -> list[str]:
     """
@@ -63,8 +188,4 @@ def is_spec_related(text: str) -> bool:
     Returns:
         bool: True если текст содержит упоминание характеристик
     """
-    text_lower = text.lower()
-    all_specs = []
-    for specs in PHONE_SPECS.values():
-        all_specs.extend(specs)
-    return any(spec in text_lower for spec in all_specs) 
\ No newline at end of file
+    return bool(_MATCHER.match(text).specs)
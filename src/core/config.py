@@ -1,8 +1,10 @@
 """Модуль конфигурации приложения."""
 
 import os
+import threading
 from dataclasses import dataclass
-from typing import Final
+from pathlib import Path
+from typing import Final, Optional
 
 from dotenv import find_dotenv, load_dotenv
 
@@ -15,6 +17,108 @@ class Settings:
     GIGACHAT_TOKEN: Final[str]
     API_ENDPOINT: Final[str]
 
+    # Ограничения истории диалога с GigaChat
+    HISTORY_MAX_TURNS: Final[int] = 10
+    HISTORY_MAX_TOKENS: Final[int] = 2000
+    HISTORY_IDLE_TTL: Final[int] = 3600
+    HISTORY_MAX_USERS: Final[int] = 10000
+    # Бюджет запроса к GigaChat целиком (промпт, контекст, история) и размер
+    # краткого содержания вытесненной части диалога; 0 - без краткого содержания
+    REQUEST_MAX_TOKENS: Final[int] = 4000
+    HISTORY_SUMMARY_TOKENS: Final[int] = 300
+    # Файл SQLite для историй диалогов; пусто - только в памяти
+    HISTORY_DB_PATH: Final[str] = ""
+
+    # Отправка заказов в API_ENDPOINT
+    ORDER_TIMEOUT: Final[int] = 10
+    ORDER_MAX_CONCURRENCY: Final[int] = 10
+
+    # Очередь заказов и фоновая отправка
+    ORDER_OUTBOX_PATH: Final[str] = "orders_outbox.db"
+    ORDER_BATCH_ENDPOINT: Final[str] = ""
+    ORDER_BATCH_SIZE: Final[int] = 20
+    ORDER_POLL_INTERVAL: Final[int] = 5
+    ORDER_RETRY_BASE_DELAY: Final[int] = 2
+    ORDER_RETRY_MAX_DELAY: Final[int] = 300
+
+    # Хранение состояний диалогов; пустой STATE_DB_PATH - только в памяти
+    STATE_DB_PATH: Final[str] = "dialog_states.db"
+    STATE_TTL: Final[int] = 3600
+    STATE_MAX_USERS: Final[int] = 10000
+    STATE_FLUSH_INTERVAL: Final[int] = 5
+    STATE_RETENTION: Final[int] = 7 * 24 * 3600
+    STATE_PURGE_INTERVAL: Final[int] = 3600
+
+    # Потоковая выдача ответов GigaChat правкой отправленного сообщения
+    STREAMING_ENABLED: Final[bool] = False
+    STREAM_EDIT_INTERVAL_MS: Final[int] = 1000
+
+    # Кэш ответов на типовые вопросы; пустой RESPONSE_CACHE_PATH - только память
+    RESPONSE_CACHE_ENABLED: Final[bool] = True
+    RESPONSE_CACHE_SIZE: Final[int] = 1000
+    RESPONSE_CACHE_TTL: Final[int] = 3600
+    RESPONSE_CACHE_PATH: Final[str] = ""
+
+    # Ответы по шаблонам без GigaChat на уверенно распознанные намерения
+    # (приветствие, покупка, отказ, название модели); INTENT_MIN_CONFIDENCE -
+    # минимальная уверенность классификатора, в процентах
+    INTENT_ROUTING_ENABLED: Final[bool] = True
+    INTENT_MIN_CONFIDENCE: Final[int] = 25
+
+    # Каталог товаров (*.json или SQLite с таблицей products); пустой
+    # CATALOG_PATH - встроенный каталог. Файл проверяется на изменения
+    # раз в CATALOG_RELOAD_INTERVAL секунд (0 - без перезагрузки)
+    CATALOG_PATH: Final[str] = ""
+    CATALOG_RELOAD_INTERVAL: Final[int] = 60
+
+    # Запросы к GigaChat: одновременные запросы, повторы и таймаут (сек)
+    GIGACHAT_MAX_CONCURRENCY: Final[int] = 8
+    GIGACHAT_MAX_RETRIES: Final[int] = 3
+    GIGACHAT_TIMEOUT: Final[int] = 30
+
+    # Ограничение частоты сообщений: для каждого пользователя (в минуту,
+    # с допустимым всплеском) и общее (в секунду); notify - один раз
+    # предупредить пользователя, drop - молча отбрасывать лишние сообщения.
+    # Общий лимит делится поровну между WORKER_COUNT обработчиками
+    RATE_LIMIT_ENABLED: Final[bool] = True
+    RATE_LIMIT_USER_PER_MINUTE: Final[int] = 20
+    RATE_LIMIT_USER_BURST: Final[int] = 5
+    RATE_LIMIT_GLOBAL_PER_SECOND: Final[int] = 30
+    RATE_LIMIT_GLOBAL_BURST: Final[int] = 60
+    RATE_LIMIT_POLICY: Final[str] = "notify"
+
+    # Сколько обновлений разных пользователей обрабатывать одновременно
+    MAX_CONCURRENT_UPDATES: Final[int] = 32
+
+    # Журналирование: уровень, файл (пусто - только консоль), формат text/json
+    # и доля записываемых сообщений уровня INFO и ниже, в процентах
+    LOG_LEVEL: Final[str] = "INFO"
+    LOG_FILE: Final[str] = "bot.log"
+    LOG_FORMAT: Final[str] = "text"
+    LOG_SAMPLE_PERCENT: Final[int] = 100
+
+    # Страница метрик Prometheus; METRICS_PORT=0 - отключена
+    METRICS_HOST: Final[str] = "127.0.0.1"
+    METRICS_PORT: Final[int] = 0
+
+    # Роль процесса: standalone - один процесс; dispatcher - только получает
+    # обновления и раскладывает их по очереди UPDATE_QUEUE_PATH; worker -
+    # обрабатывает обновления раздела WORKER_INDEX из WORKER_COUNT
+    BOT_ROLE: Final[str] = "standalone"
+    WORKER_COUNT: Final[int] = 1
+    WORKER_INDEX: Final[int] = 0
+    UPDATE_QUEUE_PATH: Final[str] = "updates_queue.db"
+    UPDATE_QUEUE_POLL_MS: Final[int] = 100
+    UPDATE_QUEUE_LEASE: Final[int] = 300
+
+    # Режим получения обновлений: polling или webhook
+    BOT_MODE: Final[str] = "polling"
+    WEBHOOK_URL: Final[str] = ""
+    WEBHOOK_LISTEN: Final[str] = "0.0.0.0"
+    WEBHOOK_PORT: Final[int] = 8443
+    WEBHOOK_PATH: Final[str] = "/telegram"
+    WEBHOOK_SECRET: Final[str] = ""
+
     def validate(self) -> None:
         """Проверка корректности настроек."""
         if not self.TELEGRAM_TOKEN:
@@ -36,9 +140,204 @@ class Settings:
         if not self.API_ENDPOINT.startswith(("http://", "https://")):
             raise ValueError("API_ENDPOINT должен начинаться с http:// или https://")
 
+        if self.HISTORY_MAX_TURNS < 1:
+            raise ValueError("HISTORY_MAX_TURNS должен быть положительным числом")
+        if self.HISTORY_MAX_TOKENS < 1:
+            raise ValueError("HISTORY_MAX_TOKENS должен быть положительным числом")
+        if self.HISTORY_IDLE_TTL < 1:
+            raise ValueError("HISTORY_IDLE_TTL должен быть положительным числом")
+        if self.HISTORY_MAX_USERS < 1:
+            raise ValueError("HISTORY_MAX_USERS должен быть положительным числом")
+        if self.HISTORY_SUMMARY_TOKENS < 0:
+            raise ValueError("HISTORY_SUMMARY_TOKENS не может быть отрицательным")
+        if self.REQUEST_MAX_TOKENS <= self.HISTORY_SUMMARY_TOKENS:
+            raise ValueError(
+                "REQUEST_MAX_TOKENS должен быть больше HISTORY_SUMMARY_TOKENS"
+            )
+        if self.ORDER_TIMEOUT < 1:
+            raise ValueError("ORDER_TIMEOUT должен быть положительным числом")
+        if self.ORDER_MAX_CONCURRENCY < 1:
+            raise ValueError("ORDER_MAX_CONCURRENCY должен быть положительным числом")
+        if not self.ORDER_OUTBOX_PATH:
+            raise ValueError("Не указан ORDER_OUTBOX_PATH")
+        if self.ORDER_BATCH_ENDPOINT and not self.ORDER_BATCH_ENDPOINT.startswith(
+            ("http://", "https://")
+        ):
+            raise ValueError(
+                "ORDER_BATCH_ENDPOINT должен начинаться с http:// или https://"
+            )
+        if self.ORDER_BATCH_SIZE < 1:
+            raise ValueError("ORDER_BATCH_SIZE должен быть положительным числом")
+        if self.ORDER_POLL_INTERVAL < 1:
+            raise ValueError("ORDER_POLL_INTERVAL должен быть положительным числом")
+        if self.ORDER_RETRY_BASE_DELAY < 1:
+            raise ValueError("ORDER_RETRY_BASE_DELAY должен быть положительным числом")
+        if self.ORDER_RETRY_MAX_DELAY < self.ORDER_RETRY_BASE_DELAY:
+            raise ValueError(
+                "ORDER_RETRY_MAX_DELAY не может быть меньше ORDER_RETRY_BASE_DELAY"
+            )
+
+        if self.STATE_TTL < 1:
+            raise ValueError("STATE_TTL должен быть положительным числом")
+        if self.STATE_MAX_USERS < 1:
+            raise ValueError("STATE_MAX_USERS должен быть положительным числом")
+        if self.STATE_FLUSH_INTERVAL < 1:
+            raise ValueError("STATE_FLUSH_INTERVAL должен быть положительным числом")
+        if self.STATE_RETENTION < self.STATE_TTL:
+            raise ValueError("STATE_RETENTION не может быть меньше STATE_TTL")
+        if self.STATE_PURGE_INTERVAL < 1:
+            raise ValueError("STATE_PURGE_INTERVAL должен быть положительным числом")
+
+        if self.STREAM_EDIT_INTERVAL_MS < 1:
+            raise ValueError("STREAM_EDIT_INTERVAL_MS должен быть положительным числом")
+        if self.RESPONSE_CACHE_SIZE < 1:
+            raise ValueError("RESPONSE_CACHE_SIZE должен быть положительным числом")
+        if self.RESPONSE_CACHE_TTL < 1:
+            raise ValueError("RESPONSE_CACHE_TTL должен быть положительным числом")
+        if not 0 <= self.INTENT_MIN_CONFIDENCE <= 100:
+            raise ValueError("INTENT_MIN_CONFIDENCE должен быть от 0 до 100")
+        if self.CATALOG_RELOAD_INTERVAL < 0:
+            raise ValueError("CATALOG_RELOAD_INTERVAL не может быть отрицательным")
+        if self.GIGACHAT_MAX_CONCURRENCY < 1:
+            raise ValueError(
+                "GIGACHAT_MAX_CONCURRENCY должен быть положительным числом"
+            )
+        if self.GIGACHAT_MAX_RETRIES < 0:
+            raise ValueError("GIGACHAT_MAX_RETRIES не может быть отрицательным")
+        if self.GIGACHAT_TIMEOUT < 1:
+            raise ValueError("GIGACHAT_TIMEOUT должен быть положительным числом")
+        if self.RATE_LIMIT_USER_PER_MINUTE < 1:
+            raise ValueError(
+                "RATE_LIMIT_USER_PER_MINUTE должен быть положительным числом"
+            )
+        if self.RATE_LIMIT_USER_BURST < 1:
+            raise ValueError("RATE_LIMIT_USER_BURST должен быть положительным числом")
+        if self.RATE_LIMIT_GLOBAL_PER_SECOND < 1:
+            raise ValueError(
+                "RATE_LIMIT_GLOBAL_PER_SECOND должен быть положительным числом"
+            )
+        if self.RATE_LIMIT_GLOBAL_BURST < 1:
+            raise ValueError("RATE_LIMIT_GLOBAL_BURST должен быть положительным числом")
+        if self.RATE_LIMIT_POLICY not in ("notify", "drop"):
+            raise ValueError("RATE_LIMIT_POLICY должен быть notify или drop")
+        if self.MAX_CONCURRENT_UPDATES < 1:
+            raise ValueError("MAX_CONCURRENT_UPDATES должен быть положительным числом")
+
+        if self.LOG_LEVEL not in ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"):
+            raise ValueError(
+                "LOG_LEVEL должен быть DEBUG, INFO, WARNING, ERROR или CRITICAL"
+            )
+        if self.LOG_FORMAT not in ("text", "json"):
+            raise ValueError("LOG_FORMAT должен быть text или json")
+        if not 0 <= self.LOG_SAMPLE_PERCENT <= 100:
+            raise ValueError("LOG_SAMPLE_PERCENT должен быть от 0 до 100")
+
+        if not 0 <= self.METRICS_PORT <= 65535:
+            raise ValueError("METRICS_PORT должен быть от 0 до 65535")
+
+        if self.BOT_ROLE not in ("standalone", "dispatcher", "worker"):
+            raise ValueError("BOT_ROLE должен быть standalone, dispatcher или worker")
+        if self.WORKER_COUNT < 1:
+            raise ValueError("WORKER_COUNT должен быть положительным числом")
+        if not 0 <= self.WORKER_INDEX < self.WORKER_COUNT:
+            raise ValueError("WORKER_INDEX должен быть от 0 до WORKER_COUNT - 1")
+        if self.BOT_ROLE != "standalone" and not self.UPDATE_QUEUE_PATH:
+            raise ValueError("Для ролей dispatcher и worker нужен UPDATE_QUEUE_PATH")
+        if self.UPDATE_QUEUE_POLL_MS < 1:
+            raise ValueError("UPDATE_QUEUE_POLL_MS должен быть положительным числом")
+        if self.UPDATE_QUEUE_LEASE < 1:
+            raise ValueError("UPDATE_QUEUE_LEASE должен быть положительным числом")
+
+        if self.BOT_MODE not in ("polling", "webhook"):
+            raise ValueError("BOT_MODE должен быть polling или webhook")
+        if self.BOT_MODE == "webhook":
+            if not self.WEBHOOK_URL.startswith("https://"):
+                raise ValueError(
+                    "Для режима webhook WEBHOOK_URL должен начинаться с https://"
+                )
+            if not self.WEBHOOK_PATH.startswith("/"):
+                raise ValueError("WEBHOOK_PATH должен начинаться с /")
+            if not 0 < self.WEBHOOK_PORT < 65536:
+                raise ValueError("WEBHOOK_PORT должен быть в диапазоне 1-65535")
+
+
+def worker_path(path: str, settings: Settings) -> str:
+    """
+    Путь к файлу, который у каждого процесса-обработчика должен быть свой.
+
+    Для роли worker к имени файла добавляется номер обработчика:
+    orders_outbox.db -> orders_outbox.1.db.
+    """
+    if settings.BOT_ROLE != "worker":
+        return path
+    file = Path(path)
+    return str(file.with_name(f"{file.stem}.{settings.WORKER_INDEX}{file.suffix}"))
+
+
+def _get_int_env(name: str, default: int) -> int:
+    """Получение целочисленной настройки из переменных окружения."""
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} должен быть целым числом, получено: {value}")
+
+
+def _get_bool_env(name: str, default: bool) -> bool:
+    """Получение логической настройки из переменных окружения."""
+    value = os.getenv(name)
+    if not value:
+        return default
+    if value.lower() in ("1", "true", "yes", "on"):
+        return True
+    if value.lower() in ("0", "false", "no", "off"):
+        return False
+    raise ValueError(f"{name} должен быть true или false, получено: {value}")
+
+
+_settings: Optional[Settings] = None
+_settings_lock = threading.RLock()
+
 
 def get_settings() -> Settings:
-    """Получение настроек приложения."""
+    """
+    Получение настроек приложения.
+
+    Настройки читаются из .env один раз на процесс и кэшируются; для
+    повторного чтения используйте reload_settings().
+    """
+    settings = _settings
+    if settings is None:
+        with _settings_lock:
+            settings = _settings or _store_settings(_load_settings())
+    return settings
+
+
+def reload_settings() -> Settings:
+    """
+    Повторное чтение настроек из .env.
+
+    Уже созданные сервисы продолжают работать со своей копией настроек,
+    пока им не передадут новую (TelegramBot.reload_settings() по SIGHUP);
+    новые значения получат последующие вызовы get_settings(). Если новые
+    настройки некорректны, исключение пробрасывается, а кэш не меняется.
+    """
+    settings = _load_settings()
+    with _settings_lock:
+        return _store_settings(settings)
+
+
+def _store_settings(settings: Settings) -> Settings:
+    """Сохранение настроек в кэш процесса."""
+    global _settings
+    _settings = settings
+    return settings
+
+
+def _load_settings() -> Settings:
+    """Чтение и проверка настроек из .env."""
     if "TELEGRAM_TOKEN" in os.environ:
         del os.environ["TELEGRAM_TOKEN"]
     if "GIGACHAT_TOKEN" in os.environ:
@@ -67,7 +366,66 @@ def get_settings() -> Settings:
     settings = Settings(
         TELEGRAM_TOKEN=telegram_token,
         GIGACHAT_TOKEN=gigachat_token,
-        API_ENDPOINT=api_endpoint
+        API_ENDPOINT=api_endpoint,
+        HISTORY_MAX_TURNS=_get_int_env("HISTORY_MAX_TURNS", 10),
+        HISTORY_MAX_TOKENS=_get_int_env("HISTORY_MAX_TOKENS", 2000),
+        HISTORY_IDLE_TTL=_get_int_env("HISTORY_IDLE_TTL", 3600),
+        HISTORY_MAX_USERS=_get_int_env("HISTORY_MAX_USERS", 10000),
+        REQUEST_MAX_TOKENS=_get_int_env("REQUEST_MAX_TOKENS", 4000),
+        HISTORY_SUMMARY_TOKENS=_get_int_env("HISTORY_SUMMARY_TOKENS", 300),
+        HISTORY_DB_PATH=os.getenv("HISTORY_DB_PATH", ""),
+        ORDER_TIMEOUT=_get_int_env("ORDER_TIMEOUT", 10),
+        ORDER_MAX_CONCURRENCY=_get_int_env("ORDER_MAX_CONCURRENCY", 10),
+        ORDER_OUTBOX_PATH=os.getenv("ORDER_OUTBOX_PATH") or "orders_outbox.db",
+        ORDER_BATCH_ENDPOINT=os.getenv("ORDER_BATCH_ENDPOINT", ""),
+        ORDER_BATCH_SIZE=_get_int_env("ORDER_BATCH_SIZE", 20),
+        ORDER_POLL_INTERVAL=_get_int_env("ORDER_POLL_INTERVAL", 5),
+        ORDER_RETRY_BASE_DELAY=_get_int_env("ORDER_RETRY_BASE_DELAY", 2),
+        ORDER_RETRY_MAX_DELAY=_get_int_env("ORDER_RETRY_MAX_DELAY", 300),
+        STATE_DB_PATH=os.getenv("STATE_DB_PATH", "dialog_states.db"),
+        STATE_TTL=_get_int_env("STATE_TTL", 3600),
+        STATE_MAX_USERS=_get_int_env("STATE_MAX_USERS", 10000),
+        STATE_FLUSH_INTERVAL=_get_int_env("STATE_FLUSH_INTERVAL", 5),
+        STATE_RETENTION=_get_int_env("STATE_RETENTION", 7 * 24 * 3600),
+        STATE_PURGE_INTERVAL=_get_int_env("STATE_PURGE_INTERVAL", 3600),
+        STREAMING_ENABLED=_get_bool_env("STREAMING_ENABLED", False),
+        STREAM_EDIT_INTERVAL_MS=_get_int_env("STREAM_EDIT_INTERVAL_MS", 1000),
+        RESPONSE_CACHE_ENABLED=_get_bool_env("RESPONSE_CACHE_ENABLED", True),
+        RESPONSE_CACHE_SIZE=_get_int_env("RESPONSE_CACHE_SIZE", 1000),
+        RESPONSE_CACHE_TTL=_get_int_env("RESPONSE_CACHE_TTL", 3600),
+        RESPONSE_CACHE_PATH=os.getenv("RESPONSE_CACHE_PATH", ""),
+        INTENT_ROUTING_ENABLED=_get_bool_env("INTENT_ROUTING_ENABLED", True),
+        INTENT_MIN_CONFIDENCE=_get_int_env("INTENT_MIN_CONFIDENCE", 25),
+        CATALOG_PATH=os.getenv("CATALOG_PATH", ""),
+        CATALOG_RELOAD_INTERVAL=_get_int_env("CATALOG_RELOAD_INTERVAL", 60),
+        GIGACHAT_MAX_CONCURRENCY=_get_int_env("GIGACHAT_MAX_CONCURRENCY", 8),
+        GIGACHAT_MAX_RETRIES=_get_int_env("GIGACHAT_MAX_RETRIES", 3),
+        GIGACHAT_TIMEOUT=_get_int_env("GIGACHAT_TIMEOUT", 30),
+        RATE_LIMIT_ENABLED=_get_bool_env("RATE_LIMIT_ENABLED", True),
+        RATE_LIMIT_USER_PER_MINUTE=_get_int_env("RATE_LIMIT_USER_PER_MINUTE", 20),
+        RATE_LIMIT_USER_BURST=_get_int_env("RATE_LIMIT_USER_BURST", 5),
+        RATE_LIMIT_GLOBAL_PER_SECOND=_get_int_env("RATE_LIMIT_GLOBAL_PER_SECOND", 30),
+        RATE_LIMIT_GLOBAL_BURST=_get_int_env("RATE_LIMIT_GLOBAL_BURST", 60),
+        RATE_LIMIT_POLICY=os.getenv("RATE_LIMIT_POLICY") or "notify",
+        MAX_CONCURRENT_UPDATES=_get_int_env("MAX_CONCURRENT_UPDATES", 32),
+        LOG_LEVEL=(os.getenv("LOG_LEVEL") or "INFO").upper(),
+        LOG_FILE=os.getenv("LOG_FILE", "bot.log"),
+        LOG_FORMAT=os.getenv("LOG_FORMAT") or "text",
+        LOG_SAMPLE_PERCENT=_get_int_env("LOG_SAMPLE_PERCENT", 100),
+        METRICS_HOST=os.getenv("METRICS_HOST") or "127.0.0.1",
+        METRICS_PORT=_get_int_env("METRICS_PORT", 0),
+        BOT_ROLE=os.getenv("BOT_ROLE") or "standalone",
+        WORKER_COUNT=_get_int_env("WORKER_COUNT", 1),
+        WORKER_INDEX=_get_int_env("WORKER_INDEX", 0),
+        UPDATE_QUEUE_PATH=os.getenv("UPDATE_QUEUE_PATH") or "updates_queue.db",
+        UPDATE_QUEUE_POLL_MS=_get_int_env("UPDATE_QUEUE_POLL_MS", 100),
+        UPDATE_QUEUE_LEASE=_get_int_env("UPDATE_QUEUE_LEASE", 300),
+        BOT_MODE=os.getenv("BOT_MODE") or "polling",
+        WEBHOOK_URL=os.getenv("WEBHOOK_URL", ""),
+        WEBHOOK_LISTEN=os.getenv("WEBHOOK_LISTEN") or "0.0.0.0",
+        WEBHOOK_PORT=_get_int_env("WEBHOOK_PORT", 8443),
+        WEBHOOK_PATH=os.getenv("WEBHOOK_PATH") or "/telegram",
+        WEBHOOK_SECRET=os.getenv("WEBHOOK_SECRET", ""),
     )
     settings.validate()
     return settings
@@ -0,0 +1,144 @@
+"""Настройка журналирования приложения."""
+import json
+import logging
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, List, Optional
+
+from src.core.config import Settings
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Атрибуты LogRecord; всё остальное в записи - поля, переданные через extra
+_RECORD_ATTRS = frozenset(
+    logging.LogRecord("", 0, "", 0, "", None, None).__dict__
+) | {"message", "asctime", "taskName"}
+
+_listener: Optional[QueueListener] = None
+
+
+def record_fields(record: logging.LogRecord) -> Dict[str, Any]:
+    """Поля записи, переданные через extra."""
+    return {
+        key: value
+        for key, value in record.__dict__.items()
+        if key not in _RECORD_ATTRS and not key.startswith("_")
+    }
+
+
+class TextFormatter(logging.Formatter):
+    """Текстовый формат: сообщение и поля extra в виде key=value."""
+
+    def __init__(self) -> None:
+        """Инициализация форматтера."""
+        super().__init__(TEXT_FORMAT)
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Форматирование записи."""
+        text = super().format(record)
+        fields = record_fields(record)
+        if fields:
+            text += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return text
+
+
+class JsonFormatter(logging.Formatter):
+    """Формат JSON Lines для сборщиков журналов."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Форматирование записи."""
+        data: Dict[str, Any] = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **record_fields(record),
+        }
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def mask_phone(phone: Optional[str]) -> str:
+    """Номер телефона для журнала: видны только две последние цифры."""
+    digits = "".join(ch for ch in phone or "" if ch.isdigit())
+    return "*" * max(0, len(digits) - 2) + digits[-2:]
+
+
+def mask_name(name: Optional[str]) -> str:
+    """Имя для журнала: видна только первая буква."""
+    name = (name or "").strip()
+    return name[:1] + "***" if name else ""
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Выборочная запись частых сообщений.
+
+    Сообщения уровня INFO и ниже пропускаются с вероятностью percent/100,
+    предупреждения, ошибки и записи с extra={"audit": True} (например,
+    о новых заказах) записываются всегда.
+    """
+
+    def __init__(self, percent: int) -> None:
+        """Инициализация фильтра."""
+        super().__init__()
+        self._rate = percent / 100
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Нужно ли записать сообщение."""
+        if (
+            record.levelno >= logging.WARNING
+            or self._rate >= 1
+            or getattr(record, "audit", False)
+        ):
+            return True
+        return random.random() < self._rate
+
+
+def setup_logging(settings: Settings) -> None:
+    """
+    Настройка журналирования.
+
+    Обработчики приложения только кладут записи в очередь; запись в консоль
+    и в файл (в UTF-8) выполняет отдельный поток, поэтому журналирование
+    не блокирует цикл событий.
+    """
+    global _listener
+    shutdown_logging()
+
+    formatter: logging.Formatter = (
+        JsonFormatter() if settings.LOG_FORMAT == "json" else TextFormatter()
+    )
+    handlers: List[logging.Handler] = [logging.StreamHandler(sys.stderr)]
+    if settings.LOG_FILE:
+        handlers.append(logging.FileHandler(settings.LOG_FILE, encoding="utf-8"))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(settings.LOG_SAMPLE_PERCENT))
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(settings.LOG_LEVEL)
+    # httpx пишет каждый запрос на уровне INFO, включая URL с токеном бота
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Запись оставшихся в очереди сообщений и остановка потока журнала."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
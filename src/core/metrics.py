@@ -0,0 +1,61 @@
+"""Метрики приложения."""
+from src.utils.prometheus import MetricsRegistry
+
+REGISTRY = MetricsRegistry()
+
+UPDATE_SECONDS = REGISTRY.histogram(
+    "giga_seller_update_seconds",
+    "Время обработки сообщения пользователя",
+)
+LLM_REQUEST_SECONDS = REGISTRY.histogram(
+    "giga_seller_llm_request_seconds",
+    "Время запроса к GigaChat с учётом повторов",
+    labelnames=("method",),
+)
+LLM_REQUEST_TOKENS = REGISTRY.histogram(
+    "giga_seller_llm_request_tokens",
+    "Оценка размера запроса к GigaChat в токенах",
+    buckets=(250, 500, 1000, 1500, 2000, 3000, 4000, 6000, 8000),
+)
+ORDER_SUBMIT_SECONDS = REGISTRY.histogram(
+    "giga_seller_order_submit_seconds",
+    "Время отправки заказов в API",
+    labelnames=("mode",),
+)
+STEP_TRANSITIONS = REGISTRY.counter(
+    "giga_seller_step_transitions_total",
+    "Переходы между этапами диалога",
+    labelnames=("from_step", "to_step"),
+)
+VALIDATION_FAILURES = REGISTRY.counter(
+    "giga_seller_validation_failures_total",
+    "Отклонённые значения имени и телефона",
+    labelnames=("field",),
+)
+ERRORS = REGISTRY.counter(
+    "giga_seller_errors_total",
+    "Ошибки по месту возникновения",
+    labelnames=("source",),
+)
+INTENT_REPLIES = REGISTRY.counter(
+    "giga_seller_intent_replies_total",
+    "Ответы по шаблону без GigaChat по распознанному намерению",
+    labelnames=("intent",),
+)
+RATE_LIMITED = REGISTRY.counter(
+    "giga_seller_rate_limited_total",
+    "Сообщения, отброшенные ограничением частоты",
+    labelnames=("scope",),
+)
+ACTIVE_DIALOG_STATES = REGISTRY.gauge(
+    "giga_seller_active_dialog_states",
+    "Состояния диалогов в памяти",
+)
+ACTIVE_CONVERSATIONS = REGISTRY.gauge(
+    "giga_seller_active_conversations",
+    "Истории диалогов с GigaChat в памяти",
+)
+HISTORY_MESSAGES = REGISTRY.gauge(
+    "giga_seller_history_messages",
+    "Сообщения во всех историях диалогов",
+)
@@ -3,6 +3,8 @@ import os
 import sys
 from pathlib import Path
 from src.bot.telegram_bot import TelegramBot
+from src.core.config import get_settings
+from src.core.logging_config import setup_logging, shutdown_logging
 from src.services.chat_service import ChatService
 
 # Добавляем корневую директорию проекта в PYTHONPATH
@@ -11,9 +13,16 @@ sys.path.append(project_root)
 
 def main() -> None:
     """Запуск приложения."""
-    chat_service = ChatService()
-    bot = TelegramBot(chat_service)
-    bot.run()
+    setup_logging(get_settings())
+    try:
+        # Диспетчер только раскладывает обновления и к GigaChat не обращается
+        chat_service = (
+            None if get_settings().BOT_ROLE == "dispatcher" else ChatService()
+        )
+        bot = TelegramBot(chat_service)
+        bot.run()
+    finally:
+        shutdown_logging()
 
 if __name__ == "__main__":
     main()
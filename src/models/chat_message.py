@@ -0,0 +1,33 @@
+"""Сообщения диалога с чат-моделью."""
+from dataclasses import dataclass
+from typing import ClassVar, Dict
+
+
+@dataclass(frozen=True)
+class ChatMessage:
+    """Сообщение диалога; роль задаётся классом сообщения."""
+    content: str
+
+    role: ClassVar[str] = "user"
+
+    def to_payload(self) -> Dict[str, str]:
+        """Сообщение в формате запроса GigaChat."""
+        return {"role": self.role, "content": self.content}
+
+
+@dataclass(frozen=True)
+class SystemMessage(ChatMessage):
+    """Системный промпт."""
+    role: ClassVar[str] = "system"
+
+
+@dataclass(frozen=True)
+class HumanMessage(ChatMessage):
+    """Сообщение клиента."""
+    role: ClassVar[str] = "user"
+
+
+@dataclass(frozen=True)
+class AIMessage(ChatMessage):
+    """Ответ консультанта."""
+    role: ClassVar[str] = "assistant"
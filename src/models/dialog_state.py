@@ -1,11 +1,23 @@
 """Модуль для хранения состояния диалога."""
 from dataclasses import dataclass, field
 from enum import Enum, auto
-from typing import Optional
+from typing import Any, Dict, List, Optional
 import logging
+import struct
 import sys
 from datetime import datetime
 
+# Без __dict__ у каждого экземпляра состояние занимает в несколько раз
+# меньше памяти; slots=True поддерживается dataclass начиная с Python 3.10
+_SLOTS: Dict[str, bool] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# Версия двоичного формата состояния (DialogState.to_bytes)
+STATE_CODEC_VERSION = 1
+
+# Заголовок: версия формата, номер этапа, маска заполненных строковых полей
+_HEADER = struct.Struct("<BBB")
+_LENGTH = struct.Struct("<H")
+
 
 class DialogStep(Enum):
     """Этапы диалога с пользователем."""
@@ -17,7 +29,7 @@ class DialogStep(Enum):
     CONFIRMATION = auto()   # Подтверждение заказа
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class OrderData:
     """Данные заказа."""
     phone_model: Optional[str] = None
@@ -35,13 +47,84 @@ class OrderData:
         )
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class DialogState:
     """Класс для хранения состояния диалога."""
     current_step: DialogStep = DialogStep.START
     order_data: OrderData = field(default_factory=OrderData)
     last_error: Optional[str] = None
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Преобразование состояния в словарь для сохранения."""
+        return {
+            "current_step": self.current_step.name,
+            "order_data": {
+                "phone_model": self.order_data.phone_model,
+                "specifications": self.order_data.specifications,
+                "client_name": self.order_data.client_name,
+                "client_phone": self.order_data.client_phone,
+            },
+            "last_error": self.last_error,
+        }
+
+    def to_bytes(self) -> bytes:
+        """
+        Компактное двоичное представление состояния.
+
+        Формат версии 1: заголовок (версия, DialogStep.value, маска
+        заполненных полей), затем для каждого заполненного поля длина
+        в UTF-8 (2 байта) и сами байты. Поля идут в порядке: модель,
+        характеристики, имя, телефон, последняя ошибка. Новые этапы
+        DialogStep добавляются только в конец перечисления, чтобы номера
+        сохранённых этапов не менялись.
+        """
+        order = self.order_data
+        values = (
+            order.phone_model, order.specifications, order.client_name,
+            order.client_phone, self.last_error,
+        )
+        mask = 0
+        parts: List[bytes] = [b""]
+        for bit, value in enumerate(values):
+            if value is not None:
+                encoded = value.encode("utf-8")
+                mask |= 1 << bit
+                parts.append(_LENGTH.pack(len(encoded)))
+                parts.append(encoded)
+        parts[0] = _HEADER.pack(STATE_CODEC_VERSION, self.current_step.value, mask)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "DialogState":
+        """Восстановление состояния из результата to_bytes()."""
+        version, step, mask = _HEADER.unpack_from(data)
+        if version != STATE_CODEC_VERSION:
+            raise ValueError(f"Неизвестная версия формата состояния: {version}")
+        offset = _HEADER.size
+        values: List[Optional[str]] = []
+        for bit in range(5):
+            if mask & (1 << bit):
+                (length,) = _LENGTH.unpack_from(data, offset)
+                offset += _LENGTH.size
+                values.append(data[offset:offset + length].decode("utf-8"))
+                offset += length
+            else:
+                values.append(None)
+        return cls(
+            current_step=DialogStep(step),
+            order_data=OrderData(*values[:4]),
+            last_error=values[4],
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DialogState":
+        """Восстановление состояния из словаря."""
+        return cls(
+            current_step=DialogStep[data["current_step"]],
+            order_data=OrderData(**data.get("order_data", {})),
+            last_error=data.get("last_error"),
+        )
+
     def reset(self) -> None:
         """Сброс состояния диалога."""
         self.current_step = DialogStep.START
@@ -49,23 +132,10 @@ class DialogState:
 
     def is_order_complete(self) -> bool:
         """Проверка заполненности всех данных заказа."""
-        is_complete = all([
+        return all([
             self.order_data.phone_model,
             self.order_data.specifications,
             self.order_data.client_name,
             self.order_data.client_phone,
             self.current_step == DialogStep.CONFIRMATION
         ])
-        
-        if is_complete:
-            print("Заказ укомплектован и готов к сохранению")
-        else:
-            print(
-                f"Заказ не готов: модель={bool(self.order_data.phone_model)}, "
-                f"specs={bool(self.order_data.specifications)}, "
-                f"name={bool(self.order_data.client_name)}, "
-                f"phone={bool(self.order_data.client_phone)}, "
-                f"step={self.current_step}"
-            )
-        
-        return is_complete
\ No newline at end of file
@@ -0,0 +1,311 @@
+"""Каталог товаров с нечётким поиском моделей."""
+import asyncio
+import json
+import logging
+import os
+import re
+import sqlite3
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from src.constants.phone_data import DEFAULT_CATALOG, MODEL_TERM_SYNONYMS, PHONE_BRANDS
+from src.core.config import get_settings
+from src.core.metrics import ERRORS
+from src.utils.ngram_index import NgramIndex
+
+logger = logging.getLogger(__name__)
+
+# Слова названия: буквы и цифры отдельно ("S24" -> "s", "24")
+_TOKEN = re.compile(r"[a-zа-я]+|[0-9]+")
+
+# Минимальная похожесть слова с опечаткой на слово каталога
+MIN_TERM_SIMILARITY = 0.7
+
+# Слова короче этого сравниваются только точно: в коротких словах
+# одна опечатка меняет смысл ("про" и "пра"), а в числах - модель
+FUZZY_MIN_LENGTH = 4
+
+# Вес точно и нечётко совпавшего слова при выборе товара
+EXACT_TERM_WEIGHT = 2
+FUZZY_TERM_WEIGHT = 1
+
+
+def tokenize(text: str) -> List[str]:
+    """Слова текста в нижнем регистре."""
+    text = text.lower().replace("ё", "е").replace("+", " plus ")
+    return _TOKEN.findall(text)
+
+
+@dataclass(frozen=True)
+class Product:
+    """Товар каталога."""
+    sku: str
+    brand: str
+    name: str
+
+
+@dataclass(frozen=True)
+class CatalogMatch:
+    """Результат поиска: бренд и, если модель названа, товар."""
+    brand: Optional[str] = None
+    product: Optional[Product] = None
+    # Доля слов текста, совпавших с найденными брендом и моделью
+    coverage: float = 0.0
+
+
+class CatalogIndex:
+    """
+    Неизменяемый индекс каталога.
+
+    Каждое слово запроса приводится к слову каталога: точно (в том числе
+    через синонимы и написания брендов) или по индексу n-грамм с учётом
+    опечаток. Точное совпадение весит больше нечёткого. Начиная с каждого
+    найденного слова, списки товаров пересекаются с остальными словами
+    (слово, с которым пересечение становится пустым, пропускается);
+    выбираются кандидаты с наибольшим весом совпавших слов, а среди
+    них - товар с наименьшим числом не упомянутых слов названия.
+
+    Числа и однобуквенные слова ("90", "5g", "s") встречаются в обычных
+    сообщениях, поэтому бренд и товар по ним выбираются, только если
+    вместе с ними совпал бренд или точно названное буквенное слово модели.
+    """
+
+    def __init__(self, products: Iterable[Product]) -> None:
+        """Построение индекса по списку товаров."""
+        self.products: List[Product] = list(products)
+        # Написание -> слово каталога (бренды приводятся к ключу бренда)
+        self._aliases: Dict[str, str] = dict(MODEL_TERM_SYNONYMS)
+        for brand, keywords in PHONE_BRANDS.items():
+            for keyword in keywords:
+                self._aliases[keyword] = brand
+        self._brands: Set[str] = set(PHONE_BRANDS)
+
+        self._postings: Dict[str, Set[int]] = {}
+        # Порядок выбора среди кандидатов: (число слов названия, номер товара)
+        self._rank: List[Tuple[int, int]] = []
+        for product_id, product in enumerate(self.products):
+            brand = product.brand.lower()
+            self._brands.add(brand)
+            terms = {
+                self._aliases.get(token, token) for token in tokenize(product.name)
+            }
+            terms.add(brand)
+            self._rank.append((len(terms), product_id))
+            for term in terms:
+                self._postings.setdefault(term, set()).add(product_id)
+
+        self._fuzzy = NgramIndex(
+            word
+            for word in (*self._postings, *self._aliases)
+            if len(word) >= FUZZY_MIN_LENGTH and word.isalpha()
+        )
+
+    def __len__(self) -> int:
+        """Количество товаров."""
+        return len(self.products)
+
+    def lookup(self, text: str) -> CatalogMatch:
+        """
+        Поиск бренда и модели в тексте.
+
+        Args:
+            text: Текст сообщения, например "айфн 15 про"
+
+        Returns:
+            CatalogMatch: Бренд, если он назван или однозначно следует
+                из модели, и товар, если кроме бренда названа модель
+        """
+        tokens = tokenize(text)
+        # Слово каталога -> вес совпадения
+        terms: Dict[str, int] = {}
+        # Слово каталога для каждого слова текста
+        token_terms: List[Optional[str]] = []
+        for token in tokens:
+            found = self._term(token)
+            token_terms.append(found[0] if found else None)
+            if found is not None:
+                term, weight = found
+                terms[term] = max(terms.get(term, 0), weight)
+        # Сначала бренды, затем более весомые и более редкие слова
+        ordered = sorted(terms, key=lambda term: (
+            term not in self._brands, -terms[term], len(self._postings[term])
+        ))
+
+        best: Optional[Tuple[int, Set[int], List[str]]] = None
+        for seed in ordered:
+            candidates = self._postings[seed]
+            covered = [seed]
+            for term in ordered:
+                if term == seed:
+                    continue
+                narrowed = candidates & self._postings[term]
+                if narrowed:
+                    candidates = narrowed
+                    covered.append(term)
+            if not any(self._is_anchor(term, terms[term]) for term in covered):
+                continue
+            weight = sum(terms[term] for term in covered)
+            if best is None or weight > best[0]:
+                best = (weight, candidates, covered)
+        if best is None:
+            return CatalogMatch()
+
+        _, candidates, covered = best
+        coverage = sum(term in covered for term in token_terms) / len(tokens)
+        brand = next(
+            (brand for brand in self._brands
+             if brand in self._postings and candidates <= self._postings[brand]),
+            None,
+        )
+        if all(term in self._brands for term in covered):
+            return CatalogMatch(brand=brand, coverage=coverage)
+        product_id = min(candidates, key=self._rank.__getitem__)
+        return CatalogMatch(
+            brand=brand, product=self.products[product_id], coverage=coverage
+        )
+
+    def _term(self, token: str) -> Optional[Tuple[str, int]]:
+        """Слово каталога для слова запроса и вес совпадения."""
+        term = self._aliases.get(token, token)
+        if term in self._postings:
+            return term, EXACT_TERM_WEIGHT
+        if len(token) < FUZZY_MIN_LENGTH or not token.isalpha():
+            return None
+        found = self._fuzzy.lookup(token, MIN_TERM_SIMILARITY)
+        if found is None:
+            return None
+        term = self._aliases.get(found[0], found[0])
+        return (term, FUZZY_TERM_WEIGHT) if term in self._postings else None
+
+    def _is_anchor(self, term: str, weight: int) -> bool:
+        """Слово, по которому можно выбрать бренд: бренд или точное слово модели."""
+        return term in self._brands or (
+            weight == EXACT_TERM_WEIGHT and term.isalpha() and len(term) > 1
+        )
+
+
+def load_products(path: str) -> List[Product]:
+    """
+    Загрузка товаров.
+
+    Args:
+        path: Пустая строка - каталог по умолчанию; *.json - список объектов
+            с полями sku, brand, name; *.db, *.sqlite - таблица products
+            с теми же столбцами
+
+    Returns:
+        List[Product]: Товары каталога
+    """
+    if not path:
+        return [
+            Product(sku=f"{brand}-{i}", brand=brand, name=name)
+            for brand, names in DEFAULT_CATALOG.items()
+            for i, name in enumerate(names, 1)
+        ]
+    if path.endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            items = json.load(f)
+        return [
+            Product(sku=str(item["sku"]), brand=item["brand"], name=item["name"])
+            for item in items
+        ]
+    if path.endswith((".db", ".sqlite", ".sqlite3")):
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        conn = sqlite3.connect(path)
+        try:
+            rows = conn.execute("SELECT sku, brand, name FROM products").fetchall()
+        finally:
+            conn.close()
+        return [
+            Product(sku=str(sku), brand=brand, name=name) for sku, brand, name in rows
+        ]
+    raise ValueError(f"Неподдерживаемый формат каталога: {path}")
+
+
+def _mtime(path: str) -> Optional[float]:
+    """Время изменения файла каталога (None - каталог по умолчанию)."""
+    return os.stat(path).st_mtime if path else None
+
+
+class ProductCatalog:
+    """
+    Каталог товаров с перезагрузкой без перезапуска бота.
+
+    Фоновая задача раз в reload_interval секунд проверяет время изменения
+    файла каталога. Новый индекс строится в отдельном потоке и подменяется
+    одним присваиванием: поиск, начатый по старому индексу, доходит до
+    конца по нему, а новые запросы сразу видят новый. Если новый файл
+    не загрузился, продолжает работать прежний индекс.
+    """
+
+    def __init__(self, path: str = "", reload_interval: float = 60) -> None:
+        """
+        Загрузка каталога.
+
+        Args:
+            path: Путь к файлу каталога (см. load_products)
+            reload_interval: Период проверки файла на изменения, в секундах
+        """
+        self._path = path
+        self._reload_interval = reload_interval
+        self._mtime = _mtime(path)
+        self._index = CatalogIndex(load_products(path))
+        self._watcher: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_settings(cls) -> "ProductCatalog":
+        """Создание каталога по настройкам приложения."""
+        settings = get_settings()
+        return cls(settings.CATALOG_PATH, settings.CATALOG_RELOAD_INTERVAL)
+
+    @property
+    def index(self) -> CatalogIndex:
+        """Текущий индекс каталога."""
+        return self._index
+
+    def lookup(self, text: str) -> CatalogMatch:
+        """Поиск бренда и модели в тексте (см. CatalogIndex.lookup)."""
+        return self._index.lookup(text)
+
+    def reload(self) -> bool:
+        """
+        Перезагрузка каталога, если файл изменился.
+
+        Returns:
+            bool: True, если индекс заменён
+        """
+        mtime = _mtime(self._path)
+        if mtime == self._mtime:
+            return False
+        index = CatalogIndex(load_products(self._path))
+        self._index, self._mtime = index, mtime
+        logger.info("Каталог перезагружен", extra={"products": len(index)})
+        return True
+
+    def start(self) -> None:
+        """Запуск периодической проверки файла каталога."""
+        if self._path and self._reload_interval > 0 and self._watcher is None:
+            self._watcher = asyncio.create_task(self._run_watcher())
+
+    async def close(self) -> None:
+        """Остановка проверки файла каталога."""
+        if self._watcher is not None:
+            self._watcher.cancel()
+            try:
+                await self._watcher
+            except asyncio.CancelledError:
+                pass
+            self._watcher = None
+
+    async def _run_watcher(self) -> None:
+        """Фоновая перезагрузка каталога при изменении файла."""
+        while True:
+            await asyncio.sleep(self._reload_interval)
+            try:
+                await asyncio.to_thread(self.reload)
+            except Exception:
+                ERRORS.inc(source="catalog")
+                logger.exception(
+                    "Не удалось перезагрузить каталог, используется прежний"
+                )
@@ -1,11 +1,29 @@
 """Сервис для работы с чат-моделями."""
-from typing import List
-from langchain.schema import AIMessage, HumanMessage, SystemMessage
-from langchain_community.chat_models import GigaChat
-from src.core.config import get_settings
-from dataclasses import dataclass
-from gigachat import GigaChat
-from gigachat.models import Chat, Messages
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Type, Union
+
+from src.constants.prompts import SYSTEM_PROMPT
+from src.core.config import Settings, get_settings
+from src.core.metrics import LLM_REQUEST_TOKENS
+from src.models.chat_message import AIMessage, HumanMessage, SystemMessage
+from src.services.gigachat_client import GigaChatClient
+from src.services.response_cache import normalize_message
+from src.services.store_flusher import run_store_flusher
+from src.utils.sqlite_kv import SqliteKVStore
+from src.utils.ttl_cache import TTLCache
+
+HistoryMessage = Union[HumanMessage, AIMessage]
+PayloadKey = Tuple[Tuple[str, str], ...]
+
+# Сколько символов реплики попадает в краткое содержание диалога
+SUMMARY_CLIENT_CHARS = 200
+SUMMARY_ASSISTANT_CHARS = 100
+SUMMARY_HEADER = "Кратко о предыдущей части диалога:"
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -15,18 +33,152 @@ class ChatSession:
     role_id: str = "1"     # ID роли по умолчанию
 
 
+def estimate_tokens(text: str) -> int:
+    """Грубая оценка количества токенов в тексте (~3 символа на токен)."""
+    return len(text) // 3 + 1
+
+
+def _shorten(text: str, limit: int) -> str:
+    """Обрезка текста до limit символов по границе слова."""
+    text = " ".join(text.split())
+    if len(text) <= limit:
+        return text
+    return text[:limit].rsplit(" ", 1)[0] + "…"
+
+
+@dataclass
+class ConversationHistory:
+    """
+    История диалога одного пользователя.
+
+    Сообщения, не поместившиеся в окно, не теряются бесследно: их короткие
+    выдержки копятся в кратком содержании (summary), которое отправляется
+    вместе с системным промптом и само ограничено по токенам.
+    """
+    messages: List[HistoryMessage] = field(default_factory=list)
+    tokens: int = 0
+    summary: List[str] = field(default_factory=list)
+    summary_tokens: int = 0
+
+    def add(self, message: HistoryMessage) -> None:
+        """Добавление сообщения в историю."""
+        self.messages.append(message)
+        self.tokens += estimate_tokens(message.content)
+
+    def trim(
+        self, max_turns: int, max_tokens: int, summary_max_tokens: int = 0
+    ) -> None:
+        """
+        Отбрасывание старых сообщений сверх окна по ходам и токенам.
+
+        Последнее сообщение остаётся всегда. Отброшенные сообщения
+        сворачиваются в краткое содержание, если summary_max_tokens > 0.
+        """
+        max_messages = max_turns * 2
+        while len(self.messages) > 1 and (
+            len(self.messages) > max_messages or self.tokens > max_tokens
+        ):
+            removed = self.messages.pop(0)
+            self.tokens -= estimate_tokens(removed.content)
+            if summary_max_tokens > 0:
+                self._summarize(removed, summary_max_tokens)
+
+    def _summarize(self, message: HistoryMessage, max_tokens: int) -> None:
+        """Добавление выдержки из сообщения в краткое содержание."""
+        if isinstance(message, AIMessage):
+            line = "Консультант: " + _shorten(message.content, SUMMARY_ASSISTANT_CHARS)
+        else:
+            line = "Клиент: " + _shorten(message.content, SUMMARY_CLIENT_CHARS)
+        self.summary.append(line)
+        self.summary_tokens += estimate_tokens(line)
+        # Самые старые выдержки вытесняются первыми
+        while len(self.summary) > 1 and self.summary_tokens > max_tokens:
+            self.summary_tokens -= estimate_tokens(self.summary.pop(0))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Преобразование истории в словарь для сохранения."""
+        return {
+            "messages": [
+                msg.to_payload() for msg in self.messages
+            ],
+            "summary": self.summary,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ConversationHistory":
+        """Восстановление истории из словаря."""
+        history = cls()
+        for item in data.get("messages", []):
+            message_class: Type[HistoryMessage] = (
+                AIMessage if item["role"] == "assistant" else HumanMessage
+            )
+            history.add(message_class(content=item["content"]))
+        for line in data.get("summary", []):
+            history.summary.append(line)
+            history.summary_tokens += estimate_tokens(line)
+        return history
+
+
 class ChatService:
     """Сервис для работы с чат-моделями."""
 
-    def __init__(self) -> None:
-        """Инициализация сервиса."""
-        self._chat = GigaChat(
-            credentials=get_settings().GIGACHAT_TOKEN,
-            verify_ssl_certs=False
+    def __init__(
+        self,
+        client: Optional[GigaChatClient] = None,
+        store: Optional[SqliteKVStore] = None,
+    ) -> None:
+        """
+        Инициализация сервиса.
+
+        Args:
+            client: Общий клиент GigaChat; по умолчанию создаётся по настройкам
+            store: Общее хранилище историй; по умолчанию - файл HISTORY_DB_PATH,
+                если он задан, иначе истории хранятся только в памяти
+        """
+        settings = get_settings()
+        self._chat = client or GigaChatClient(
+            credentials=settings.GIGACHAT_TOKEN,
+            max_concurrency=settings.GIGACHAT_MAX_CONCURRENCY,
+            max_retries=settings.GIGACHAT_MAX_RETRIES,
+            timeout=settings.GIGACHAT_TIMEOUT,
+        )
+        self._apply_history_settings(settings)
+        if store is None and settings.HISTORY_DB_PATH:
+            store = SqliteKVStore(settings.HISTORY_DB_PATH, table="conversations")
+        self._store = store
+        self._flush_interval = settings.STATE_FLUSH_INTERVAL
+        self._retention = settings.STATE_RETENTION
+        self._purge_interval = settings.STATE_PURGE_INTERVAL
+        self._flusher: Optional[asyncio.Task] = None
+        # Истории по user_id; простаивающие дольше TTL вытесняются из памяти
+        # и при наличии хранилища загружаются из него при следующем обращении
+        self._histories: TTLCache[int, ConversationHistory] = TTLCache(
+            max_size=settings.HISTORY_MAX_USERS,
+            ttl=settings.HISTORY_IDLE_TTL,
         )
-        self._messages: List[HumanMessage | AIMessage | SystemMessage] = []
+        self._system_message = SystemMessage(content="")
         self._init_system_prompt()
         self._session = ChatSession()
+        # Выполняющиеся запросы к GigaChat по ключу запроса
+        self._inflight: Dict[PayloadKey, "asyncio.Future[str]"] = {}
+
+    def _apply_history_settings(self, settings: Settings) -> None:
+        """Окно истории и бюджет запроса к GigaChat."""
+        self._max_turns = settings.HISTORY_MAX_TURNS
+        self._max_tokens = settings.HISTORY_MAX_TOKENS
+        self._request_max_tokens = settings.REQUEST_MAX_TOKENS
+        self._summary_tokens = settings.HISTORY_SUMMARY_TOKENS
+
+    def apply_settings(self, settings: Settings) -> None:
+        """
+        Применение перечитанных настроек.
+
+        Меняются окно истории, бюджет запроса и число повторов запросов
+        к GigaChat; хранилище историй и соединения с GigaChat остаются
+        прежними до перезапуска.
+        """
+        self._apply_history_settings(settings)
+        self._chat.set_max_retries(settings.GIGACHAT_MAX_RETRIES)
 
     def get_session(self) -> ChatSession:
         """Получение текущей сессии."""
@@ -34,82 +186,219 @@ class ChatService:
 
     def _init_system_prompt(self) -> None:
         """Инициализация системного промпта."""
-        system_prompt = """Ты - дружелюбный консультант по продажам телефонов. 
-        Строго следуй этим правилам при общении:
-        
-        1. СТИЛЬ ОБЩЕНИЯ:
-        - НЕ ИСПОЛЬЗУЙ приветствие "Здравствуйте" в ответах
-        - Если клиент указал модель телефона, сразу переходи к уточнению деталей
-        - При получении модели телефона спроси о желаемых характеристиках
-        - Используй фразы "Отличный выбор!", "Хороший выбор!"
-        
-        2. ПОСЛЕДОВАТЕЛЬНОСТЬ ДИАЛОГА:
-        - При указании модели: "Отличный выбор! Какие характеристики вас интересуют (память, цвет)?"
-        - При готовности к покупке: "Отлично! Для оформления заказа, пожалуйста, представьтесь - ка могу к вам обращаться?"
-        - После получения имени: "Спасибо, {имя}! Теперь, пожалуйста, укажите ваш контактный номер телефона"
-        - После получения телефона: "Спасибо, {имя}. Ваш заказ принят. Мы свяжемся с вами в ближайшее время для подтверждения деталей."
-        
-        3. ВАЖНО:
-        - НИКОГДА не повторяй приветствие в ответах
-        - Сразу реагируй на указанную модель телефона
-        - Строго следуй последовательности: модель -> характеристики -> имя -> телефон
-        
-        4. ОФОРМЛЕНИЕ ЗАКАЗА:
-        - Когда клиент говорит о покупке или оформлении, скажи:
-          "Отлично! Для оформления заказа, пожалуйста, представьтесь - как могу к вам обращаться?"
-        - После получения имени скажи:
-          "Спасибо, {имя}! Теперь, пожалуйста, укажите ваш контактный номер еелфона"
-        
-        5. ВАЖНО:
-        - НЕ спрашивай адрес доставки
-        - НЕ спрашивай номер карты
-        - ТОЛЬКО имя и номер телефона для связи
-        - Если клиент хочет сразу оформить заказ, всё равно сначала спроси имя, потом телефон
-        
-        6. ЗАПРЕЩЕНО:
-        - Пропускать этап получения имени
-        - Пропускать этап получения номера телефона
-        - Спрашивать что-либо кроме имени и телефона при оформлении
-        
-        7. ФОРМАТЫ НОМЕРА ТЕЛЕФОНА:
-        - Принимай любой формат: +7XXX, 8XXX, без кода
-        - Главное - получить номер для связи
-        
-        Помни: твоя главная задача - получить имя клиента и номер телефона для оформления заказа!"""
-        
-        self._messages = [SystemMessage(content=system_prompt)]
-
-    async def generate_response(self, message: str) -> str:
-        """Генерация ответа с помощью GigaChat."""
-        self._messages.append(HumanMessage(content=message))
-        
+        self._system_message = SystemMessage(content=SYSTEM_PROMPT)
+
+    def get_history(self, user_id: int) -> ConversationHistory:
+        """Получение истории диалога пользователя."""
+        history = self._histories.get(user_id)
+        if history is None:
+            data = self._store.get(user_id) if self._store is not None else None
+            history = self._decode_history(data)
+            self._histories.set(user_id, history)
+        return history
+
+    async def load_history(self, user_id: int) -> ConversationHistory:
+        """
+        Получение истории с загрузкой из хранилища в отдельном потоке.
+
+        Чтение базы при промахе по памяти не блокирует цикл событий.
+        """
+        history = self._histories.get(user_id)
+        if history is None:
+            data = None
+            if self._store is not None:
+                data = await asyncio.to_thread(self._store.get, user_id)
+            # Пока шло чтение, история могла появиться в памяти
+            history = self._histories.get(user_id) or self._decode_history(data)
+            self._histories.set(user_id, history)
+        return history
+
+    @staticmethod
+    def _decode_history(data: Optional[Union[str, bytes]]) -> ConversationHistory:
+        """Восстановление истории из значения хранилища."""
+        if data is None:
+            return ConversationHistory()
+        return ConversationHistory.from_dict(json.loads(data))
+
+    def _save_history(self, user_id: int, history: ConversationHistory) -> None:
+        """Фиксация изменений истории в хранилище."""
+        if self._store is not None:
+            self._store.put(user_id, json.dumps(history.to_dict(), ensure_ascii=False))
+
+    def _prepare_payload(
+        self, history: ConversationHistory, message: str, context: Optional[str]
+    ) -> Dict[str, Any]:
+        """
+        Добавление сообщения в историю и формирование запроса к GigaChat.
+
+        Системный промпт, контекст этапа и краткое содержание диалога
+        отправляются всегда; история получает остаток бюджета запроса
+        REQUEST_MAX_TOKENS, а не поместившиеся сообщения сворачиваются
+        в краткое содержание.
+        """
+        system_content = self._system_message.content
+        if context:
+            system_content = f"{system_content}\n\n{context}"
+        user_message = HumanMessage(content=message)
+        history.add(user_message)
+        self._trim(
+            history,
+            self._request_max_tokens
+            - estimate_tokens(system_content)
+            - self._summary_tokens,
+        )
+        if history.summary:
+            system_content += f"\n\n{SUMMARY_HEADER}\n" + "\n".join(history.summary)
+        system_message = SystemMessage(content=system_content)
+        LLM_REQUEST_TOKENS.observe(estimate_tokens(system_content) + history.tokens)
+
         # Преобразуем сообщения в формат GigaChat
-        payload = {
+        return {
             "messages": [
-                {
-                    "role": "system" if isinstance(msg, SystemMessage) else 
-                            "assistant" if isinstance(msg, AIMessage) else "user",
-                    "content": msg.content
-                }
-                for msg in self._messages
+                msg.to_payload() for msg in [system_message, *history.messages]
             ]
         }
-        
-        # Отправляем в правильном формате
-        response = await self._chat.achat(payload)
-        
-        # Извлекаем текст из ответа
-        response_text = response.choices[0].message.content
-        
+
+    def _trim(self, history: ConversationHistory, budget: Optional[int] = None) -> None:
+        """Ограничение истории окном HISTORY_MAX_* и бюджетом токенов."""
+        max_tokens = self._max_tokens
+        if budget is not None:
+            max_tokens = max(1, min(max_tokens, budget))
+        history.trim(self._max_turns, max_tokens, self._summary_tokens)
+
+    async def generate_response(
+        self, message: str, user_id: int, context: Optional[str] = None
+    ) -> str:
+        """
+        Генерация ответа с помощью GigaChat.
+
+        Args:
+            message: Сообщение пользователя, сохраняется в историю как есть
+            user_id: ID пользователя Telegram
+            context: Контекст текущего этапа диалога; добавляется к системному
+                промпту только для этого запроса и в историю не попадает
+
+        Returns:
+            str: Текст ответа модели
+        """
+        history = await self.load_history(user_id)
+        payload = self._prepare_payload(history, message, context)
+        response_text = await self._complete_once(payload)
+
         # Добавляем ответ в историю
-        self._messages.append(AIMessage(content=response_text))
-        
+        history.add(AIMessage(content=response_text))
+        self._trim(history)
+        self._save_history(user_id, history)
+
         return response_text
 
-    def reset_conversation(self) -> None:
-        """Сброс истории диалога."""
-        self._messages = []
-        self._init_system_prompt()
+    async def _complete_once(self, payload: Dict[str, Any]) -> str:
+        """
+        Запрос ответа с объединением одинаковых одновременных запросов.
+
+        Если такой же запрос (та же история, контекст и нормализованное
+        сообщение) уже выполняется, ждём его результата вместо нового
+        обращения к GigaChat. Отмена одного из ожидающих не прерывает
+        запрос для остальных.
+        """
+        key = self._payload_key(payload)
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._complete(payload))
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._finish_inflight(key, done))
+        return await asyncio.shield(future)
+
+    async def _complete(self, payload: Dict[str, Any]) -> str:
+        """Запрос ответа у GigaChat."""
+        response = await self._chat.achat(payload)
+        return response.choices[0].message.content
+
+    def _finish_inflight(self, key: PayloadKey, future: "asyncio.Future[str]") -> None:
+        """Удаление завершённого запроса из списка выполняющихся."""
+        self._inflight.pop(key, None)
+        if not future.cancelled():
+            # Ошибку получают ожидающие; здесь только помечаем её обработанной
+            future.exception()
+
+    @staticmethod
+    def _payload_key(payload: Dict[str, Any]) -> PayloadKey:
+        """Ключ запроса: сообщения с нормализованной последней репликой."""
+        messages = payload["messages"]
+        key = [(msg["role"], msg["content"]) for msg in messages[:-1]]
+        last = messages[-1]
+        key.append((last["role"], normalize_message(last["content"])))
+        return tuple(key)
+
+    async def stream_response(
+        self, message: str, user_id: int, context: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Потоковая генерация ответа с помощью GigaChat.
+
+        Аргументы те же, что у generate_response. Возвращает фрагменты текста
+        по мере генерации; полный ответ попадает в историю после завершения.
+        """
+        history = await self.load_history(user_id)
+        payload = self._prepare_payload(history, message, context)
+
+        parts: List[str] = []
+        async for chunk in self._chat.astream(payload):
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                yield delta
+
+        history.add(AIMessage(content="".join(parts)))
+        self._trim(history)
+        self._save_history(user_id, history)
+
+    def remember_exchange(self, user_id: int, message: str, response: str) -> None:
+        """Добавление в историю ответа, полученного без обращения к GigaChat."""
+        history = self.get_history(user_id)
+        history.add(HumanMessage(content=message))
+        history.add(AIMessage(content=response))
+        self._trim(history)
+        self._save_history(user_id, history)
+
+    def reset_conversation(self, user_id: int) -> None:
+        """Сброс истории диалога пользователя."""
+        self._histories.pop(user_id)
+        if self._store is not None:
+            self._store.delete(user_id)
+
+    def history_size(self) -> int:
+        """Общее количество сообщений в хранимых историях."""
+        return sum(len(history.messages) for _, history in self._histories.items())
+
+    def active_conversations(self) -> int:
+        """Количество хранимых историй диалогов."""
+        self._histories.evict_expired()
+        return len(self._histories)
+
+    def start(self) -> None:
+        """Запуск периодической записи историй в хранилище."""
+        if self._store is not None and self._flusher is None:
+            self._flusher = asyncio.create_task(run_store_flusher(
+                self._store,
+                self._flush_interval,
+                self._purge_interval,
+                self._retention,
+                source="history_store",
+            ))
+
+    async def close(self) -> None:
+        """Запись историй в хранилище и закрытие соединений с GigaChat."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        if self._store is not None:
+            await asyncio.to_thread(self._store.close)
+        await self._chat.aclose()
 
     def set_session_params(self, data: dict) -> None:
         """Установка параметров сессии."""
@@ -0,0 +1,233 @@
+"""Общий клиент GigaChat с ограничением нагрузки и повторами запросов."""
+import asyncio
+import random
+import time
+from typing import (
+    TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Dict, Optional, TypeVar
+)
+
+import httpx
+
+from src.core.metrics import ERRORS, LLM_REQUEST_SECONDS
+
+if TYPE_CHECKING:
+    from gigachat import GigaChat
+    from gigachat.models import ChatCompletion, ChatCompletionChunk
+
+T = TypeVar("T")
+
+# Коды ответа, при которых запрос имеет смысл повторить
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# За сколько секунд до истечения токена запрашивать новый
+TOKEN_REFRESH_MARGIN = 60
+
+
+class GigaChatClient:
+    """
+    Клиент GigaChat, общий для всех запросов бота.
+
+    Поверх клиента библиотеки gigachat добавляет:
+    - ограничение числа одновременных запросов семафором (под него же
+      настроен пул соединений);
+    - заблаговременное обновление OAuth-токена: сколько бы запросов ни
+      пришло одновременно, токен запрашивается один раз;
+    - повтор запросов при ответах 429/5xx и сетевых ошибках
+      с экспоненциальной задержкой и случайным разбросом.
+
+    Библиотека gigachat импортируется при первом запросе, а не при запуске
+    бота: процесс-диспетчер и запуск до первого сообщения обходятся без неё.
+    """
+
+    def __init__(
+        self,
+        credentials: str,
+        max_concurrency: int = 8,
+        max_retries: int = 3,
+        retry_base_delay: float = 1.0,
+        retry_max_delay: float = 30.0,
+        timeout: float = 30.0,
+        client: Optional["GigaChat"] = None,
+    ) -> None:
+        """
+        Инициализация клиента.
+
+        Args:
+            credentials: Ключ авторизации GigaChat
+            max_concurrency: Максимум одновременных запросов к GigaChat
+            max_retries: Число повторов запроса после первой неудачи
+            retry_base_delay: Базовая задержка перед повтором, в секундах
+            retry_max_delay: Максимальная задержка перед повтором, в секундах
+            timeout: Таймаут запроса, в секундах
+            client: Готовый клиент библиотеки gigachat (для тестов)
+        """
+        self._client = client
+        self._client_options: Dict[str, Any] = {
+            "credentials": credentials,
+            "verify_ssl_certs": False,
+            "timeout": timeout,
+            "max_connections": max_concurrency,
+        }
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._max_retries = max_retries
+        self._retry_base_delay = retry_base_delay
+        self._retry_max_delay = retry_max_delay
+        # Время истечения токена (Unix-время в секундах); 0 - токена ещё нет
+        self._token_expires_at = 0.0
+        self._token_lock = asyncio.Lock()
+
+    @property
+    def client(self) -> "GigaChat":
+        """Клиент библиотеки gigachat; создаётся при первом обращении."""
+        if self._client is None:
+            from gigachat import GigaChat
+
+            self._client = GigaChat(**self._client_options)
+        return self._client
+
+    def set_max_retries(self, max_retries: int) -> None:
+        """Смена числа повторов для последующих запросов."""
+        self._max_retries = max_retries
+
+    async def achat(self, payload: Dict[str, Any]) -> "ChatCompletion":
+        """Запрос ответа модели."""
+        with LLM_REQUEST_SECONDS.time(method="chat"):
+            try:
+                return await self._with_retries(lambda: self.client.achat(payload))
+            except Exception:
+                ERRORS.inc(source="gigachat")
+                raise
+
+    async def astream(
+        self, payload: Dict[str, Any]
+    ) -> AsyncIterator["ChatCompletionChunk"]:
+        """
+        Потоковый запрос ответа модели.
+
+        Поток читается отдельной задачей в очередь, поэтому место
+        в семафоре освобождается, как только модель закончила ответ,
+        а не когда потребитель (например, правки сообщения в Telegram)
+        дочитал его. Повторяется только запрос, не успевший вернуть
+        ни одного фрагмента: начатый ответ уже мог быть частично показан
+        пользователю.
+        """
+        with LLM_REQUEST_SECONDS.time(method="stream"):
+            attempt = 0
+            while True:
+                await self._ensure_token()
+                chunks: "asyncio.Queue[Optional[ChatCompletionChunk]]" = (
+                    asyncio.Queue()
+                )
+                reader = asyncio.create_task(self._read_stream(payload, chunks))
+                started = False
+                try:
+                    while True:
+                        chunk = await chunks.get()
+                        if chunk is None:
+                            break
+                        started = True
+                        yield chunk
+                    await reader
+                    return
+                except Exception as e:
+                    if started or not self._should_retry(e, attempt):
+                        ERRORS.inc(source="gigachat")
+                        raise
+                finally:
+                    if not reader.done():
+                        # Потребитель прекратил чтение - запрос больше не нужен
+                        reader.cancel()
+                    elif not reader.cancelled():
+                        # Ошибка уже обработана выше или потребитель ушёл раньше
+                        reader.exception()
+                await asyncio.sleep(self._retry_delay(attempt))
+                attempt += 1
+
+    async def _read_stream(
+        self,
+        payload: Dict[str, Any],
+        chunks: "asyncio.Queue[Optional[ChatCompletionChunk]]",
+    ) -> None:
+        """Чтение потокового ответа под семафором; None в очереди - конец."""
+        try:
+            async with self._semaphore:
+                async for chunk in self.client.astream(payload):
+                    chunks.put_nowait(chunk)
+        finally:
+            chunks.put_nowait(None)
+
+    async def aclose(self) -> None:
+        """Закрытие соединений."""
+        if self._client is not None:
+            await self._client.aclose()
+
+    async def _with_retries(self, call: Callable[[], Awaitable[T]]) -> T:
+        """Выполнение запроса под семафором с повторами при временных ошибках."""
+        attempt = 0
+        while True:
+            await self._ensure_token()
+            try:
+                async with self._semaphore:
+                    return await call()
+            except Exception as e:
+                if not self._should_retry(e, attempt):
+                    raise
+            # Задержка выдерживается вне семафора, чтобы не занимать слот
+            await asyncio.sleep(self._retry_delay(attempt))
+            attempt += 1
+
+    async def _ensure_token(self) -> None:
+        """
+        Обновление токена до истечения его срока.
+
+        Конкурирующие запросы ждут одного обновления под общей блокировкой,
+        а не получают 401 и не обновляют токен каждый по отдельности.
+        """
+        if self._token_valid():
+            return
+        async with self._token_lock:
+            if self._token_valid():
+                return
+            # Клиент библиотеки считает токен годным, пока не получит 401,
+            # поэтому истекающий токен сбрасываем явно
+            self._drop_library_token()
+            token = await self.client.aget_token()
+            self._token_expires_at = token.expires_at / 1000 if token else 0.0
+
+    def _drop_library_token(self) -> None:
+        """
+        Сброс токена, сохранённого клиентом библиотеки.
+
+        Открытого способа для этого в gigachat нет, поэтому закрытый метод
+        вызывается, только если он есть; иначе сбрасывается сам токен.
+        Если изменилось и это, токен обновит клиент библиотеки после 401.
+        """
+        reset = getattr(self.client, "_reset_token", None)
+        if callable(reset):
+            reset()
+        elif hasattr(self.client, "_access_token"):
+            self.client._access_token = None
+
+    def _token_valid(self) -> bool:
+        """Действует ли токен с запасом TOKEN_REFRESH_MARGIN."""
+        return self._token_expires_at - TOKEN_REFRESH_MARGIN > time.time()
+
+    def _should_retry(self, error: Exception, attempt: int) -> bool:
+        """Нужно ли повторять запрос после ошибки."""
+        if attempt >= self._max_retries:
+            return False
+        # К этому моменту библиотека уже загружена клиентом
+        from gigachat.exceptions import AuthenticationError, ResponseError
+
+        if isinstance(error, AuthenticationError):
+            # Повторную авторизацию после 401 выполняет сам клиент библиотеки
+            return False
+        if isinstance(error, ResponseError):
+            status = error.args[1] if len(error.args) > 1 else None
+            return status in RETRY_STATUSES
+        return isinstance(error, httpx.TransportError)
+
+    def _retry_delay(self, attempt: int) -> float:
+        """Задержка перед повтором: экспонента со случайным разбросом."""
+        delay = min(self._retry_max_delay, self._retry_base_delay * 2 ** attempt)
+        return random.uniform(delay / 2, delay)
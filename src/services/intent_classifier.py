@@ -0,0 +1,101 @@
+"""Локальный классификатор намерений клиента."""
+import re
+import zlib
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+from src.constants.intents import INTENT_EXAMPLES, Intent
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Размерность вектора признаков (число корзин хеширования)
+FEATURE_DIM = 2048
+
+# Слова и знак вопроса: он отличает вопрос о модели от её названия
+_WORD = re.compile(r"[a-zа-я0-9]+|\?")
+
+# Вес знака вопроса относительно одного слова или триграммы
+QUESTION_MARK_WEIGHT = 3
+
+
+def _features(text: str) -> List[int]:
+    """
+    Номера признаков сообщения: слова и символьные триграммы слов.
+
+    Цифры заменяются нулями, чтобы "айфон 14" и "айфон 15" имели
+    одинаковые признаки. Признаки хешируются crc32, а не hash():
+    результат не зависит от PYTHONHASHSEED.
+    """
+    text = re.sub(r"\d", "0", text.lower().replace("ё", "е"))
+    features: List[int] = []
+    for word in _WORD.findall(text):
+        if word == "?":
+            features.extend([zlib.crc32(b"w:?") % FEATURE_DIM] * QUESTION_MARK_WEIGHT)
+            continue
+        features.append(zlib.crc32(f"w:{word}".encode()) % FEATURE_DIM)
+        padded = f"^{word}$"
+        for i in range(len(padded) - 2):
+            features.append(zlib.crc32(padded[i:i + 3].encode()) % FEATURE_DIM)
+    return features
+
+
+class IntentClassifier:
+    """
+    Классификатор намерений по ближайшему примеру.
+
+    Сообщение превращается в нормированный вектор хешированных признаков,
+    который сравнивается со всеми примерами одним умножением матрицы
+    на вектор. Для каждого намерения берётся близость самого похожего
+    примера; уверенность - отрыв лучшего намерения от второго, поэтому
+    сообщение, одинаково похожее на вопрос и на название модели
+    ("айфон 15 или 14, что лучше?"), получает низкую уверенность.
+    Обучение - построение матрицы примеров при создании классификатора,
+    без внешних файлов модели.
+    """
+
+    def __init__(self, examples: Optional[Dict[Intent, Sequence[str]]] = None) -> None:
+        """
+        Построение матрицы примеров.
+
+        Args:
+            examples: Примеры сообщений по намерениям (по умолчанию INTENT_EXAMPLES)
+        """
+        import numpy as np
+
+        by_intent = examples or INTENT_EXAMPLES
+        self._intents: List[Intent] = []
+        # Номер первого примера каждого намерения в матрице
+        self._starts: List[int] = []
+        rows: List["np.ndarray"] = []
+        for intent, texts in by_intent.items():
+            self._intents.append(intent)
+            self._starts.append(len(rows))
+            rows.extend(self._vector(text) for text in texts)
+        self._examples = np.vstack(rows)
+
+    def classify(self, text: str) -> Tuple[Intent, float]:
+        """
+        Определение намерения.
+
+        Args:
+            text: Текст сообщения
+
+        Returns:
+            Tuple[Intent, float]: Намерение и уверенность от 0 до 1
+        """
+        import numpy as np
+
+        similarities = np.maximum.reduceat(
+            self._examples @ self._vector(text), self._starts
+        )
+        second, best = np.argsort(similarities)[-2:]
+        return self._intents[best], float(similarities[best] - similarities[second])
+
+    @staticmethod
+    def _vector(text: str) -> "np.ndarray":
+        """Нормированный вектор признаков."""
+        import numpy as np
+
+        vector = np.bincount(_features(text), minlength=FEATURE_DIM).astype(np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
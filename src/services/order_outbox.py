@@ -0,0 +1,142 @@
+"""Локальная очередь заказов, ожидающих отправки в API."""
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+
+@dataclass
+class OutboxEntry:
+    """Заказ из очереди на отправку."""
+    id: int
+    payload: Dict[str, Any]
+    attempts: int
+
+
+class OrderOutbox:
+    """
+    Очередь заказов на SQLite.
+
+    Заказ сначала надёжно записывается на диск и только потом отправляется,
+    поэтому недоступность API не приводит к потере заказов. Методы
+    синхронные и рассчитаны на вызов через asyncio.to_thread.
+    """
+
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+
+    def __init__(self, path: str) -> None:
+        """
+        Инициализация очереди.
+
+        Args:
+            path: Путь к файлу базы SQLite; файл создаётся при первом обращении
+        """
+        self._path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Открытие базы и создание таблицы при первом обращении."""
+        if self._conn is None:
+            conn = sqlite3.connect(self._path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=FULL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS orders (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_error TEXT
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS orders_due "
+                "ON orders (status, next_attempt_at)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def add(self, request: Any) -> int:
+        """Запись заказа (dataclass) в очередь; возвращает ID записи."""
+        now = time.time()
+        payload = json.dumps(asdict(request), ensure_ascii=False)
+        with self._lock:
+            conn = self._connect()
+            cursor = conn.execute(
+                "INSERT INTO orders (payload, status, next_attempt_at, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                (payload, self.PENDING, now, now),
+            )
+            conn.commit()
+            return int(cursor.lastrowid or 0)
+
+    def due(self, limit: int, now: Optional[float] = None) -> List[OutboxEntry]:
+        """Заказы, которые пора отправить (в порядке поступления)."""
+        now = time.time() if now is None else now
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT id, payload, attempts FROM orders "
+                "WHERE status = ? AND next_attempt_at <= ? ORDER BY id LIMIT ?",
+                (self.PENDING, now, limit),
+            ).fetchall()
+        return [
+            OutboxEntry(id=row[0], payload=json.loads(row[1]), attempts=row[2])
+            for row in rows
+        ]
+
+    def mark_sent(self, ids: Sequence[int]) -> None:
+        """Отметка заказов как успешно отправленных."""
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "UPDATE orders SET status = ?, last_error = NULL WHERE id = ?",
+                [(self.SENT, entry_id) for entry_id in ids],
+            )
+            conn.commit()
+
+    def mark_retry(self, entry_id: int, next_attempt_at: float, error: str) -> None:
+        """Перенос отправки заказа на более позднее время."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "UPDATE orders SET attempts = attempts + 1, next_attempt_at = ?, "
+                "last_error = ? WHERE id = ?",
+                (next_attempt_at, error, entry_id),
+            )
+            conn.commit()
+
+    def mark_failed(self, entry_id: int, error: str) -> None:
+        """Отметка заказа, который API окончательно отклонил."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "UPDATE orders SET status = ?, attempts = attempts + 1, "
+                "last_error = ? WHERE id = ?",
+                (self.FAILED, error, entry_id),
+            )
+            conn.commit()
+
+    def pending_count(self) -> int:
+        """Количество неотправленных заказов."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT COUNT(*) FROM orders WHERE status = ?", (self.PENDING,)
+            ).fetchone()
+        return int(row[0])
+
+    def close(self) -> None:
+        """Закрытие соединения с базой."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
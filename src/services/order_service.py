@@ -1,8 +1,18 @@
+import asyncio
+import logging
+import random
+import time
 from dataclasses import dataclass
-import requests
-from src.core.config import get_settings
+from typing import List, Optional
+import httpx
+from src.core.config import Settings, get_settings, worker_path
+from src.core.metrics import ERRORS, ORDER_SUBMIT_SECONDS
 from src.models.dialog_state import OrderData
 from src.services.chat_service import ChatService
+from src.services.order_outbox import OrderOutbox, OutboxEntry
+
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class OrderRequest:
@@ -13,16 +23,98 @@ class OrderRequest:
     platform_id: str
     role_id: str
 
+
+class OrderRejectedError(ValueError):
+    """API окончательно отклонило заказ; повторная отправка бессмысленна."""
+
+
+def is_rejection(status: int) -> bool:
+    """
+    Ответ API, после которого заказ не отправляется повторно.
+
+    Ошибки клиента 4xx окончательны, кроме 408 (таймаут запроса) и 429
+    (превышена частота запросов): после них запрос можно повторить.
+    """
+    return 400 <= status < 500 and status not in (408, 429)
+
+
 class OrderService:
-    """Сервис для работы с заказами."""
+    """
+    Сервис для работы с заказами.
+
+    Создаётся один раз на всё время работы бота. Заказ сначала записывается
+    в локальную очередь (OrderOutbox), а фоновая задача отправляет его в API
+    с повторами и экспоненциальной задержкой. HTTP-клиент с пулом
+    keep-alive соединений переиспользуется всеми заказами, а число
+    одновременных запросов к API ограничено семафором.
+    """
 
-    def __init__(self, chat_service: ChatService) -> None:
+    def __init__(
+        self, chat_service: ChatService, outbox: Optional[OrderOutbox] = None
+    ) -> None:
         """Инициализация сервиса."""
         self._settings = get_settings()
         self._chat_service = chat_service
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore = asyncio.Semaphore(self._settings.ORDER_MAX_CONCURRENCY)
+        # Очередь заказов у каждого процесса-обработчика своя
+        self._outbox = outbox or OrderOutbox(
+            worker_path(self._settings.ORDER_OUTBOX_PATH, self._settings)
+        )
+        self._wakeup = asyncio.Event()
+        self._worker: Optional[asyncio.Task] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Получение общего HTTP-клиента (создаётся при первом запросе)."""
+        if self._client is None:
+            max_connections = self._settings.ORDER_MAX_CONCURRENCY
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self._settings.ORDER_TIMEOUT),
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections,
+                ),
+            )
+        return self._client
+
+    def apply_settings(self, settings: Settings) -> None:
+        """
+        Применение перечитанных настроек.
+
+        Адреса API, таймаут, размер пакета и параметры повторов меняются
+        на ходу; очередь заказов и число одновременных запросов остаются
+        прежними до перезапуска.
+        """
+        self._settings = settings
+        if self._client is not None:
+            self._client.timeout = httpx.Timeout(settings.ORDER_TIMEOUT)
+
+    def start(self) -> None:
+        """Запуск фоновой отправки заказов из очереди."""
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run_worker())
+
+    async def close(self) -> None:
+        """Остановка фоновой отправки и закрытие HTTP-клиента."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        await asyncio.to_thread(self._outbox.close)
+
+    async def create_order(self, order_data: OrderData) -> None:
+        """
+        Создание заказа.
 
-    def create_order(self, order_data: OrderData) -> None:
-        """Создание заказа."""
+        Заказ сохраняется в локальную очередь и считается принятым сразу после
+        записи на диск; отправка в API выполняется фоновой задачей.
+        """
         if not order_data.client_phone or not order_data.client_name:
             raise ValueError("Телефон и имя обязательны для создания заказа")
 
@@ -42,9 +134,110 @@ class OrderService:
             role_id=session.role_id
         )
 
-        self._send_order(request)
+        await asyncio.to_thread(self._outbox.add, request)
+        self._wakeup.set()
 
-    def _send_order(self, request: OrderRequest) -> None:
+    async def _run_worker(self) -> None:
+        """Фоновая отправка заказов из очереди."""
+        while True:
+            try:
+                await self.drain()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Ошибка при отправке заказов из очереди")
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=self._settings.ORDER_POLL_INTERVAL
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def drain(self) -> int:
+        """
+        Отправка заказов, которым подошло время отправки.
+
+        Returns:
+            int: Количество успешно отправленных заказов
+        """
+        sent = 0
+        while True:
+            entries = await asyncio.to_thread(
+                self._outbox.due, self._settings.ORDER_BATCH_SIZE
+            )
+            if not entries:
+                return sent
+            if self._settings.ORDER_BATCH_ENDPOINT:
+                sent += await self._deliver_batch(entries)
+            else:
+                results = await asyncio.gather(
+                    *(self._deliver(entry) for entry in entries)
+                )
+                sent += sum(results)
+            if len(entries) < self._settings.ORDER_BATCH_SIZE:
+                return sent
+
+    async def _deliver(self, entry: OutboxEntry) -> bool:
+        """Отправка одного заказа из очереди с учётом результата."""
+        try:
+            await self._send_order(OrderRequest(**entry.payload))
+        except OrderRejectedError as e:
+            await asyncio.to_thread(self._outbox.mark_failed, entry.id, str(e))
+            return False
+        except ValueError as e:
+            await asyncio.to_thread(
+                self._outbox.mark_retry, entry.id, self._next_attempt_at(entry), str(e)
+            )
+            return False
+        await asyncio.to_thread(self._outbox.mark_sent, [entry.id])
+        return True
+
+    async def _deliver_batch(self, entries: List[OutboxEntry]) -> int:
+        """Отправка пачки заказов одним запросом в ORDER_BATCH_ENDPOINT."""
+        try:
+            async with self._semaphore:
+                with ORDER_SUBMIT_SECONDS.time(mode="batch"):
+                    response = await self._get_client().post(
+                        self._settings.ORDER_BATCH_ENDPOINT,
+                        json={"orders": [entry.payload for entry in entries]},
+                    )
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            ERRORS.inc(source="order_delivery")
+            logger.warning(
+                "Ошибка пакетной отправки заказов: %s",
+                e,
+                extra={"orders": len(entries)},
+            )
+            if isinstance(e, httpx.HTTPStatusError) and is_rejection(
+                e.response.status_code
+            ):
+                error = f"Заказ отклонён сервером: {e}"
+                for entry in entries:
+                    await asyncio.to_thread(self._outbox.mark_failed, entry.id, error)
+                return 0
+            for entry in entries:
+                await asyncio.to_thread(
+                    self._outbox.mark_retry,
+                    entry.id,
+                    self._next_attempt_at(entry),
+                    str(e),
+                )
+            return 0
+        await asyncio.to_thread(
+            self._outbox.mark_sent, [entry.id for entry in entries]
+        )
+        return len(entries)
+
+    def _next_attempt_at(self, entry: OutboxEntry) -> float:
+        """Время следующей попытки: экспоненциальная задержка со случайным разбросом."""
+        base_delay = float(self._settings.ORDER_RETRY_BASE_DELAY)
+        max_delay = float(self._settings.ORDER_RETRY_MAX_DELAY)
+        delay = min(base_delay * 2.0 ** entry.attempts, max_delay)
+        return time.time() + delay * random.uniform(0.5, 1.0)
+
+    async def _send_order(self, request: OrderRequest) -> None:
         """Отправка заказа на сервер."""
         try:
             params = {
@@ -54,19 +247,29 @@ class OrderService:
                 'phone': request.phone,
                 'desc': request.desc,
             }
-            print(f"Отправка заказа с параметрами: {params}")
-            print(f"URL: {self._settings.API_ENDPOINT}")
-            
-            response = requests.get(
-                self._settings.API_ENDPOINT,
-                params=params,
-                timeout=10
+            logger.debug(
+                "Отправка заказа",
+                extra={"url": self._settings.API_ENDPOINT, "params": params},
             )
-            print(f"Ответ сервера: {response.status_code} - {response.text}")
+
+            async with self._semaphore:
+                with ORDER_SUBMIT_SECONDS.time(mode="single"):
+                    response = await self._get_client().get(
+                        self._settings.API_ENDPOINT,
+                        params=params,
+                    )
+            logger.info("Заказ отправлен", extra={"status": response.status_code})
             response.raise_for_status()
-            
-        except requests.RequestException as e:
-            print(f"Ошибка запроса: {e}")
+
+        except httpx.HTTPStatusError as e:
+            ERRORS.inc(source="order_delivery")
+            logger.warning("Ошибка запроса: %s", e)
+            if is_rejection(e.response.status_code):
+                raise OrderRejectedError(f"Заказ отклонён сервером: {e}")
+            raise ValueError(f"Ошибка при отправке заказа: {e}")
+        except httpx.HTTPError as e:
+            ERRORS.inc(source="order_delivery")
+            logger.warning("Ошибка запроса: %s", e)
             raise ValueError(f"Ошибка при отправке заказа: {e}")
 
     def _normalize_phone(self, phone: str) -> str:
@@ -0,0 +1,126 @@
+"""Кэш ответов GigaChat на типовые вопросы."""
+import asyncio
+import re
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple
+
+from src.models.dialog_state import DialogStep
+from src.utils.ttl_cache import TTLCache
+
+_PUNCTUATION = re.compile(r"[^\w\s]+")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_message(message: str) -> str:
+    """Приведение сообщения к виду, не зависящему от регистра и пунктуации."""
+    text = _PUNCTUATION.sub(" ", message.lower().replace("ё", "е"))
+    return _SPACES.sub(" ", text).strip()
+
+
+def make_cache_key(message: str, step: DialogStep, brand: Optional[str]) -> str:
+    """Ключ кэша: этап диалога, бренд и нормализованное сообщение."""
+    return f"{step.name}|{brand or ''}|{normalize_message(message)}"
+
+
+class ResponseCache:
+    """
+    Двухуровневый кэш ответов.
+
+    Первый уровень - LRU в памяти с ограничением времени жизни записей.
+    Второй (необязательный) - таблица SQLite, которая переживает перезапуск
+    и общая для процессов на одной машине. Обращения к диску выполняются
+    в отдельном потоке, чтобы не блокировать цикл событий.
+    """
+
+    def __init__(self, max_size: int, ttl: float, path: str = "") -> None:
+        """
+        Инициализация кэша.
+
+        Args:
+            max_size: Максимальное число ответов в памяти
+            ttl: Время жизни ответа, в секундах
+            path: Путь к файлу SQLite для дискового уровня; пусто - без диска
+        """
+        self._ttl = ttl
+        # Срок жизни записи в памяти отсчитывается от момента её создания
+        self._memory: TTLCache[str, Tuple[float, str]] = TTLCache(
+            max_size=max_size, ttl=ttl
+        )
+        self._path = path
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> Optional[str]:
+        """Получение ответа из кэша."""
+        item = self._memory.get(key)
+        if item is not None:
+            created_at, response = item
+            if time.time() - created_at < self._ttl:
+                return response
+            self._memory.pop(key)
+        if not self._path:
+            return None
+
+        row = await asyncio.to_thread(self._disk_get, key)
+        if row is None:
+            return None
+        self._memory.set(key, row)
+        return row[1]
+
+    async def set(self, key: str, response: str) -> None:
+        """Сохранение ответа в кэш."""
+        item = (time.time(), response)
+        self._memory.set(key, item)
+        if self._path:
+            await asyncio.to_thread(self._disk_set, key, item)
+
+    def close(self) -> None:
+        """Закрытие дискового уровня."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Открытие базы дискового уровня при первом обращении."""
+        if self._db is None:
+            conn = sqlite3.connect(self._path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL"
+                ")"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_created ON responses (created_at)"
+            )
+            conn.commit()
+            self._db = conn
+        return self._db
+
+    def _disk_get(self, key: str) -> Optional[Tuple[float, str]]:
+        """Чтение ответа с диска с учётом срока жизни."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT created_at, response FROM responses "
+                "WHERE key = ? AND created_at > ?",
+                (key, time.time() - self._ttl),
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def _disk_set(self, key: str, item: Tuple[float, str]) -> None:
+        """Запись ответа на диск и удаление устаревших записей."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, created_at, response) "
+                    "VALUES (?, ?, ?)",
+                    (key, *item),
+                )
+                conn.execute(
+                    "DELETE FROM responses WHERE created_at <= ?",
+                    (time.time() - self._ttl,),
+                )
@@ -0,0 +1,148 @@
+"""Извлечение данных заказа из сообщения за один проход."""
+import re
+from dataclasses import dataclass, field
+from typing import FrozenSet, List, Optional
+
+from src.constants.phone_data import PHONE_SPECS, match_keywords
+from src.services.catalog import CatalogMatch, ProductCatalog
+from src.utils.phone_validator import validate_russian_phone
+
+# Последовательности цифр, похожие на номер телефона
+_PHONE_CANDIDATE = re.compile(r"\+?\d[\d\s\-()]{8,16}\d")
+
+# Объём памяти: "256 гб", "1тб", "128gb"
+_MEMORY = re.compile(r"\b\d+\s*(?:гб|гигов|гигабайт|gb|тб|tb)\b", re.IGNORECASE)
+
+# Окончания прилагательных: "черный", "черная", "черного", "черным"...
+_ADJECTIVE_ENDINGS = (
+    "ый", "ий", "ой", "ая", "яя", "ое", "ее", "ые", "ие", "ого", "его",
+    "ому", "ему", "ую", "юю", "ым", "им", "ом", "ем", "ых", "их", "ыми", "ими",
+)
+
+# Части сообщения, в которых перечислены данные
+_SEGMENT_SEPARATORS = re.compile(r"[,;\n]+")
+
+# Слова, которые не могут быть именем клиента
+NOT_A_NAME = frozenset({
+    "да", "нет", "конечно", "хорошо", "ок", "спасибо", "привет",
+    "здравствуйте", "хочу", "давайте", "пожалуйста", "купить",
+})
+
+
+def is_valid_name(text: str) -> bool:
+    """
+    Проверка, что текст похож на имя клиента.
+
+    Args:
+        text: Текст без лишних пробелов
+
+    Returns:
+        bool: True, если это 2-20 символов без цифр, не бренд,
+            не характеристика и не служебное слово
+    """
+    keywords = match_keywords(text)
+    return (
+        2 <= len(text) <= 20
+        and not any(char.isdigit() for char in text)
+        and not keywords.brand
+        and not keywords.specs
+        and text.lower() not in NOT_A_NAME
+    )
+
+
+@dataclass
+class Slots:
+    """Данные заказа, найденные в одном сообщении."""
+    phone_model: Optional[str] = None
+    specifications: Optional[str] = None
+    client_name: Optional[str] = None
+    client_phone: Optional[str] = None
+    # Текст сообщения без найденных телефона и имени
+    remainder: str = field(default="", compare=False)
+    # Результат поиска по каталогу: один на сообщение, его используют
+    # и классификатор, и обновление состояния
+    match: CatalogMatch = field(default_factory=CatalogMatch, compare=False)
+
+    def count(self) -> int:
+        """Количество найденных значений."""
+        return sum(
+            value is not None
+            for value in (
+                self.phone_model,
+                self.specifications,
+                self.client_name,
+                self.client_phone,
+            )
+        )
+
+
+class SlotExtractor:
+    """
+    Поиск модели, характеристик, имени и телефона в одном сообщении.
+
+    Модель ищется по каталогу, характеристики - по объёму памяти и цветам
+    из PHONE_SPECS, телефон проверяется validate_russian_phone. Имя
+    выделяется только из сообщения, разделённого запятыми, в котором есть
+    и другие данные: отдельная часть из одного-двух слов с заглавной буквы,
+    прошедшая is_valid_name ("iPhone 15 256 гб, Иван, 89161234567").
+    """
+
+    def __init__(self, catalog: ProductCatalog) -> None:
+        """Инициализация по каталогу товаров."""
+        self._catalog = catalog
+        # Все формы названий цветов: "черный", "черного", "серая"...
+        self._color_forms: FrozenSet[str] = frozenset(
+            color[:-2] + ending
+            for color in PHONE_SPECS["colors"]
+            for ending in _ADJECTIVE_ENDINGS
+        )
+
+    def extract(self, text: str) -> Slots:
+        """Поиск всех данных заказа в сообщении."""
+        slots = Slots()
+        rest = text
+        for candidate in _PHONE_CANDIDATE.finditer(text):
+            is_valid, phone = validate_russian_phone(candidate.group())
+            if is_valid:
+                slots.client_phone = phone
+                rest = text.replace(candidate.group(), " ")
+                break
+
+        slots.match = self._catalog.lookup(rest)
+        if slots.match.brand:
+            product = slots.match.product
+            slots.phone_model = product.name if product else None
+        slots.specifications = self._extract_specs(rest)
+
+        segments = [s.strip() for s in _SEGMENT_SEPARATORS.split(text) if s.strip()]
+        if len(segments) > 1 and slots.count() > 0:
+            names = (segment for segment in segments if self._looks_like_name(segment))
+            slots.client_name = next(names, None)
+        remainder = [
+            segment.strip()
+            for segment in _SEGMENT_SEPARATORS.split(rest)
+            if segment.strip() and segment.strip() != slots.client_name
+        ]
+        slots.remainder = ", ".join(remainder)
+        if slots.client_name:
+            # Часть с именем не может быть характеристикой ("Белая")
+            slots.specifications = self._extract_specs(slots.remainder)
+        return slots
+
+    def _extract_specs(self, text: str) -> Optional[str]:
+        """Объём памяти и цвет через запятую."""
+        parts: List[str] = [m.group() for m in _MEMORY.finditer(text)]
+        for word in re.findall(r"[а-яё]+", text.lower()):
+            if word.replace("ё", "е") in self._color_forms:
+                parts.append(word)
+        return ", ".join(parts) if parts else None
+
+    @staticmethod
+    def _looks_like_name(segment: str) -> bool:
+        """Часть сообщения похожа на имя: 1-2 слова с заглавной буквы."""
+        words = segment.split()
+        return (
+            1 <= len(words) <= 2
+            and all(word.isalpha() and word[0].isupper() for word in words)
+            and is_valid_name(segment)
+        )
@@ -1,22 +1,135 @@
 """Сервис для управления состояниями диалогов."""
-from typing import Dict
+import asyncio
+import logging
+from typing import Optional
+from src.core.config import get_settings
 from src.models.dialog_state import DialogState
+from src.services.state_store import SqliteStateStore, StateStore
+from src.services.store_flusher import run_store_flusher
+from src.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
 
 
 class StateService:
-    """Сервис управления состояниями диалогов."""
-    
-    def __init__(self) -> None:
-        """Инициализация сервиса."""
-        self._states: Dict[int, DialogState] = {}
+    """
+    Сервис управления состояниями диалогов.
+
+    Активные состояния хранятся в памяти (LRU с ограничением времени
+    простоя), поэтому занимаемая память зависит от числа активных, а не
+    всех когда-либо писавших пользователей. Если задано постоянное
+    хранилище, вытесненные из памяти состояния загружаются из него при
+    следующем обращении и переживают перезапуск бота.
+    """
+
+    def __init__(
+        self,
+        store: Optional[StateStore] = None,
+        max_users: int = 10000,
+        ttl: float = 3600,
+        flush_interval: float = 5,
+        retention: float = 7 * 24 * 3600,
+        purge_interval: float = 3600,
+    ) -> None:
+        """
+        Инициализация сервиса.
+
+        Args:
+            store: Постоянное хранилище; без него состояния живут только в памяти
+            max_users: Максимальное число состояний в памяти
+            ttl: Время простоя, после которого состояние вытесняется из памяти
+            flush_interval: Период записи отложенных изменений, в секундах
+            retention: Срок хранения неактивных состояний в хранилище, в секундах
+            purge_interval: Период удаления неактивных состояний, в секундах
+        """
+        self._store = store
+        self._states: TTLCache[int, DialogState] = TTLCache(max_size=max_users, ttl=ttl)
+        self._flush_interval = flush_interval
+        self._retention = retention
+        self._purge_interval = purge_interval
+        self._flusher: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_settings(cls) -> "StateService":
+        """Создание сервиса по настройкам приложения."""
+        settings = get_settings()
+        store: Optional[StateStore] = None
+        if settings.STATE_DB_PATH:
+            store = SqliteStateStore(settings.STATE_DB_PATH)
+        return cls(
+            store=store,
+            max_users=settings.STATE_MAX_USERS,
+            ttl=settings.STATE_TTL,
+            flush_interval=settings.STATE_FLUSH_INTERVAL,
+            retention=settings.STATE_RETENTION,
+            purge_interval=settings.STATE_PURGE_INTERVAL,
+        )
 
     def get_state(self, user_id: int) -> DialogState:
         """Получение состояния диалога для пользователя."""
-        if user_id not in self._states:
-            self._states[user_id] = DialogState()
-        return self._states[user_id]
+        state = self._states.get(user_id)
+        if state is None:
+            if self._store is not None:
+                state = self._store.load(user_id)
+            if state is None:
+                state = DialogState()
+            self._states.set(user_id, state)
+        return state
+
+    async def load_state(self, user_id: int) -> DialogState:
+        """
+        Получение состояния с загрузкой из хранилища в отдельном потоке.
+
+        Чтение базы при промахе по памяти не блокирует цикл событий;
+        после вызова get_state() для этого пользователя обходится памятью.
+        """
+        state = self._states.get(user_id)
+        if state is None:
+            if self._store is not None:
+                state = await asyncio.to_thread(self._store.load, user_id)
+            # Пока шло чтение, состояние могло появиться в памяти
+            state = self._states.get(user_id) or state or DialogState()
+            self._states.set(user_id, state)
+        return state
+
+    def save_state(self, user_id: int, state: DialogState) -> None:
+        """Фиксация изменений состояния в постоянном хранилище."""
+        if self._store is not None:
+            self._store.save(user_id, state)
 
     def reset_state(self, user_id: int) -> None:
         """Сброс состояния диалога для пользователя."""
-        if user_id in self._states:
-            self._states[user_id].reset() 
\ No newline at end of file
+        state = self._states.get(user_id)
+        if state is not None:
+            state.reset()
+            self.save_state(user_id, state)
+        elif self._store is not None:
+            self._store.delete(user_id)
+
+    def active_states(self) -> int:
+        """Количество состояний в памяти."""
+        self._states.evict_expired()
+        return len(self._states)
+
+    def start(self) -> None:
+        """Запуск периодической записи изменений в хранилище."""
+        if self._store is not None and self._flusher is None:
+            self._flusher = asyncio.create_task(run_store_flusher(
+                self._store,
+                self._flush_interval,
+                self._purge_interval,
+                self._retention,
+                source="state_store",
+            ))
+
+    async def close(self) -> None:
+        """Остановка фоновой записи и закрытие хранилища."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        if self._store is not None:
+            await asyncio.to_thread(self._store.close)
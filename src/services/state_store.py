@@ -0,0 +1,82 @@
+"""Хранилища состояний диалогов."""
+import json
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from src.models.dialog_state import DialogState
+from src.utils.sqlite_kv import SqliteKVStore
+
+
+class StateStore(ABC):
+    """Постоянное хранилище состояний диалогов."""
+
+    @abstractmethod
+    def load(self, user_id: int) -> Optional[DialogState]:
+        """Загрузка состояния пользователя."""
+
+    @abstractmethod
+    def save(self, user_id: int, state: DialogState) -> None:
+        """Сохранение состояния пользователя."""
+
+    @abstractmethod
+    def delete(self, user_id: int) -> None:
+        """Удаление состояния пользователя."""
+
+    def flush(self) -> None:
+        """Запись отложенных изменений."""
+
+    def purge(self, older_than: float) -> int:
+        """Удаление состояний, не менявшихся с момента older_than."""
+        return 0
+
+    def close(self) -> None:
+        """Закрытие хранилища."""
+
+
+class SqliteStateStore(StateStore):
+    """
+    Хранилище состояний в SQLite с отложенной записью.
+
+    save() и delete() только запоминают снимок состояния в памяти, а flush()
+    записывает все накопленные изменения одной транзакцией. Пока изменения
+    не записаны, load() возвращает их из памяти.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Инициализация хранилища.
+
+        Args:
+            path: Путь к файлу базы SQLite; файл создаётся при первом обращении
+        """
+        self._kv = SqliteKVStore(path, table="dialog_states")
+
+    def load(self, user_id: int) -> Optional[DialogState]:
+        """Загрузка состояния пользователя."""
+        data = self._kv.get(user_id)
+        if data is None:
+            return None
+        if isinstance(data, bytes):
+            return DialogState.from_bytes(data)
+        # Состояния, сохранённые до перехода на двоичный формат
+        return DialogState.from_dict(json.loads(data))
+
+    def save(self, user_id: int, state: DialogState) -> None:
+        """Сохранение снимка состояния до следующего flush()."""
+        self._kv.put(user_id, state.to_bytes())
+
+    def delete(self, user_id: int) -> None:
+        """Удаление состояния при следующем flush()."""
+        self._kv.delete(user_id)
+
+    def flush(self) -> None:
+        """Запись накопленных изменений одной транзакцией."""
+        self._kv.flush()
+
+    def purge(self, older_than: float) -> int:
+        """Удаление состояний, не менявшихся с момента older_than."""
+        return self._kv.purge(older_than)
+
+    def close(self) -> None:
+        """Запись отложенных изменений и закрытие базы."""
+        self._kv.close()
@@ -0,0 +1,53 @@
+"""Фоновая запись отложенных изменений хранилищ на диск."""
+import asyncio
+import logging
+import time
+from typing import Protocol
+
+from src.core.metrics import ERRORS
+
+logger = logging.getLogger(__name__)
+
+
+class FlushableStore(Protocol):
+    """Хранилище с отложенной записью и удалением устаревших записей."""
+
+    def flush(self) -> None:
+        """Запись отложенных изменений."""
+
+    def purge(self, older_than: float) -> int:
+        """Удаление записей, не менявшихся с момента older_than."""
+
+
+async def run_store_flusher(
+    store: FlushableStore,
+    flush_interval: float,
+    purge_interval: float,
+    retention: float,
+    source: str,
+) -> None:
+    """
+    Периодическая запись изменений и очистка давно неактивных записей.
+
+    Ошибка записи не останавливает задачу: изменения остаются в памяти
+    и записываются на следующем шаге.
+
+    Args:
+        store: Хранилище
+        flush_interval: Период записи изменений, в секундах
+        purge_interval: Период удаления устаревших записей, в секундах
+        retention: Срок хранения неактивных записей, в секундах
+        source: Метка источника в метрике ошибок
+    """
+    last_purge = 0.0
+    while True:
+        await asyncio.sleep(flush_interval)
+        try:
+            await asyncio.to_thread(store.flush)
+            now = time.time()
+            if now - last_purge >= purge_interval:
+                await asyncio.to_thread(store.purge, now - retention)
+                last_purge = now
+        except Exception:
+            ERRORS.inc(source=source)
+            logger.exception("Ошибка при записи хранилища", extra={"source": source})
@@ -0,0 +1,144 @@
+"""Общая очередь обновлений Telegram для нескольких процессов бота."""
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+class SqliteUpdateQueue:
+    """
+    Очередь обновлений в SQLite, разделённая на разделы по пользователям.
+
+    Процесс-диспетчер получает обновления от Telegram и кладёт каждое
+    в раздел своего пользователя, а каждый процесс-обработчик забирает
+    обновления только из своего раздела. Поэтому сообщения одного
+    пользователя всегда обрабатывает один процесс и по порядку.
+    База в режиме WAL позволяет писать и читать из разных процессов.
+
+    Доставка - не менее одного раза: take() не удаляет обновления, а только
+    скрывает их от повторного чтения на lease секунд. Обработчик вызывает
+    ack() после обработки; если он упал раньше, обновления снова
+    выдаются после истечения срока.
+    """
+
+    def __init__(self, path: str, lease: float = 300) -> None:
+        """
+        Инициализация очереди.
+
+        Args:
+            path: Путь к файлу базы SQLite; файл создаётся при первом обращении
+            lease: Через сколько секунд неподтверждённое обновление
+                выдаётся повторно
+        """
+        self._path = path
+        self._lease = lease
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Открытие базы при первом обращении."""
+        if self._db is None:
+            conn = sqlite3.connect(
+                self._path, check_same_thread=False, timeout=30, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS updates (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    partition INTEGER NOT NULL,
+                    data TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    leased_until REAL NOT NULL DEFAULT 0
+                )
+                """
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(updates)")}
+            if "leased_until" not in columns:
+                # База, созданная до подтверждения обработки
+                conn.execute(
+                    "ALTER TABLE updates "
+                    "ADD COLUMN leased_until REAL NOT NULL DEFAULT 0"
+                )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS updates_partition "
+                "ON updates (partition, id)"
+            )
+            self._db = conn
+        return self._db
+
+    def put(self, partition: int, update: Dict[str, Any]) -> None:
+        """Добавление обновления в раздел."""
+        data = json.dumps(update, ensure_ascii=False)
+        with self._lock:
+            self._connect().execute(
+                "INSERT INTO updates (partition, data, created_at) VALUES (?, ?, ?)",
+                (partition, data, time.time()),
+            )
+
+    def take(self, partition: int, limit: int) -> List[Tuple[int, Dict[str, Any]]]:
+        """
+        Выдача самых старых необработанных обновлений раздела.
+
+        Выданные обновления скрываются от повторного чтения в той же
+        транзакции, поэтому каждое достаётся одному читателю, пока не истёк
+        срок. Обновление удаляется из очереди только вызовом ack().
+
+        Returns:
+            List[Tuple[int, Dict[str, Any]]]: Номера и данные обновлений
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = conn.execute(
+                    "SELECT id, data FROM updates "
+                    "WHERE partition = ? AND leased_until <= ? ORDER BY id LIMIT ?",
+                    (partition, now, limit),
+                ).fetchall()
+                conn.executemany(
+                    "UPDATE updates SET leased_until = ? WHERE id = ?",
+                    [(now + self._lease, item_id) for item_id, _ in rows],
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return [(item_id, json.loads(data)) for item_id, data in rows]
+
+    def ack(self, ids: Sequence[int]) -> None:
+        """Удаление обработанных обновлений."""
+        if not ids:
+            return
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "DELETE FROM updates WHERE id = ?", [(item_id,) for item_id in ids]
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def pending_count(self, partition: Optional[int] = None) -> int:
+        """Количество необработанных обновлений (всего или в разделе)."""
+        with self._lock:
+            if partition is None:
+                row = self._connect().execute("SELECT COUNT(*) FROM updates").fetchone()
+            else:
+                row = self._connect().execute(
+                    "SELECT COUNT(*) FROM updates WHERE partition = ?", (partition,)
+                ).fetchone()
+        return int(row[0])
+
+    def close(self) -> None:
+        """Закрытие базы."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,76 @@
+"""Поиск множества ключевых слов в тексте за один проход."""
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+class KeywordMatcher:
+    """
+    Автомат Ахо-Корасик для поиска ключевых слов.
+
+    Автомат строится один раз, после чего поиск всех вхождений всех
+    ключевых слов (включая пересекающиеся) занимает один проход по тексту
+    и не зависит от количества ключевых слов.
+    """
+
+    def __init__(self, keywords: Iterable[str]) -> None:
+        """
+        Построение автомата.
+
+        Args:
+            keywords: Ключевые слова; сравнение выполняется без учёта регистра
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]
+        for keyword in keywords:
+            if keyword:
+                self._add(keyword.lower())
+        self._build_links()
+
+    def _add(self, keyword: str) -> None:
+        """Добавление ключевого слова в префиксное дерево."""
+        node = 0
+        for char in keyword:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+        if keyword not in self._output[node]:
+            self._output[node].append(keyword)
+
+    def _build_links(self) -> None:
+        """Построение суффиксных ссылок обходом в ширину."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                inherited = self._output[self._fail[child]]
+                self._output[child] = self._output[child] + inherited
+
+    def find_all(self, text: str) -> Iterator[Tuple[int, str]]:
+        """
+        Поиск всех вхождений ключевых слов.
+
+        Args:
+            text: Текст для поиска
+
+        Returns:
+            Iterator[Tuple[int, str]]: Позиция начала вхождения и ключевое слово
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        node = 0
+        for index, char in enumerate(text.lower()):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for keyword in output[node]:
+                yield index - len(keyword) + 1, keyword
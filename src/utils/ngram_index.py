@@ -0,0 +1,66 @@
+"""Нечёткий поиск слов по инвертированному индексу символьных n-грамм."""
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+
+def ngrams(word: str, n: int = 2) -> FrozenSet[str]:
+    """
+    Символьные n-граммы слова с метками начала и конца.
+
+    Метки делают совпадение начала и конца слова значимым:
+    "айфн" и "айфон" совпадают по "^а", "ай", "йф" и "н$".
+    """
+    padded = f"^{word}$"
+    return frozenset(padded[i:i + n] for i in range(len(padded) - n + 1))
+
+
+class NgramIndex:
+    """
+    Поиск ближайшего слова словаря с учётом опечаток.
+
+    Для каждой n-граммы хранится список содержащих её слов, поэтому при
+    поиске сравниваются только слова, имеющие с запросом общие n-граммы.
+    Похожесть - коэффициент Дайса по множествам n-грамм.
+    """
+
+    def __init__(self, words: Iterable[str], n: int = 2) -> None:
+        """
+        Построение индекса.
+
+        Args:
+            words: Слова словаря
+            n: Длина n-граммы
+        """
+        self._n = n
+        self._words: List[str] = list(dict.fromkeys(words))
+        self._sizes: List[int] = []
+        self._postings: Dict[str, List[int]] = {}
+        for word_id, word in enumerate(self._words):
+            grams = ngrams(word, n)
+            self._sizes.append(len(grams))
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(word_id)
+
+    def lookup(
+        self, word: str, min_similarity: float = 0.6
+    ) -> Optional[Tuple[str, float]]:
+        """
+        Поиск самого похожего слова словаря.
+
+        Args:
+            word: Искомое слово
+            min_similarity: Минимальная похожесть от 0 до 1
+
+        Returns:
+            Optional[Tuple[str, float]]: Слово словаря и похожесть или None
+        """
+        grams = ngrams(word, self._n)
+        common: Dict[int, int] = {}
+        for gram in grams:
+            for word_id in self._postings.get(gram, ()):
+                common[word_id] = common.get(word_id, 0) + 1
+        best: Optional[Tuple[str, float]] = None
+        for word_id, count in common.items():
+            similarity = 2 * count / (len(grams) + self._sizes[word_id])
+            if similarity >= min_similarity and (best is None or similarity > best[1]):
+                best = (self._words[word_id], similarity)
+        return best
@@ -0,0 +1,234 @@
+"""Метрики в текстовом формате Prometheus."""
+import bisect
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+LabelValues = Tuple[str, ...]
+
+# Границы корзин гистограммы по умолчанию, в секундах
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _format_value(value: float) -> str:
+    """Значение в формате Prometheus."""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Метки в формате {name="value",...}."""
+    if not names:
+        return ""
+    pairs = (
+        '{}="{}"'.format(
+            name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        for name, value in zip(names, values)
+    )
+    return "{" + ",".join(pairs) + "}"
+
+
+class _Metric(ABC):
+    """Общая часть метрик: имя, описание и метки."""
+
+    kind = ""
+
+    def __init__(
+        self, name: str, help_text: str, labelnames: Sequence[str] = ()
+    ) -> None:
+        """Инициализация метрики."""
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        """Значения меток в порядке labelnames."""
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: ожидаются метки {self.labelnames}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> Iterator[str]:
+        """Строки метрики в текстовом формате."""
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield from self._samples()
+
+    @abstractmethod
+    def _samples(self) -> Iterator[str]:
+        """Значения метрики."""
+
+
+class Counter(_Metric):
+    """Монотонно растущий счётчик."""
+
+    kind = "counter"
+
+    def __init__(
+        self, name: str, help_text: str, labelnames: Sequence[str] = ()
+    ) -> None:
+        """Инициализация счётчика."""
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """Увеличение счётчика."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        """Текущее значение счётчика."""
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}{labels} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """
+    Текущее значение величины.
+
+    Значение задаётся через set() или вычисляется функцией в момент
+    отдачи метрик, если она указана через set_function().
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str) -> None:
+        """Инициализация показателя."""
+        super().__init__(name, help_text)
+        self._value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float) -> None:
+        """Установка значения."""
+        self._value = value
+
+    def set_function(self, function: Optional[Callable[[], float]]) -> None:
+        """Вычисление значения функцией при каждом чтении."""
+        self._function = function
+
+    def value(self) -> float:
+        """Текущее значение."""
+        return float(self._function()) if self._function else self._value
+
+    def _samples(self) -> Iterator[str]:
+        yield f"{self.name} {_format_value(self.value())}"
+
+
+class Histogram(_Metric):
+    """Распределение значений по корзинам (обычно длительностей в секундах)."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        """Инициализация гистограммы."""
+        super().__init__(name, help_text, labelnames)
+        self._bounds = tuple(sorted(buckets))
+        # Метки -> (число значений в каждой корзине, сумма, количество)
+        self._data: Dict[LabelValues, Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Учёт значения."""
+        key = self._key(labels)
+        index = bisect.bisect_left(self._bounds, value)
+        with self._lock:
+            counts, total, count = self._data.get(
+                key, ([0] * (len(self._bounds) + 1), 0.0, 0)
+            )
+            counts[index] += 1
+            self._data[key] = (counts, total + value, count + 1)
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Учёт длительности блока with."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: str) -> int:
+        """Количество учтённых значений."""
+        data = self._data.get(self._key(labels))
+        return data[2] if data else 0
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            items = sorted(
+                (key, (counts[:], total, count))
+                for key, (counts, total, count) in self._data.items()
+            )
+        names = (*self.labelnames, "le")
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip((*self._bounds, math.inf), counts):
+                cumulative += bucket_count
+                labels = _format_labels(names, (*key, _format_value(bound)))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+_M = TypeVar("_M", bound=_Metric)
+
+
+class MetricsRegistry:
+    """Набор метрик, отдаваемых одной страницей."""
+
+    def __init__(self) -> None:
+        """Инициализация реестра."""
+        self._metrics: Dict[str, _Metric] = {}
+
+    def counter(
+        self, name: str, help_text: str, labelnames: Sequence[str] = ()
+    ) -> Counter:
+        """Регистрация счётчика."""
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str) -> Gauge:
+        """Регистрация показателя."""
+        return self._register(Gauge(name, help_text))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Регистрация гистограммы."""
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def _register(self, metric: _M) -> _M:
+        """Добавление метрики в реестр."""
+        if metric.name in self._metrics:
+            raise ValueError(f"Метрика {metric.name} уже зарегистрирована")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Все метрики в текстовом формате Prometheus."""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,101 @@
+"""Ограничение частоты запросов алгоритмом «корзина токенов»."""
+import time
+from typing import Callable, Optional
+
+from src.utils.ttl_cache import TTLCache
+
+
+class TokenBucket:
+    """
+    Корзина токенов.
+
+    Корзина вмещает capacity токенов и пополняется со скоростью rate токенов
+    в секунду; каждое действие забирает один токен. Поэтому допускаются
+    короткие всплески до capacity действий, а в среднем - не больше rate.
+    """
+
+    __slots__ = ("rate", "capacity", "tokens", "updated_at")
+
+    def __init__(self, rate: float, capacity: float, now: float) -> None:
+        """Инициализация полной корзины."""
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = now
+
+    def refill(self, now: float) -> None:
+        """Пополнение корзины за прошедшее время."""
+        elapsed = max(0.0, now - self.updated_at)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated_at = now
+
+    def has_token(self, now: float) -> bool:
+        """Есть ли в корзине токен."""
+        self.refill(now)
+        return self.tokens >= 1
+
+    def take(self) -> None:
+        """Изъятие токена (после проверки has_token)."""
+        self.tokens -= 1
+
+
+class RateLimiter:
+    """
+    Ограничение частоты сообщений для каждого пользователя и в целом.
+
+    Сообщение пропускается, только если токен есть и в корзине пользователя,
+    и в общей корзине; иначе не расходуется ни один токен. Корзины
+    простаивающих пользователей удаляются: вновь созданная корзина полна,
+    что не отличается от корзины, пополнившейся за время простоя.
+    """
+
+    def __init__(
+        self,
+        user_rate: float,
+        user_burst: int,
+        global_rate: float,
+        global_burst: int,
+        max_users: int = 10000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Инициализация ограничителя.
+
+        Args:
+            user_rate: Скорость пополнения корзины пользователя, сообщений в секунду
+            user_burst: Ёмкость корзины пользователя
+            global_rate: Скорость пополнения общей корзины, сообщений в секунду
+            global_burst: Ёмкость общей корзины
+            max_users: Максимальное число хранимых корзин пользователей
+            clock: Источник времени
+        """
+        self._user_rate = user_rate
+        self._user_burst = user_burst
+        self._clock = clock
+        self._global = TokenBucket(global_rate, global_burst, clock())
+        # Через столько секунд простоя корзина пользователя гарантированно полна
+        idle_ttl = user_burst / user_rate if user_rate > 0 else float("inf")
+        self._users: TTLCache[int, TokenBucket] = TTLCache(
+            max_size=max_users, ttl=idle_ttl, clock=clock
+        )
+
+    def check(self, user_id: int) -> Optional[str]:
+        """
+        Проверка и учёт сообщения пользователя.
+
+        Returns:
+            Optional[str]: None, если сообщение пропущено; иначе "user" или
+                "global" - какое ограничение сработало
+        """
+        now = self._clock()
+        bucket = self._users.get(user_id)
+        if bucket is None:
+            bucket = TokenBucket(self._user_rate, self._user_burst, now)
+            self._users.set(user_id, bucket)
+        if not bucket.has_token(now):
+            return "user"
+        if not self._global.has_token(now):
+            return "global"
+        bucket.take()
+        self._global.take()
+        return None
@@ -0,0 +1,177 @@
+"""Таблица SQLite «ключ - значение» с отложенной записью."""
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Union
+
+_TABLE_NAME = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+# Значение: текст (например, JSON) или байты (хранятся как BLOB)
+Value = Union[str, bytes]
+
+
+class SqliteKVStore:
+    """
+    Хранилище значений по целочисленному ключу (обычно user_id).
+
+    put() и delete() только запоминают изменение в памяти, а flush()
+    записывает все накопленные изменения одной транзакцией. Пока изменения
+    не записаны, get() возвращает их из памяти. База открывается в режиме
+    WAL, поэтому один файл могут одновременно использовать несколько
+    процессов бота.
+
+    Запись идёт без общей блокировки: get() не ждёт медленного flush(),
+    а читает из базы через отдельное соединение.
+    """
+
+    def __init__(self, path: str, table: str) -> None:
+        """
+        Инициализация хранилища.
+
+        Args:
+            path: Путь к файлу базы SQLite; файл создаётся при первом обращении
+            table: Имя таблицы (латинские буквы, цифры и подчёркивание)
+        """
+        if not _TABLE_NAME.match(table):
+            raise ValueError(f"Недопустимое имя таблицы: {table}")
+        self._path = path
+        self._table = table
+        self._db: Optional[sqlite3.Connection] = None
+        self._reader_db: Optional[sqlite3.Connection] = None
+        # Защищает словари изменений; операции с базой выполняются без неё
+        self._lock = threading.Lock()
+        # Не даёт двум flush() писать одновременно
+        self._write_lock = threading.Lock()
+        self._connect_lock = threading.Lock()
+        # ключ -> значение или None для удаления
+        self._pending: Dict[int, Optional[Value]] = {}
+        # Изменения, которые flush() записывает прямо сейчас
+        self._writing: Dict[int, Optional[Value]] = {}
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """Соединение для записи; база открывается при первом обращении."""
+        if self._db is None:
+            self._open()
+        assert self._db is not None
+        return self._db
+
+    @property
+    def _reader(self) -> sqlite3.Connection:
+        """
+        Соединение для чтения.
+
+        Отдельное от соединения записи, поэтому чтение не ждёт транзакцию
+        flush(): в режиме WAL читатели не блокируются писателем.
+        """
+        if self._reader_db is None:
+            self._open()
+        assert self._reader_db is not None
+        return self._reader_db
+
+    def _open(self) -> None:
+        """Открытие соединений и создание таблицы."""
+        with self._connect_lock:
+            if self._db is not None:
+                return
+            conn = sqlite3.connect(self._path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {self._table} (
+                    user_id INTEGER PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {self._table}_updated "
+                f"ON {self._table} (updated_at)"
+            )
+            conn.commit()
+            self._reader_db = sqlite3.connect(
+                self._path, check_same_thread=False, timeout=30
+            )
+            self._db = conn
+
+    def get(self, key: int) -> Optional[Value]:
+        """
+        Получение значения.
+
+        При промахе по несохранённым изменениям выполняет запрос к базе;
+        из асинхронного кода такой вызов нужно выносить в поток.
+        """
+        with self._lock:
+            if key in self._pending:
+                return self._pending[key]
+            if key in self._writing:
+                return self._writing[key]
+        row = self._reader.execute(
+            f"SELECT data FROM {self._table} WHERE user_id = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: int, value: Value) -> None:
+        """Сохранение значения до следующего flush()."""
+        with self._lock:
+            self._pending[key] = value
+
+    def delete(self, key: int) -> None:
+        """Удаление значения при следующем flush()."""
+        with self._lock:
+            self._pending[key] = None
+
+    def flush(self) -> None:
+        """Запись накопленных изменений одной транзакцией."""
+        with self._write_lock:
+            with self._lock:
+                if not self._pending:
+                    return
+                # До фиксации транзакции get() видит записываемые значения
+                self._writing, self._pending = self._pending, {}
+            try:
+                self._write(self._writing)
+            except Exception:
+                with self._lock:
+                    # Возвращаем незаписанные изменения, не затирая более свежие
+                    self._pending = {**self._writing, **self._pending}
+                    self._writing = {}
+                raise
+            with self._lock:
+                self._writing = {}
+
+    def _write(self, pending: Dict[int, Optional[Value]]) -> None:
+        """Запись изменений в базу одной транзакцией."""
+        now = time.time()
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {self._table} (user_id, data, updated_at) "
+                "VALUES (?, ?, ?)",
+                [(key, data, now) for key, data in pending.items() if data is not None],
+            )
+            self._conn.executemany(
+                f"DELETE FROM {self._table} WHERE user_id = ?",
+                [(key,) for key, data in pending.items() if data is None],
+            )
+
+    def purge(self, older_than: float) -> int:
+        """Удаление значений, не менявшихся с момента older_than."""
+        with self._write_lock, self._conn:
+            cursor = self._conn.execute(
+                f"DELETE FROM {self._table} WHERE updated_at < ?", (older_than,)
+            )
+            return cursor.rowcount
+
+    def close(self) -> None:
+        """Запись отложенных изменений и закрытие базы."""
+        self.flush()
+        with self._write_lock, self._connect_lock:
+            if self._reader_db is not None:
+                self._reader_db.close()
+                self._reader_db = None
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,97 @@
+"""LRU-кэш с ограничением времени жизни записей."""
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Iterator, Optional, Tuple, TypeVar
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Кэш с вытеснением давно неиспользуемых записей.
+
+    Записи упорядочены по времени последнего обращения, поэтому устаревшие
+    записи и кандидаты на LRU-вытеснение всегда находятся в начале словаря,
+    и очистка стоит O(число удаляемых записей).
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: float,
+        on_evict: Optional[Callable[[K, V], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Инициализация кэша.
+
+        Args:
+            max_size: Максимальное количество записей
+            ttl: Время жизни записи без обращений, в секундах
+            on_evict: Функция, вызываемая для каждой вытесненной записи
+            clock: Источник времени
+        """
+        if max_size < 1:
+            raise ValueError("max_size должен быть положительным числом")
+        self._max_size = max_size
+        self._ttl = ttl
+        self._on_evict = on_evict
+        self._clock = clock
+        self._data: "OrderedDict[K, Tuple[float, V]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def get(self, key: K) -> Optional[V]:
+        """Получение значения с продлением времени жизни записи."""
+        self.evict_expired()
+        item = self._data.get(key)
+        if item is None:
+            return None
+        self._data[key] = (self._clock(), item[1])
+        self._data.move_to_end(key)
+        return item[1]
+
+    def set(self, key: K, value: V) -> None:
+        """Сохранение значения."""
+        self._data[key] = (self._clock(), value)
+        self._data.move_to_end(key)
+        self.evict_expired()
+        while len(self._data) > self._max_size:
+            old_key, (_, old_value) = self._data.popitem(last=False)
+            self._notify(old_key, old_value)
+
+    def pop(self, key: K) -> Optional[V]:
+        """Удаление записи без вызова on_evict."""
+        item = self._data.pop(key, None)
+        return item[1] if item is not None else None
+
+    def evict_expired(self) -> int:
+        """Удаление записей, к которым не обращались дольше ttl."""
+        deadline = self._clock() - self._ttl
+        evicted = 0
+        while self._data:
+            key, (touched_at, value) = next(iter(self._data.items()))
+            if touched_at > deadline:
+                break
+            del self._data[key]
+            self._notify(key, value)
+            evicted += 1
+        return evicted
+
+    def items(self) -> Iterator[Tuple[K, V]]:
+        """Перебор записей от самых старых к самым свежим."""
+        for key, (_, value) in list(self._data.items()):
+            yield key, value
+
+    def clear(self) -> None:
+        """Очистка кэша без вызова on_evict."""
+        self._data.clear()
+
+    def _notify(self, key: K, value: V) -> None:
+        if self._on_evict is not None:
+            self._on_evict(key, value)
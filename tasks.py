@@ -107,3 +107,14 @@ def test(ctx: Context) -> None:
     except Exception as e:
         print(f"Ошибка при выполнении тестов: {e}", file=sys.stderr)
         sys.exit(1)
+
+
+@task
+def bench(ctx: Context, users: int = 1000) -> None:
+    """Нагрузочный тест обработчика сообщений."""
+    print("Запуск нагрузочного теста...")
+    try:
+        ctx.run(f"python -m benchmarks.load_test --users {users}")
+    except Exception as e:
+        print(f"Ошибка при выполнении нагрузочного теста: {e}", file=sys.stderr)
+        sys.exit(1)
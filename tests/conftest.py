@@ -1,8 +1,10 @@
 """Конфигурация и фикстуры для тестов."""
 import sys
 from pathlib import Path
-from unittest.mock import Mock
+from typing import Optional
+from unittest.mock import Mock, patch
 import pytest
+from src.core import config
 from src.core.config import Settings
 from src.services.chat_service import ChatService
 
@@ -14,16 +16,25 @@ sys.path.append(project_root)
 def mock_settings() -> Settings:
     """Provide test settings."""
     return Settings(
-        API_ENDPOINT="test_api_endpoint",
+        API_ENDPOINT="https://api.test/orders",
         TELEGRAM_TOKEN="test_telegram_token",
-        GIGACHAT_TOKEN="test_gigachat_token"
+        GIGACHAT_TOKEN="test_gigachat_token",
+        STATE_DB_PATH="",
     )
 
+@pytest.fixture(autouse=True)
+def patch_settings(mock_settings: Settings):
+    """Подмена кэша настроек, чтобы тесты не зависели от .env."""
+    with patch.object(config, "_settings", mock_settings):
+        yield
+
 @pytest.fixture
 def mock_chat_service() -> ChatService:
     """Provide mock chat service."""
     service = Mock(spec=ChatService)
-    async def mock_generate_response(message: str) -> str:
+    async def mock_generate_response(
+        message: str, user_id: int, context: Optional[str] = None
+    ) -> str:
         return f"Mocked response for: {message}"
     
     service.generate_response.side_effect = mock_generate_response
@@ -0,0 +1,136 @@
+"""Тесты каталога товаров."""
+import json
+import os
+import sqlite3
+import time
+
+import pytest
+
+from src.services.catalog import (
+    CatalogIndex,
+    CatalogMatch,
+    Product,
+    ProductCatalog,
+    load_products,
+)
+from src.utils.ngram_index import NgramIndex
+
+
+@pytest.fixture
+def catalog() -> ProductCatalog:
+    """Встроенный каталог."""
+    return ProductCatalog()
+
+
+@pytest.mark.parametrize("text, name", [
+    ("айфн 15 про", "iPhone 15 Pro"),
+    ("Хочу айфон 15", "iPhone 15"),
+    ("iphone 15 pro max", "iPhone 15 Pro Max"),
+    ("самсунг галакси s24 ультра", "Galaxy S24 Ultra"),
+    ("Galaxy S24+", "Galaxy S24+"),
+    ("редми ноут 13 про", "Redmi Note 13 Pro"),
+])
+def test_lookup_tolerates_typos_and_russian_spelling(catalog, text, name):
+    """Модель находится по написанию с опечатками и по-русски."""
+    match = catalog.lookup(text)
+
+    assert match.product is not None and match.product.name == name
+    assert match.brand == match.product.brand
+
+
+def test_brand_without_model(catalog):
+    """Упомянут только бренд: товар не выбирается."""
+    assert catalog.lookup("интересует айфон").brand == "apple"
+    assert catalog.lookup("интересует айфон").product is None
+    assert catalog.lookup("хочу новый телефон").brand is None
+
+
+@pytest.mark.parametrize("text, name", [
+    ("айфон 15 про, новая модель", "iPhone 15 Pro"),
+    ("хочу новая айфон 15", "iPhone 15"),
+])
+def test_exact_terms_outweigh_fuzzy(catalog, text, name):
+    """Точно названные бренд и модель важнее слова, похожего на модель."""
+    match = catalog.lookup(text)
+
+    assert match.product is not None and match.product.name == name
+
+
+@pytest.mark.parametrize("text", [
+    "куплю за 90 тысяч",
+    "бюджет до 60 тысяч",
+    "есть ли 5g",
+    "новая модель",
+])
+def test_numbers_and_generic_words_do_not_pick_product(catalog, text):
+    """По числам и общим словам бренд и модель не выбираются."""
+    assert catalog.lookup(text) == CatalogMatch()
+
+
+def test_coverage_counts_matched_words(catalog):
+    """Доля слов сообщения, совпавших с брендом и моделью."""
+    assert catalog.lookup("айфон 15 про").coverage == 1
+    assert catalog.lookup("айфон 15 есть в наличии").coverage == 0.4
+
+
+def test_ngram_index_finds_closest_word():
+    """Индекс n-грамм находит слово с опечаткой и отсекает непохожие."""
+    index = NgramIndex(["айфон", "самсунг", "хонор"])
+
+    assert index.lookup("айфн")[0] == "айфон"
+    assert index.lookup("телефон") is None
+
+
+def test_catalog_from_json_and_sqlite(tmp_path):
+    """Каталог загружается из JSON и из SQLite."""
+    items = [{"sku": "1", "brand": "apple", "name": "iPhone 16 Pro"}]
+    json_path = tmp_path / "catalog.json"
+    json_path.write_text(json.dumps(items), encoding="utf-8")
+    db_path = tmp_path / "catalog.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE products (sku TEXT, brand TEXT, name TEXT)")
+        conn.execute("INSERT INTO products VALUES ('1', 'apple', 'iPhone 16 Pro')")
+    conn.close()
+
+    assert load_products(str(json_path)) == load_products(str(db_path)) == [
+        Product(sku="1", brand="apple", name="iPhone 16 Pro")
+    ]
+
+
+def test_reload_swaps_index(tmp_path):
+    """Изменённый файл подхватывается, неизменённый не перечитывается."""
+    path = tmp_path / "catalog.json"
+    path.write_text(json.dumps([{"sku": "1", "brand": "apple", "name": "iPhone 15"}]))
+    catalog = ProductCatalog(str(path))
+    old_index = catalog.index
+
+    assert catalog.reload() is False
+    path.write_text(json.dumps([{"sku": "2", "brand": "apple", "name": "iPhone 16"}]))
+    os.utime(path, (time.time() + 10, time.time() + 10))
+
+    assert catalog.reload() is True
+    assert catalog.index is not old_index
+    assert catalog.lookup("айфон 16").product.sku == "2"
+    # Прежний индекс не изменился: начатые по нему поиски не затронуты
+    assert old_index.lookup("айфон 15").product.sku == "1"
+
+
+def test_lookup_is_fast_on_large_catalog():
+    """Поиск по десяткам тысяч товаров занимает доли миллисекунды."""
+    brands = ["apple", "samsung", "xiaomi", "huawei", "honor"]
+    index = CatalogIndex(
+        Product(
+            sku=str(i),
+            brand=brands[i % 5],
+            name=f"{brands[i % 5]} X{i % 997} {i // 1000}",
+        )
+        for i in range(20000)
+    )
+    runs = 200
+
+    started = time.perf_counter()
+    for _ in range(runs):
+        index.lookup("самсунг x500 3")
+    elapsed = (time.perf_counter() - started) / runs
+
+    assert elapsed < 0.001
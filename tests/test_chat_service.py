@@ -1,34 +1,195 @@
 """Тесты для сервиса чата."""
+import asyncio
 import os
 import sys
 from pathlib import Path
 import pytest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
-from src.services.chat_service import ChatService  # Исправленный импорт
+from src.models.chat_message import AIMessage
+
+from src.services.chat_service import (  # Исправленный импорт
+    SUMMARY_HEADER,
+    ChatService,
+    estimate_tokens,
+)
+from src.utils.sqlite_kv import SqliteKVStore
 
 # Добавляем корневую директорию проекта в PYTHONPATH
 project_root = str(Path(__file__).parent.parent)
 sys.path.append(project_root)
 
+
+def make_completion(text: str) -> Mock:
+    """Создание ответа GigaChat с заданным текстом."""
+    completion = Mock()
+    completion.choices = [Mock()]
+    completion.choices[0].message.content = text
+    return completion
+
+
+@pytest.fixture
+def chat_service():
+    """Сервис чата с замоканным клиентом GigaChat."""
+    client = Mock()
+    client.aclose = AsyncMock()
+    client.achat = AsyncMock(return_value=make_completion("Тестовый ответ"))
+    return ChatService(client=client)
+
+
 @pytest.mark.asyncio
-async def test_generate_response():
+async def test_generate_response(chat_service):
     """Тест генерации ответа."""
-    # Создаем мок для GigaChat
-    mock_response = AsyncMock()
-    mock_response.content = "Тестовый ответ"
-    
-    with patch('src.services.chat_service.GigaChat') as mock_giga:
-        # Настраиваем мок
-        mock_instance = mock_giga.return_value
-        mock_instance.ainvoke = AsyncMock(return_value=mock_response)
-        
-        # Создаем экземпляр сервиса
-        service = ChatService()
-        
-        # Тестируем генерацию ответа
-        response = await service.generate_response("Тестовый запрос")
-        
-        # Проверяем результат
-        assert response == "Тестовый ответ"
-        assert mock_instance.ainvoke.called
+    response = await chat_service.generate_response("Тестовый запрос", user_id=1)
+
+    assert response == "Тестовый ответ"
+    assert chat_service._chat.achat.called
+
+
+@pytest.mark.asyncio
+async def test_histories_are_per_user(chat_service):
+    """Истории разных пользователей не смешиваются."""
+    await chat_service.generate_response("Вопрос первого", user_id=1)
+    await chat_service.generate_response("Вопрос второго", user_id=2)
+
+    payload = chat_service._chat.achat.call_args[0][0]
+    contents = [msg["content"] for msg in payload["messages"]]
+    assert "Вопрос второго" in contents
+    assert "Вопрос первого" not in contents
+    assert payload["messages"][0]["role"] == "system"
+
+
+@pytest.mark.asyncio
+async def test_history_window_is_bounded(chat_service):
+    """В запрос уходят только последние HISTORY_MAX_TURNS ходов."""
+    for i in range(30):
+        await chat_service.generate_response(f"Сообщение {i}", user_id=1)
+
+    payload = chat_service._chat.achat.call_args[0][0]
+    # Системный промпт + окно из пар вопрос/ответ
+    assert len(payload["messages"]) <= 1 + 2 * 10
+    assert payload["messages"][-1]["content"] == "Сообщение 29"
+
+
+@pytest.mark.asyncio
+async def test_reset_conversation(chat_service):
+    """Сброс удаляет историю пользователя."""
+    await chat_service.generate_response("Привет", user_id=1)
+    chat_service.reset_conversation(1)
+
+    assert chat_service.get_history(1).messages == []
+
+
+@pytest.mark.asyncio
+async def test_context_is_not_stored_in_history(chat_service):
+    """Контекст этапа уходит в системное сообщение, но не в историю."""
+    for _ in range(3):
+        await chat_service.generate_response(
+            "айфон 15", user_id=1, context="Текущий этап диалога: START\n"
+        )
+
+    payload = chat_service._chat.achat.call_args[0][0]
+    system_messages = [m for m in payload["messages"] if m["role"] == "system"]
+    assert len(system_messages) == 1
+    assert "Текущий этап диалога: START" in system_messages[0]["content"]
+    history = chat_service.get_history(1).messages
+    assert all("Текущий этап" not in str(msg.content) for msg in history)
+    assert all("консультант" not in str(msg.content) for msg in history)
+
+
+@pytest.mark.asyncio
+async def test_stream_response_records_full_reply(chat_service):
+    """Потоковый ответ целиком сохраняется в истории."""
+    async def astream(payload):
+        for text in ["Отличный ", "выбор!"]:
+            chunk = Mock()
+            chunk.choices = [Mock()]
+            chunk.choices[0].delta.content = text
+            yield chunk
+
+    chat_service._chat.astream = astream
+    chunks = [chunk async for chunk in chat_service.stream_response("айфон", 1)]
+
+    assert chunks == ["Отличный ", "выбор!"]
+    history = chat_service.get_history(1).messages
+    assert history[-1].content == "Отличный выбор!"
+
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_prompts_share_one_request(chat_service):
+    """Одинаковые одновременные запросы разных пользователей - один запрос."""
+    async def achat(payload):
+        await asyncio.sleep(0.01)
+        return make_completion("Общий ответ")
+
+    chat_service._chat.achat = AsyncMock(side_effect=achat)
+    messages = ["Привет!", "привет", "ПРИВЕТ"]
+    responses = await asyncio.gather(*(
+        chat_service.generate_response(text, user_id=i, context="START")
+        for i, text in enumerate(messages)
+    ))
+
+    assert responses == ["Общий ответ"] * 3
+    assert chat_service._chat.achat.await_count == 1
+    # Каждый пользователь получает ответ в свою историю со своим сообщением
+    histories = [chat_service.get_history(i) for i in range(3)]
+    assert [history.messages[0].content for history in histories] == messages
+    assert chat_service._inflight == {}
+
+
+@pytest.mark.asyncio
+async def test_different_context_is_not_coalesced(chat_service):
+    """Запросы с разным контекстом этапа не объединяются."""
+    await asyncio.gather(
+        chat_service.generate_response("айфон", user_id=1, context="START"),
+        chat_service.generate_response("айфон", user_id=2, context="SPECS_SELECTION"),
+    )
+
+    assert chat_service._chat.achat.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_history_is_shared_through_store(chat_service, tmp_path):
+    """История, записанная одним процессом, доступна другому."""
+    path = str(tmp_path / "history.db")
+    first = ChatService(
+        client=chat_service._chat, store=SqliteKVStore(path, "conversations")
+    )
+    await first.generate_response("Хочу айфон", user_id=1)
+    await first.close()
+
+    second = ChatService(
+        client=chat_service._chat, store=SqliteKVStore(path, "conversations")
+    )
+    history = second.get_history(1).messages
+
+    assert [msg.content for msg in history] == ["Хочу айфон", "Тестовый ответ"]
+    assert isinstance(history[1], AIMessage)
+
+
+@pytest.mark.asyncio
+async def test_evicted_turns_are_summarized(chat_service):
+    """Вытесненные из окна сообщения попадают в краткое содержание."""
+    for i in range(15):
+        await chat_service.generate_response(f"Сообщение {i}", user_id=1)
+
+    payload = chat_service._chat.achat.call_args[0][0]
+    system = payload["messages"][0]["content"]
+    assert SUMMARY_HEADER in system
+    assert "Клиент: Сообщение 0" in system
+    assert "Сообщение 0" not in [m["content"] for m in payload["messages"][1:]]
+
+
+@pytest.mark.asyncio
+async def test_request_fits_token_budget(chat_service):
+    """Запрос укладывается в бюджет; промпт, контекст и вопрос сохраняются."""
+    chat_service._request_max_tokens = 1200
+    for i in range(5):
+        await chat_service.generate_response("длинный вопрос " * 40, user_id=1)
+    await chat_service.generate_response("айфон 15", user_id=1, context="Этап: START")
+
+    payload = chat_service._chat.achat.call_args[0][0]
+    total = sum(estimate_tokens(m["content"]) for m in payload["messages"])
+    assert total <= 1200
+    assert "Этап: START" in payload["messages"][0]["content"]
+    assert payload["messages"][-1]["content"] == "айфон 15"
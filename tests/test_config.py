@@ -1,7 +1,10 @@
 """Тесты для модуля конфигурации."""
 
+from unittest.mock import patch
+
 import pytest
 
+from src.core import config
 from src.core.config import Settings
 
 
@@ -35,3 +38,35 @@ def test_settings_validation_with_empty_gigachat_token():
     )
     with pytest.raises(ValueError, match="Не указан токен GigaChat"):
         settings.validate()
+
+
+def test_get_settings_is_cached(mock_settings):
+    """Настройки читаются из .env один раз на процесс."""
+    with patch.object(config, "_settings", None), \
+            patch.object(config, "_load_settings", return_value=mock_settings) as load:
+        assert config.get_settings() is mock_settings
+        assert config.get_settings() is mock_settings
+
+    assert load.call_count == 1
+
+
+def test_reload_settings_replaces_cache(mock_settings):
+    """reload_settings перечитывает настройки и обновляет кэш."""
+    new_settings = Settings(
+        TELEGRAM_TOKEN="новый_токен",
+        GIGACHAT_TOKEN="правильный_токен",
+        API_ENDPOINT="https://test.com"
+    )
+    with patch.object(config, "_settings", mock_settings), \
+            patch.object(config, "_load_settings", return_value=new_settings):
+        assert config.reload_settings() is new_settings
+        assert config.get_settings() is new_settings
+
+
+def test_reload_settings_keeps_cache_on_error(mock_settings):
+    """При ошибке чтения новых настроек остаются прежние."""
+    with patch.object(config, "_settings", mock_settings), \
+            patch.object(config, "_load_settings", side_effect=ValueError("ошибка")):
+        with pytest.raises(ValueError):
+            config.reload_settings()
+        assert config.get_settings() is mock_settings
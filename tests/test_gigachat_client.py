@@ -0,0 +1,156 @@
+"""Тесты общего клиента GigaChat."""
+import asyncio
+import time
+from unittest.mock import AsyncMock, Mock
+
+import httpx
+import pytest
+from gigachat.exceptions import ResponseError
+
+from src.services.gigachat_client import GigaChatClient
+
+
+def make_giga(achat) -> Mock:
+    """Клиент библиотеки gigachat с токеном на час вперёд."""
+    giga = Mock()
+    giga.achat = achat
+    token = Mock(expires_at=int((time.time() + 3600) * 1000))
+
+    async def aget_token():
+        await asyncio.sleep(0.01)
+        return token
+
+    giga.aget_token = AsyncMock(side_effect=aget_token)
+    return giga
+
+
+def make_client(giga: Mock, **kwargs) -> GigaChatClient:
+    """Клиент без задержек между повторами."""
+    kwargs.setdefault("retry_base_delay", 0)
+    return GigaChatClient(credentials="test", client=giga, **kwargs)
+
+
+def response_error(status: int) -> ResponseError:
+    """Ошибка ответа GigaChat с заданным кодом."""
+    return ResponseError("https://gigachat.test", status, b"", {})
+
+
+@pytest.mark.asyncio
+async def test_token_is_refreshed_once_for_concurrent_requests():
+    """Одновременные запросы ждут одного обновления токена."""
+    giga = make_giga(AsyncMock(return_value="ok"))
+    client = make_client(giga)
+
+    await asyncio.gather(*(client.achat({"messages": []}) for _ in range(10)))
+
+    assert giga.aget_token.await_count == 1
+    assert giga.achat.await_count == 10
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_limited():
+    """Одновременно выполняется не больше max_concurrency запросов."""
+    running = 0
+    peak = 0
+
+    async def achat(payload):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return "ok"
+
+    client = make_client(make_giga(achat), max_concurrency=3)
+    await asyncio.gather(*(client.achat({}) for _ in range(10)))
+
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_retries_on_rate_limit_and_server_errors():
+    """Ответы 429 и 5xx повторяются."""
+    achat = AsyncMock(side_effect=[
+        response_error(429), httpx.ConnectError("down"), response_error(503), "ok",
+    ])
+    client = make_client(make_giga(achat), max_retries=3)
+
+    assert await client.achat({}) == "ok"
+    assert achat.await_count == 4
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried():
+    """Ошибки 4xx, кроме 429, сразу передаются вызывающему."""
+    achat = AsyncMock(side_effect=response_error(400))
+    client = make_client(make_giga(achat))
+
+    with pytest.raises(ResponseError):
+        await client.achat({})
+    assert achat.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_retries_are_bounded():
+    """После max_retries повторов ошибка передаётся вызывающему."""
+    achat = AsyncMock(side_effect=response_error(500))
+    client = make_client(make_giga(achat), max_retries=2)
+
+    with pytest.raises(ResponseError):
+        await client.achat({})
+    assert achat.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_stream_is_not_retried_after_first_chunk():
+    """Начатый потоковый ответ не повторяется."""
+    calls = 0
+
+    async def astream(payload):
+        nonlocal calls
+        calls += 1
+        yield "первый"
+        raise response_error(502)
+
+    giga = make_giga(AsyncMock())
+    giga.astream = astream
+    client = make_client(giga)
+
+    chunks = []
+    with pytest.raises(ResponseError):
+        async for chunk in client.astream({}):
+            chunks.append(chunk)
+    assert chunks == ["первый"]
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_frees_slot_before_consumer_finishes():
+    """Медленный потребитель потока не занимает место в семафоре."""
+    async def astream(payload):
+        for chunk in ["раз", "два", "три"]:
+            yield chunk
+
+    giga = make_giga(AsyncMock(return_value="ok"))
+    giga.astream = astream
+    client = make_client(giga, max_concurrency=1)
+
+    stream = client.astream({})
+    assert await stream.__anext__() == "раз"
+    # Поток ещё не дочитан, но другой запрос уже выполняется
+    assert await asyncio.wait_for(client.achat({}), timeout=1) == "ok"
+    assert [chunk async for chunk in stream] == ["два", "три"]
+
+
+@pytest.mark.asyncio
+async def test_token_reset_without_private_method():
+    """Без _reset_token() в библиотеке сбрасывается сохранённый ею токен."""
+    giga = make_giga(AsyncMock(return_value="ok"))
+    del giga._reset_token
+    giga._access_token = "старый"
+    client = make_client(giga)
+
+    await client.achat({})
+
+    assert giga._access_token is None
+    giga.aget_token.assert_awaited_once()
@@ -0,0 +1,27 @@
+"""Проверка времени запуска бота."""
+import os
+
+import pytest
+
+from benchmarks.import_time import measure_import_time
+
+# Бюджет на импорт src.main; без ленивой загрузки он занимал около секунды.
+# Время зависит от машины, поэтому проверка включается только явно
+IMPORT_BUDGET_SECONDS = os.getenv("IMPORT_BUDGET_SECONDS")
+
+
+def test_startup_does_not_load_heavy_dependencies():
+    """Запуск обходится без langchain и gigachat."""
+    report = measure_import_time(runs=1)
+
+    assert report.heavy_loaded == []
+
+
+@pytest.mark.skipif(
+    not IMPORT_BUDGET_SECONDS, reason="бюджет задаётся IMPORT_BUDGET_SECONDS"
+)
+def test_startup_fits_import_budget():
+    """Импорт укладывается в бюджет IMPORT_BUDGET_SECONDS."""
+    report = measure_import_time(runs=3)
+
+    assert report.best < float(IMPORT_BUDGET_SECONDS or 0), report.format()
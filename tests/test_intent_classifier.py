@@ -0,0 +1,44 @@
+"""Тесты локального классификатора намерений."""
+import pytest
+
+from src.constants.intents import Intent
+from src.services.intent_classifier import IntentClassifier
+
+# Порог уверенности по умолчанию (INTENT_MIN_CONFIDENCE)
+MIN_CONFIDENCE = 0.25
+
+
+@pytest.fixture(scope="module")
+def classifier() -> IntentClassifier:
+    """Классификатор на встроенных примерах."""
+    return IntentClassifier()
+
+
+@pytest.mark.parametrize("text, intent", [
+    ("Привет!", Intent.GREETING),
+    ("оформляйте", Intent.BUY),
+    ("нет", Intent.DECLINE),
+    ("без разницы какой цвет", Intent.DECLINE),
+    ("айфн 15 про", Intent.MODEL),
+    ("Samsung Galaxy S24 Ultra", Intent.MODEL),
+    ("а сколько стоит?", Intent.QUESTION),
+])
+def test_confident_intents(classifier, text, intent):
+    """Типовые сообщения распознаются уверенно, в том числе вне примеров."""
+    found, confidence = classifier.classify(text)
+
+    assert found == intent
+    assert confidence >= MIN_CONFIDENCE
+
+
+@pytest.mark.parametrize("text", [
+    "айфон 15 или 14, что лучше?",
+    "айфон 15 есть в наличии?",
+    "айфон 15 есть в наличии",
+    "хочу айфон 15 но дешевле",
+])
+def test_question_about_model_is_not_routed_as_model(classifier, text):
+    """Вопрос с названием модели не принимается за простое упоминание модели."""
+    intent, confidence = classifier.classify(text)
+
+    assert intent != Intent.MODEL or confidence < MIN_CONFIDENCE
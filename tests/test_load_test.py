@@ -0,0 +1,58 @@
+"""Проверка работоспособности нагрузочного теста."""
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from benchmarks.load_test import FakeOrderApi, LoadTestConfig, run_load_test
+from src.services.chat_service import ChatService
+
+
+@pytest.mark.asyncio
+async def test_load_test_completes_all_orders():
+    """Все пользователи проходят сценарий и их заказы доставляются."""
+    report = await run_load_test(LoadTestConfig(
+        users=20,
+        telegram_latency=0,
+        llm_latency=0,
+        api_latency=0,
+        trace_memory=True,
+    ))
+
+    assert report.errors == 0
+    assert report.messages == 20 * 5
+    assert report.orders_delivered == 20
+    assert report.orders_pending == 0
+    # Вопрос о модели доходит до GigaChat
+    assert report.llm_calls > 0
+    assert report.percentile(50) <= report.percentile(99)
+    assert report.memory_per_user is not None
+    assert "p95=" in report.format()
+
+
+@pytest.mark.asyncio
+async def test_load_test_counts_handler_errors():
+    """Ошибки, перехваченные обработчиком, попадают в отчёт."""
+    with patch.object(
+        ChatService, "generate_response", side_effect=RuntimeError("сбой")
+    ):
+        report = await run_load_test(LoadTestConfig(
+            users=3, telegram_latency=0, llm_latency=0, api_latency=0
+        ))
+
+    assert report.errors == 3
+
+
+@pytest.mark.asyncio
+async def test_load_test_reports_undelivered_orders():
+    """Недоступный API не вешает тест: оставшиеся заказы попадают в отчёт."""
+    unavailable = httpx.Response(503, json={"status": "unavailable"})
+    with patch.object(FakeOrderApi, "_handle", return_value=unavailable):
+        report = await run_load_test(LoadTestConfig(
+            users=2, telegram_latency=0, llm_latency=0, api_latency=0,
+            drain_timeout=0.3,
+        ))
+
+    assert report.orders_delivered == 0
+    assert report.orders_pending == 2
+    assert "Не доставлено заказов: 2" in report.format()
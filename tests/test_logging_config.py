@@ -0,0 +1,78 @@
+"""Тесты настройки журналирования."""
+import json
+import logging
+from dataclasses import replace
+
+import pytest
+
+from src.core.logging_config import (
+    SamplingFilter,
+    mask_name,
+    mask_phone,
+    setup_logging,
+    shutdown_logging,
+)
+
+
+@pytest.fixture
+def restore_root_logger():
+    """Восстановление корневого логгера после теста."""
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield
+    shutdown_logging()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+def test_text_log_is_written_in_utf8(mock_settings, tmp_path, restore_root_logger):
+    """Кириллица и поля extra записываются в файл в UTF-8."""
+    log_file = tmp_path / "bot.log"
+    setup_logging(replace(mock_settings, LOG_FILE=str(log_file)))
+
+    logging.getLogger("test").info("Новый заказ", extra={"client_name": "Иван"})
+    shutdown_logging()
+
+    text = log_file.read_text(encoding="utf-8")
+    assert "test - INFO - Новый заказ client_name=Иван" in text
+
+
+def test_json_log(mock_settings, tmp_path, restore_root_logger):
+    """В формате json каждая запись - отдельный объект."""
+    log_file = tmp_path / "bot.log"
+    setup_logging(replace(mock_settings, LOG_FILE=str(log_file), LOG_FORMAT="json"))
+
+    logging.getLogger("test").warning("Ошибка %s", "запроса", extra={"status": 503})
+    shutdown_logging()
+
+    record = json.loads(log_file.read_text(encoding="utf-8").splitlines()[-1])
+    assert record["message"] == "Ошибка запроса"
+    assert record["level"] == "WARNING"
+    assert record["status"] == 503
+
+
+def test_sampling_keeps_warnings():
+    """Выборка отбрасывает частые сообщения, но не предупреждения."""
+    sampling = SamplingFilter(percent=0)
+
+    def make(level: int) -> logging.LogRecord:
+        return logging.LogRecord("test", level, "", 0, "msg", None, None)
+
+    assert not sampling.filter(make(logging.INFO))
+    assert sampling.filter(make(logging.WARNING))
+    assert SamplingFilter(percent=100).filter(make(logging.DEBUG))
+
+
+def test_audit_records_bypass_sampling():
+    """Записи аудита (заказы) не отбрасываются выборкой."""
+    record = logging.LogRecord("test", logging.INFO, "", 0, "Новый заказ", None, None)
+    record.audit = True
+
+    assert SamplingFilter(percent=0).filter(record)
+
+
+def test_personal_data_is_masked():
+    """Имя и телефон клиента не попадают в журнал целиком."""
+    assert mask_phone("+7 (916) 123-45-67") == "*********67"
+    assert mask_name("Иван") == "И***"
+    assert mask_phone(None) == mask_name(None) == ""
@@ -0,0 +1,297 @@
+"""Тесты сценария оформления заказа в обработчике сообщений."""
+import logging
+from dataclasses import replace
+from typing import Optional
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from telegram import Message, Update, User
+from telegram.constants import MessageLimit
+from telegram.error import BadRequest
+
+from src.bot.message_handler import MessageHandler
+from src.bot.update_processor import PerUserUpdateProcessor
+from src.core import config
+from src.core.metrics import (
+    ACTIVE_DIALOG_STATES,
+    STEP_TRANSITIONS,
+    UPDATE_SECONDS,
+    VALIDATION_FAILURES,
+)
+from src.models.dialog_state import DialogStep
+
+
+def make_update(text: str, user_id: int = 1) -> Mock:
+    """Сообщение пользователя."""
+    update = Mock(spec=Update)
+    update.effective_user = User(id=user_id, first_name="Тест", is_bot=False)
+    update.message = Mock(spec=Message)
+    update.message.text = text
+    update.message.reply_text = AsyncMock()
+    return update
+
+
+@pytest.fixture
+def handler(mock_chat_service) -> MessageHandler:
+    """Обработчик с замоканной отправкой заказов."""
+    handler = MessageHandler(mock_chat_service)
+    handler._order_service.create_order = AsyncMock()
+    return handler
+
+
+# Вопрос о модели: на него отвечает GigaChat, а не шаблон
+QUESTION = "Хочу айфон 15, какая у него камера?"
+
+
+async def send(handler: MessageHandler, text: str) -> Optional[str]:
+    """Отправка сообщения и получение текста ответа бота (None - ответа нет)."""
+    update = make_update(text)
+    await handler.handle_message(update, Mock())
+    call = update.message.reply_text.call_args
+    return call[0][0] if call else None
+
+
+@pytest.mark.asyncio
+async def test_llm_is_called_only_when_reply_is_shown(handler, mock_chat_service):
+    """На этапах имени и телефона GigaChat не вызывается."""
+    reply = await send(handler, QUESTION)
+    assert reply.startswith("Mocked response")
+    assert mock_chat_service.generate_response.call_count == 1
+
+    assert "Как могу к вам обращаться" in await send(handler, "256 гб, черный")
+    assert "Спасибо, Иван" in await send(handler, "Иван")
+    assert "Отличный выбор, Иван" in await send(handler, "89161234567")
+
+    assert mock_chat_service.generate_response.call_count == 1
+    handler._order_service.create_order.assert_awaited_once()
+    assert handler._state_service.get_state(1).current_step == DialogStep.START
+
+
+@pytest.mark.asyncio
+async def test_validation_errors_are_reported_immediately(handler, mock_chat_service):
+    """Ошибки ввода имени и телефона сообщаются в ответ на то же сообщение."""
+    await send(handler, QUESTION)
+    await send(handler, "128 гб")
+
+    assert "настоящее имя" in await send(handler, "да")
+    assert "Спасибо, Мария" in await send(handler, "Мария")
+    assert "Номер должен начинаться" in await send(handler, "12345")
+    assert handler._state_service.get_state(1).current_step == DialogStep.GET_PHONE
+    assert mock_chat_service.generate_response.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_model_is_recognized_from_catalog(handler):
+    """Модель с опечатками сохраняется в заказе под именем из каталога."""
+    await send(handler, "айфн 15 про")
+
+    state = handler._state_service.get_state(1)
+    assert state.current_step == DialogStep.SPECS_SELECTION
+    assert state.order_data.phone_model == "iPhone 15 Pro"
+
+
+@pytest.mark.asyncio
+async def test_streaming_reply_is_edited_progressively(
+    mock_settings, mock_chat_service
+):
+    """Ответ отправляется с первым фрагментом и дописывается правками."""
+    async def stream(message, user_id, context=None):
+        for chunk in ["Отличный ", "выбор! ", "Какие характеристики?"]:
+            yield chunk
+
+    mock_chat_service.stream_response = stream
+    with patch.object(
+        config, "_settings", replace(mock_settings, STREAMING_ENABLED=True)
+    ):
+        handler = MessageHandler(mock_chat_service)
+    update = make_update(QUESTION)
+    sent = Mock(spec=Message)
+    sent.edit_text = AsyncMock()
+    update.message.reply_text.return_value = sent
+
+    await handler.handle_message(update, Mock())
+
+    update.message.reply_text.assert_awaited_once_with("Отличный")
+    sent.edit_text.assert_awaited_with("Отличный выбор! Какие характеристики?")
+
+
+@pytest.mark.asyncio
+async def test_streaming_survives_rejected_edits(mock_settings, mock_chat_service):
+    """Пробельные фрагменты не правят сообщение, отказ Telegram не рвёт поток."""
+    finished = []
+
+    async def stream(message, user_id, context=None):
+        for chunk in ["Да,", " ", "\n", "есть", "x" * 5000]:
+            yield chunk
+        finished.append(True)
+
+    mock_chat_service.stream_response = stream
+    with patch.object(
+        config,
+        "_settings",
+        replace(mock_settings, STREAMING_ENABLED=True, STREAM_EDIT_INTERVAL_MS=0),
+    ):
+        handler = MessageHandler(mock_chat_service)
+    update = make_update(QUESTION)
+    sent = Mock(spec=Message)
+    sent.edit_text = AsyncMock(side_effect=BadRequest("Message is not modified"))
+    update.message.reply_text.return_value = sent
+
+    await handler.handle_message(update, Mock())
+
+    assert finished
+    update.message.reply_text.assert_awaited_once_with("Да,")
+    edits = [call.args[0] for call in sent.edit_text.await_args_list]
+    assert edits[0] == "Да, \nесть"
+    assert len(edits[-1]) == MessageLimit.MAX_TEXT_LENGTH
+
+
+@pytest.mark.asyncio
+async def test_repeated_question_is_answered_from_cache(handler, mock_chat_service):
+    """Одинаковый первый вопрос разных пользователей не вызывает GigaChat повторно."""
+    first = make_update(QUESTION, user_id=1)
+    second = make_update(QUESTION.lower() + "!", user_id=2)
+    await handler.handle_message(first, Mock())
+    await handler.handle_message(second, Mock())
+
+    assert mock_chat_service.generate_response.call_count == 1
+    assert (
+        second.message.reply_text.call_args[0][0]
+        == first.message.reply_text.call_args[0][0]
+    )
+    mock_chat_service.remember_exchange.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_metrics_are_recorded(handler):
+    """Переходы этапов, ошибки ввода и время обработки попадают в метрики."""
+    transitions = STEP_TRANSITIONS.value(from_step="START", to_step="SPECS_SELECTION")
+    failures = VALIDATION_FAILURES.value(field="name")
+    updates = UPDATE_SECONDS.count()
+
+    await send(handler, "айфон 15")
+    await send(handler, "128 гб")
+    await send(handler, "да")
+
+    assert STEP_TRANSITIONS.value(
+        from_step="START", to_step="SPECS_SELECTION"
+    ) == transitions + 1
+    assert VALIDATION_FAILURES.value(field="name") == failures + 1
+    assert UPDATE_SECONDS.count() == updates + 3
+    assert ACTIVE_DIALOG_STATES.value() == 1
+
+
+@pytest.mark.asyncio
+async def test_flood_is_dropped_before_processing(handler, mock_chat_service):
+    """Сообщения сверх лимита отбрасываются до постановки в обработку."""
+    processor = PerUserUpdateProcessor(10, admit=handler.admit_update)
+    updates = [make_update(QUESTION) for _ in range(8)]
+    for update in updates:
+        await processor.process_update(update, handler.handle_message(update, Mock()))
+    replies = [update.message.reply_text.call_args for update in updates]
+
+    assert "Слишком много сообщений" in replies[5][0][0]
+    # Предупреждение отправляется один раз, дальше сообщения отбрасываются молча
+    assert replies[6] is None and replies[7] is None
+    assert mock_chat_service.generate_response.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_order_log_is_masked(handler, caplog):
+    """Запись о заказе не содержит имени и телефона клиента целиком."""
+    with caplog.at_level(logging.INFO, logger="src.bot.message_handler"):
+        await send(handler, "iPhone 15 256 гб черный, Иван, 89161234567")
+
+    (record,) = [r for r in caplog.records if r.getMessage() == "Новый заказ"]
+    assert record.client_name == "И***"
+    assert record.client_phone.endswith("67") and "9161234" not in record.client_phone
+    assert record.audit is True
+
+
+@pytest.mark.asyncio
+async def test_one_message_fills_several_steps(handler, mock_chat_service):
+    """Сообщение со всеми данными сразу оформляет заказ без GigaChat."""
+    reply = await send(handler, "iPhone 15 256 гб черный, Иван, 89161234567")
+
+    assert "Отличный выбор, Иван" in reply
+    assert mock_chat_service.generate_response.call_count == 0
+    order = handler._order_service.create_order.await_args.args[0]
+    assert order.phone_model == "iPhone 15"
+    assert order.specifications == "256 гб, черный"
+    assert order.client_phone == "+79161234567"
+
+
+@pytest.mark.asyncio
+async def test_name_and_phone_together(handler):
+    """Имя и телефон в одном сообщении заполняют оба этапа."""
+    await send(handler, "айфон 15")
+    await send(handler, "128 гб")
+
+    assert "Отличный выбор, Мария" in await send(handler, "Мария, 89161234567")
+
+
+@pytest.mark.asyncio
+async def test_specs_exclude_name_and_phone(handler):
+    """Характеристики без ключевых слов сохраняются без имени и телефона."""
+    await send(handler, "айфон 15")
+    await send(handler, "в синем чехле, Иван, 89161234567")
+
+    order = handler._order_service.create_order.await_args.args[0]
+    assert order.specifications == "в синем чехле"
+    assert order.client_name == "Иван"
+
+
+@pytest.mark.asyncio
+async def test_confident_intents_are_answered_from_templates(
+    handler, mock_chat_service
+):
+    """Приветствие, название модели и отказ от уточнения - без GigaChat."""
+    assert "Рад помочь" in await send(handler, "Привет!")
+    assert "Какие характеристики" in await send(handler, "айфон 15")
+    assert "Как могу к вам обращаться" in await send(handler, "не важно")
+
+    assert mock_chat_service.generate_response.call_count == 0
+    order = handler._state_service.get_state(1).order_data
+    assert order.specifications == "не указаны"
+    # Шаблонные ответы остаются в истории для следующих запросов к GigaChat
+    assert mock_chat_service.remember_exchange.call_count == 2
+
+
+@pytest.mark.parametrize(
+    "text", ["айфон 15 есть в наличии", "хочу айфон 15 но дешевле"]
+)
+@pytest.mark.asyncio
+async def test_question_without_mark_goes_to_llm(handler, mock_chat_service, text):
+    """Вопрос о модели без знака вопроса получает ответ GigaChat, а не шаблон."""
+    reply = await send(handler, text)
+
+    assert reply.startswith("Mocked response")
+    assert mock_chat_service.generate_response.call_count == 1
+
+
+def test_apply_settings_updates_running_handler(mock_settings, mock_chat_service):
+    """Перечитанные настройки применяются без пересоздания обработчика."""
+    handler = MessageHandler(mock_chat_service)
+    assert handler._rate_limiter is not None
+    settings = replace(
+        mock_settings, RATE_LIMIT_ENABLED=False, INTENT_ROUTING_ENABLED=False
+    )
+
+    handler.apply_settings(settings)
+
+    assert handler._rate_limiter is None
+    assert handler._intent_classifier is None
+    assert handler._order_service._settings is settings
+    mock_chat_service.apply_settings.assert_called_once_with(settings)
+
+
+@pytest.mark.asyncio
+async def test_catalog_is_searched_once_per_message(handler):
+    """Классификатор, извлечение данных и кэш ответов используют один поиск."""
+    with patch.object(
+        handler._catalog, "lookup", wraps=handler._catalog.lookup
+    ) as lookup:
+        await send(handler, QUESTION)
+        await send(handler, "iPhone 15 Pro")
+
+    assert lookup.call_count == 2
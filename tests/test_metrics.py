@@ -0,0 +1,60 @@
+"""Тесты метрик."""
+import httpx
+import pytest
+
+from src.bot.metrics_server import MetricsServer
+from src.utils.prometheus import MetricsRegistry
+
+
+def test_render_prometheus_text_format():
+    """Метрики отдаются в текстовом формате Prometheus."""
+    registry = MetricsRegistry()
+    errors = registry.counter("errors_total", "Ошибки", labelnames=("source",))
+    latency = registry.histogram("latency_seconds", "Задержка", buckets=(0.1, 1))
+    states = registry.gauge("states", "Состояния")
+
+    errors.inc(source="handler")
+    errors.inc(2, source="handler")
+    for value in (0.05, 0.5, 5):
+        latency.observe(value)
+    states.set_function(lambda: 7)
+
+    text = registry.render()
+    assert "# TYPE errors_total counter" in text
+    assert 'errors_total{source="handler"} 3' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "latency_seconds_count 3" in text
+    assert "states 7" in text
+
+
+def test_labels_must_match():
+    """Метки метрики проверяются."""
+    registry = MetricsRegistry()
+    errors = registry.counter("errors_total", "Ошибки", labelnames=("source",))
+
+    with pytest.raises(ValueError):
+        errors.inc(step="START")
+    with pytest.raises(ValueError):
+        registry.counter("errors_total", "Ошибки")
+
+
+@pytest.mark.asyncio
+async def test_metrics_server():
+    """Сервер отдаёт метрики по GET /metrics."""
+    registry = MetricsRegistry()
+    registry.counter("updates_total", "Обновления").inc()
+    server = MetricsServer(registry, "127.0.0.1", 0)
+    await server.start()
+    try:
+        base_url = f"http://127.0.0.1:{server.port}"
+        async with httpx.AsyncClient(base_url=base_url) as client:
+            response = await client.get("/metrics")
+            missing = await client.get("/other")
+    finally:
+        await server.close()
+
+    assert response.status_code == 200
+    assert "updates_total 1" in response.text
+    assert missing.status_code == 404
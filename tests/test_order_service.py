@@ -0,0 +1,122 @@
+"""Тесты для сервиса заказов."""
+from dataclasses import replace
+from unittest.mock import Mock, patch
+
+import httpx
+import pytest
+
+from src.core import config
+from src.models.dialog_state import OrderData
+from src.services.chat_service import ChatSession
+from src.services.order_outbox import OrderOutbox
+from src.services.order_service import OrderRequest, OrderService
+
+
+@pytest.fixture
+def order_data() -> OrderData:
+    """Заполненные данные заказа."""
+    return OrderData(
+        phone_model="iPhone 15",
+        specifications="256 гб, черный",
+        client_name="Иван",
+        client_phone="+79161234567",
+    )
+
+
+@pytest.fixture
+def outbox(tmp_path) -> OrderOutbox:
+    """Очередь заказов во временном каталоге."""
+    return OrderOutbox(str(tmp_path / "outbox.db"))
+
+
+def make_service(mock_chat_service, outbox, handler) -> OrderService:
+    """Создание сервиса с подменённым HTTP-транспортом."""
+    mock_chat_service.get_session = Mock(return_value=ChatSession())
+    service = OrderService(mock_chat_service, outbox=outbox)
+    service._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return service
+
+
+@pytest.mark.asyncio
+async def test_create_order_sends_params(mock_chat_service, outbox, order_data):
+    """Заказ из очереди отправляется GET-запросом с параметрами заказа."""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, text="ok")
+
+    service = make_service(mock_chat_service, outbox, handler)
+    await service.create_order(order_data)
+    assert requests == []
+
+    assert await service.drain() == 1
+    await service.close()
+
+    assert len(requests) == 1
+    params = requests[0].url.params
+    assert params["name"] == "Иван"
+    assert params["phone"] == "79161234567"
+    assert "iPhone 15" in params["desc"]
+
+
+@pytest.mark.asyncio
+async def test_failed_order_stays_in_outbox(mock_chat_service, outbox, order_data):
+    """При ошибке API заказ остаётся в очереди и откладывается."""
+    service = make_service(
+        mock_chat_service, outbox, lambda request: httpx.Response(503, text="fail")
+    )
+    await service.create_order(order_data)
+
+    assert await service.drain() == 0
+    assert outbox.pending_count() == 1
+    # Следующая попытка отложена, поэтому повторной отправки сразу нет
+    assert outbox.due(limit=10) == []
+    entry = outbox.due(limit=10, now=float("inf"))[0]
+    assert entry.attempts == 1
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_rejected_order_is_not_retried(mock_chat_service, outbox, order_data):
+    """Заказ, отклонённый API с кодом 4xx, больше не отправляется."""
+    service = make_service(
+        mock_chat_service, outbox, lambda request: httpx.Response(400, text="bad")
+    )
+    await service.create_order(order_data)
+
+    assert await service.drain() == 0
+    assert outbox.pending_count() == 0
+    await service.close()
+
+
+@pytest.mark.parametrize("status, pending", [(422, 0), (408, 1), (429, 1)])
+@pytest.mark.asyncio
+async def test_rejected_batch_is_not_retried(
+    mock_settings, mock_chat_service, outbox, order_data, status, pending
+):
+    """Пакет, отклонённый с кодом 4xx, не повторяется; 408 и 429 - повторяются."""
+    settings = replace(mock_settings, ORDER_BATCH_ENDPOINT="https://api.test/batch")
+    with patch.object(config, "_settings", settings):
+        service = make_service(
+            mock_chat_service, outbox, lambda request: httpx.Response(status)
+        )
+    await service.create_order(order_data)
+
+    assert await service.drain() == 0
+    assert outbox.pending_count() == pending
+    await service.close()
+
+
+def test_outbox_survives_reopen(tmp_path):
+    """Неотправленные заказы сохраняются между перезапусками."""
+    path = str(tmp_path / "outbox.db")
+    first = OrderOutbox(path)
+    first.add(OrderRequest("Иван", "79161234567", "iPhone 15", "1", "1"))
+    first.close()
+
+    second = OrderOutbox(path)
+    entries = second.due(limit=10)
+    second.close()
+
+    assert [entry.payload["name"] for entry in entries] == ["Иван"]
@@ -0,0 +1,58 @@
+"""Тесты для поиска ключевых слов о телефонах."""
+import pytest
+
+from src.constants.phone_data import (
+    PHONE_BRANDS,
+    PHONE_SPECS,
+    get_brand_by_keyword,
+    is_spec_related,
+    match_keywords,
+)
+from src.utils.keyword_matcher import KeywordMatcher
+
+
+def naive_brand(text: str):
+    """Исходный алгоритм определения бренда перебором."""
+    text_lower = text.lower()
+    for brand, keywords in PHONE_BRANDS.items():
+        if any(keyword in text_lower for keyword in keywords):
+            return brand
+    return None
+
+
+def naive_is_spec(text: str) -> bool:
+    """Исходный алгоритм проверки характеристик перебором."""
+    text_lower = text.lower()
+    return any(spec in text_lower for specs in PHONE_SPECS.values() for spec in specs)
+
+
+@pytest.mark.parametrize("text", [
+    "Хочу айфон 15 про",
+    "Samsung Galaxy S24 Ultra",
+    "ксяоми редми или хонор?",
+    "iPhone или galaxy",
+    "256 ГБ, черный",
+    "какой объем памяти?",
+    "Иван",
+    "",
+])
+def test_matcher_agrees_with_naive_search(text):
+    """Результаты совпадают с исходным поиском перебором."""
+    assert get_brand_by_keyword(text) == naive_brand(text)
+    assert is_spec_related(text) == naive_is_spec(text)
+
+
+def test_models_are_matched_as_whole_words():
+    """Модели ищутся как отдельные слова, бренд и характеристики - за один проход."""
+    result = match_keywords("Samsung Galaxy S ultra 512 гб")
+
+    assert result.brand == "samsung"
+    assert result.models == ["s", "ultra"]
+    assert result.specs == ["memory"]
+
+
+def test_keyword_matcher_finds_overlapping_keywords():
+    """Автомат находит пересекающиеся и вложенные ключевые слова."""
+    matcher = KeywordMatcher(["he", "she", "hers", "his"])
+
+    assert sorted(matcher.find_all("ushers")) == [(1, "she"), (2, "he"), (2, "hers")]
@@ -0,0 +1,41 @@
+"""Тесты ограничения частоты сообщений."""
+from src.utils.rate_limiter import RateLimiter
+
+
+class FakeClock:
+    """Управляемые часы."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_user_burst_and_refill():
+    """Пользователь может отправить всплеск, затем - со скоростью пополнения."""
+    clock = FakeClock()
+    limiter = RateLimiter(
+        user_rate=1, user_burst=3, global_rate=100, global_burst=100, clock=clock
+    )
+
+    assert [limiter.check(1) for _ in range(4)] == [None, None, None, "user"]
+    # Другого пользователя ограничение первого не касается
+    assert limiter.check(2) is None
+
+    clock.now += 1
+    assert limiter.check(1) is None
+    assert limiter.check(1) == "user"
+
+
+def test_global_limit():
+    """Общее ограничение действует на всех пользователей вместе."""
+    clock = FakeClock()
+    limiter = RateLimiter(
+        user_rate=10, user_burst=10, global_rate=1, global_burst=2, clock=clock
+    )
+
+    assert [limiter.check(user_id) for user_id in range(3)] == [None, None, "global"]
+    # Отклонённое общим ограничением сообщение не расходует токен пользователя
+    clock.now += 1
+    assert limiter.check(2) is None
@@ -0,0 +1,42 @@
+"""Тесты для кэша ответов GigaChat."""
+from unittest.mock import patch
+
+import pytest
+
+from src.models.dialog_state import DialogStep
+from src.services.response_cache import ResponseCache, make_cache_key
+
+
+def test_cache_key_is_normalized():
+    """Регистр, пунктуация и лишние пробелы не влияют на ключ."""
+    assert make_cache_key("Айфон  15!", DialogStep.START, "apple") == make_cache_key(
+        "айфон 15", DialogStep.START, "apple"
+    )
+    assert make_cache_key("айфон 15", DialogStep.START, "apple") != make_cache_key(
+        "айфон 15", DialogStep.SPECS_SELECTION, "apple"
+    )
+
+
+@pytest.mark.asyncio
+async def test_entries_expire():
+    """Ответы старше ttl не возвращаются."""
+    cache = ResponseCache(max_size=10, ttl=60)
+    with patch("src.services.response_cache.time.time", return_value=1000.0):
+        await cache.set("key", "ответ")
+    with patch("src.services.response_cache.time.time", return_value=1030.0):
+        assert await cache.get("key") == "ответ"
+    with patch("src.services.response_cache.time.time", return_value=1061.0):
+        assert await cache.get("key") is None
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_restart(tmp_path):
+    """Дисковый уровень доступен новому экземпляру кэша."""
+    path = str(tmp_path / "responses.db")
+    first = ResponseCache(max_size=10, ttl=60, path=path)
+    await first.set("key", "ответ")
+    first.close()
+
+    second = ResponseCache(max_size=10, ttl=60, path=path)
+    assert await second.get("key") == "ответ"
+    second.close()
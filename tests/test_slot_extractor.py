@@ -0,0 +1,58 @@
+"""Тесты извлечения данных заказа из сообщения."""
+import pytest
+
+from src.services.catalog import ProductCatalog
+from src.services.slot_extractor import SlotExtractor, Slots
+
+
+@pytest.fixture
+def extractor() -> SlotExtractor:
+    """Извлечение по встроенному каталогу."""
+    return SlotExtractor(ProductCatalog())
+
+
+def test_all_slots_in_one_message(extractor):
+    """Модель, характеристики, имя и телефон находятся за один проход."""
+    slots = extractor.extract("iPhone 15 256 гб черный, Иван, 89161234567")
+
+    assert slots == Slots(
+        phone_model="iPhone 15",
+        specifications="256 гб, черный",
+        client_name="Иван",
+        client_phone="+79161234567",
+    )
+
+
+@pytest.mark.parametrize("text", [
+    "Хочу айфон 15, Спасибо",
+    "Хорошо",
+    "Иван",
+])
+def test_name_requires_other_data_in_message(extractor, text):
+    """Имя без других данных или служебные слова именем не считаются."""
+    assert extractor.extract(text).client_name is None
+
+
+def test_phone_and_name_without_model(extractor):
+    """Имя и телефон находятся и без модели."""
+    slots = extractor.extract("Мария Иванова; +7 916 123-45-67")
+
+    assert slots.client_name == "Мария Иванова"
+    assert slots.client_phone == "+79161234567"
+    assert slots.phone_model is None
+
+
+@pytest.mark.parametrize("text", [
+    "iPhone 15, Сергей, 89161234567",
+    "iPhone 15 серия, Иван",
+])
+def test_colors_match_whole_words(extractor, text):
+    """Имя и слова, начинающиеся как цвет, цветом не считаются."""
+    assert extractor.extract(text).specifications is None
+
+
+def test_remainder_excludes_name_and_phone(extractor):
+    """Остаток сообщения не содержит найденных имени и телефона."""
+    slots = extractor.extract("в синем чехле, Иван, 89161234567")
+
+    assert slots.remainder == "в синем чехле"
@@ -0,0 +1,128 @@
+"""Тесты для сервиса состояний диалогов."""
+import json
+import sys
+
+import pytest
+
+from benchmarks.state_codec import run_benchmark
+from src.models.dialog_state import DialogState, DialogStep, OrderData
+from src.services.state_service import StateService
+from src.services.state_store import SqliteStateStore
+from src.utils.sqlite_kv import SqliteKVStore
+
+
+def test_state_survives_restart(tmp_path):
+    """Состояние восстанавливается из хранилища после перезапуска."""
+    path = str(tmp_path / "states.db")
+    service = StateService(store=SqliteStateStore(path))
+    state = service.get_state(1)
+    state.current_step = DialogStep.GET_NAME
+    state.order_data.phone_model = "iPhone 15"
+    service.save_state(1, state)
+    service._store.close()
+
+    restarted = StateService(store=SqliteStateStore(path))
+    restored = restarted.get_state(1)
+
+    assert restored.current_step == DialogStep.GET_NAME
+    assert restored.order_data.phone_model == "iPhone 15"
+
+
+def test_memory_tier_is_bounded(tmp_path):
+    """В памяти держится не больше max_users состояний."""
+    service = StateService(
+        store=SqliteStateStore(str(tmp_path / "states.db")), max_users=2
+    )
+    for user_id in range(5):
+        state = service.get_state(user_id)
+        state.current_step = DialogStep.SPECS_SELECTION
+        service.save_state(user_id, state)
+
+    assert service.active_states() == 2
+    # Вытесненное состояние подгружается из хранилища
+    assert service.get_state(0).current_step == DialogStep.SPECS_SELECTION
+
+
+def test_reset_state_without_store():
+    """Без хранилища сервис работает только в памяти."""
+    service = StateService()
+    state = service.get_state(1)
+    state.current_step = DialogStep.GET_PHONE
+    service.reset_state(1)
+
+    assert service.get_state(1).current_step == DialogStep.START
+
+
+def test_binary_codec_round_trip():
+    """Состояние восстанавливается из двоичного представления без потерь."""
+    state = DialogState(
+        current_step=DialogStep.GET_PHONE,
+        order_data=OrderData(phone_model="iPhone 15", specifications="256 гб, чёрный"),
+        last_error="Номер телефона слишком короткий",
+    )
+
+    assert DialogState.from_bytes(state.to_bytes()) == state
+    assert DialogState.from_bytes(DialogState().to_bytes()) == DialogState()
+
+
+def test_binary_codec_rejects_unknown_version():
+    """Данные неизвестной версии формата не разбираются молча."""
+    data = bytearray(DialogState().to_bytes())
+    data[0] = 99
+
+    with pytest.raises(ValueError):
+        DialogState.from_bytes(bytes(data))
+
+
+def test_json_states_are_still_readable(tmp_path):
+    """Состояния, сохранённые в JSON до двоичного формата, загружаются."""
+    store = SqliteStateStore(str(tmp_path / "states.db"))
+    state = DialogState(current_step=DialogStep.GET_NAME)
+    store._kv.put(1, json.dumps(state.to_dict()))
+
+    assert store.load(1) == state
+
+
+@pytest.mark.skipif(sys.version_info < (3, 10), reason="slots=True с Python 3.10")
+def test_state_is_compact():
+    """У состояний нет __dict__, двоичная запись короче JSON."""
+    report = run_benchmark(states=1000)
+
+    assert not hasattr(DialogState(), "__dict__")
+    assert not hasattr(OrderData(), "__dict__")
+    assert report.binary_size < report.json_size / 3
+
+
+def test_kv_reads_do_not_wait_for_flush(tmp_path):
+    """Во время записи get() отвечает, в том числе записываемыми значениями."""
+    kv = SqliteKVStore(str(tmp_path / "kv.db"), table="values_")
+    kv.put(1, "saved")
+    kv.flush()
+    kv.put(2, "writing")
+    seen = {}
+    write = kv._write
+
+    def observe_write(pending):
+        seen.update({key: kv.get(key) for key in (1, 2)})
+        write(pending)
+
+    kv._write = observe_write
+    kv.flush()
+
+    assert seen == {1: "saved", 2: "writing"}
+    assert kv.get(2) == "writing"
+
+
+@pytest.mark.asyncio
+async def test_load_state_reads_store(tmp_path):
+    """load_state() загружает вытесненное состояние из хранилища."""
+    path = str(tmp_path / "states.db")
+    store = SqliteStateStore(path)
+    store.save(1, DialogState(current_step=DialogStep.GET_NAME))
+    store.close()
+
+    service = StateService(store=SqliteStateStore(path))
+    state = await service.load_state(1)
+
+    assert state.current_step == DialogStep.GET_NAME
+    assert service.get_state(1) is state
@@ -0,0 +1,54 @@
+"""Тесты для LRU-кэша с ограничением времени жизни."""
+
+from src.utils.ttl_cache import TTLCache
+
+
+class FakeClock:
+    """Управляемый источник времени."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_expired_entries_are_evicted():
+    """Записи без обращений дольше ttl удаляются."""
+    clock = FakeClock()
+    evicted = []
+    cache = TTLCache(max_size=10, ttl=60, on_evict=lambda k, v: evicted.append(k),
+                     clock=clock)
+    cache.set("a", 1)
+    clock.now = 30
+    cache.set("b", 2)
+    clock.now = 61
+
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert evicted == ["a"]
+
+
+def test_access_extends_lifetime():
+    """Обращение к записи продлевает её жизнь."""
+    clock = FakeClock()
+    cache = TTLCache(max_size=10, ttl=60, clock=clock)
+    cache.set("a", 1)
+    clock.now = 50
+    assert cache.get("a") == 1
+    clock.now = 100
+
+    assert cache.get("a") == 1
+
+
+def test_lru_eviction_by_size():
+    """При переполнении вытесняется давно неиспользуемая запись."""
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
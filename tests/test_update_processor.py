@@ -0,0 +1,78 @@
+"""Тесты для параллельной обработки обновлений."""
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+from telegram import Update, User
+
+from src.bot.update_processor import PerUserUpdateProcessor
+
+
+def make_update(user_id: int) -> Mock:
+    """Обновление от указанного пользователя."""
+    update = Mock(spec=Update)
+    update.effective_user = User(id=user_id, first_name="Тест", is_bot=False)
+    return update
+
+
+@pytest.mark.asyncio
+async def test_same_user_updates_are_sequential():
+    """Обновления одного пользователя обрабатываются строго по порядку."""
+    processor = PerUserUpdateProcessor(max_concurrent_updates=10)
+    events = []
+
+    async def handle(index: int, delay: float) -> None:
+        events.append(("start", index))
+        await asyncio.sleep(delay)
+        events.append(("end", index))
+
+    await asyncio.gather(
+        processor.process_update(make_update(1), handle(0, 0.03)),
+        processor.process_update(make_update(1), handle(1, 0.0)),
+    )
+
+    assert events == [("start", 0), ("end", 0), ("start", 1), ("end", 1)]
+    assert processor.pending_users() == 0
+
+
+@pytest.mark.asyncio
+async def test_different_users_run_concurrently():
+    """Обновления разных пользователей не ждут друг друга."""
+    processor = PerUserUpdateProcessor(max_concurrent_updates=10)
+    running = 0
+    peak = 0
+
+    async def handle() -> None:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    await asyncio.gather(*(
+        processor.process_update(make_update(user_id), handle())
+        for user_id in range(5)
+    ))
+
+    assert peak == 5
+
+
+@pytest.mark.asyncio
+async def test_flooding_user_does_not_block_others():
+    """Очередь сообщений одного пользователя не занимает места остальных."""
+    processor = PerUserUpdateProcessor(max_concurrent_updates=2)
+
+    async def handle(delay: float) -> None:
+        await asyncio.sleep(delay)
+
+    flood = [
+        asyncio.ensure_future(processor.process_update(make_update(1), handle(0.05)))
+        for _ in range(10)
+    ]
+    await asyncio.sleep(0)
+
+    await asyncio.wait_for(processor.process_update(make_update(2), handle(0)), 0.1)
+
+    assert not all(task.done() for task in flood)
+    await asyncio.gather(*flood)
+    assert processor.pending_users() == 0
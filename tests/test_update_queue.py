@@ -0,0 +1,106 @@
+"""Тесты общей очереди обновлений и распределения по обработчикам."""
+import asyncio
+from dataclasses import replace
+from unittest.mock import Mock, patch
+
+import pytest
+from telegram import Update
+
+from src.bot.telegram_bot import TelegramBot
+from src.core import config
+from src.services.update_queue import SqliteUpdateQueue
+
+
+def make_update_data(update_id: int, user_id: int, text: str) -> dict:
+    """Данные обновления с сообщением пользователя."""
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "Тест"},
+            "text": text,
+        },
+    }
+
+
+def test_partitions_are_isolated_and_ordered(tmp_path):
+    """Обработчик получает только свой раздел, в порядке поступления."""
+    path = str(tmp_path / "updates.db")
+    dispatcher = SqliteUpdateQueue(path)
+    worker = SqliteUpdateQueue(path)
+    for i in range(5):
+        dispatcher.put(i % 2, {"n": i})
+
+    assert [data for _, data in worker.take(0, limit=2)] == [{"n": 0}, {"n": 2}]
+    assert [data for _, data in worker.take(0, limit=10)] == [{"n": 4}]
+    assert worker.take(0, limit=10) == []
+    assert [data for _, data in worker.take(1, limit=10)] == [{"n": 1}, {"n": 3}]
+
+
+def test_unacked_updates_are_redelivered(tmp_path):
+    """Неподтверждённые обновления выдаются снова после истечения срока."""
+    path = str(tmp_path / "updates.db")
+    SqliteUpdateQueue(path).put(0, {"n": 0})
+    SqliteUpdateQueue(path).put(0, {"n": 1})
+    crashed = SqliteUpdateQueue(path, lease=0)
+    assert len(crashed.take(0, limit=10)) == 2
+
+    restarted = SqliteUpdateQueue(path)
+    items = restarted.take(0, limit=10)
+    assert [data for _, data in items] == [{"n": 0}, {"n": 1}]
+    assert restarted.take(0, limit=10) == []
+
+    restarted.ack([item_id for item_id, _ in items])
+    assert restarted.pending_count() == 0
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_routes_updates_by_user(mock_settings, tmp_path):
+    """Диспетчер кладёт обновление в раздел пользователя."""
+    settings = replace(
+        mock_settings,
+        BOT_ROLE="dispatcher",
+        WORKER_COUNT=3,
+        UPDATE_QUEUE_PATH=str(tmp_path / "updates.db"),
+    )
+    with patch.object(config, "_settings", settings):
+        bot = TelegramBot()
+    for update_id, user_id in enumerate([10, 11, 13]):
+        update = Update.de_json(make_update_data(update_id, user_id, "айфон"), None)
+        await bot._forward_update(update, None)
+
+    queue = SqliteUpdateQueue(settings.UPDATE_QUEUE_PATH)
+    items = queue.take(1, limit=10)
+    partition = [data["message"]["from"]["id"] for _, data in items]
+    assert partition == [10, 13]
+    assert queue.pending_count(2) == 1
+
+
+@pytest.mark.asyncio
+async def test_worker_acks_updates_after_processing(mock_settings, tmp_path):
+    """Обработчик удаляет обновление из очереди только после его обработки."""
+    settings = replace(
+        mock_settings,
+        BOT_ROLE="worker",
+        WORKER_COUNT=1,
+        UPDATE_QUEUE_PATH=str(tmp_path / "updates.db"),
+    )
+    queue = SqliteUpdateQueue(settings.UPDATE_QUEUE_PATH)
+    queue.put(0, make_update_data(1, 10, "айфон"))
+    with patch.object(config, "_settings", settings):
+        bot = TelegramBot(chat_service=Mock())
+    stop = asyncio.Event()
+    pending_during_processing = []
+
+    async def process_update(update: Update) -> None:
+        pending_during_processing.append(queue.pending_count())
+        stop.set()
+
+    application = type(bot._application)
+    with patch.object(application, "process_update", side_effect=process_update):
+        await bot._pump_updates(stop)
+
+    assert pending_during_processing == [1]
+    assert queue.pending_count() == 0
@@ -0,0 +1,103 @@
+"""Тесты для приёма обновлений через вебхук."""
+import asyncio
+
+import httpx
+import pytest
+from telegram import Bot, Update
+
+from src.bot.webhook import MAX_BODY_SIZE, WebhookApp
+
+
+def make_update(update_id: int, user_id: int, text: str) -> dict:
+    """Обновление в том виде, в котором его присылает Telegram."""
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 1700000000,
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "Тест"},
+            "text": text,
+        },
+    }
+
+
+@pytest.fixture
+def queue() -> asyncio.Queue:
+    """Очередь обновлений приложения."""
+    return asyncio.Queue()
+
+
+@pytest.fixture
+def telegram(queue) -> httpx.AsyncClient:
+    """Локальный «Telegram», отправляющий обновления в вебхук."""
+    app = WebhookApp(bot=Bot("1:test"), update_queue=queue, secret_token="secret")
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bot"
+    )
+
+
+@pytest.mark.asyncio
+async def test_updates_are_queued(telegram, queue):
+    """Обновления разбираются и попадают в очередь приложения."""
+    headers = {"X-Telegram-Bot-Api-Secret-Token": "secret"}
+    responses = await asyncio.gather(*(
+        telegram.post("/telegram", json=make_update(i, 100 + i, f"айфон {i}"),
+                      headers=headers)
+        for i in range(10)
+    ))
+
+    assert [response.status_code for response in responses] == [200] * 10
+    assert queue.qsize() == 10
+    update = queue.get_nowait()
+    assert isinstance(update, Update)
+    assert update.message.text.startswith("айфон")
+
+
+@pytest.mark.asyncio
+async def test_wrong_secret_is_rejected(telegram, queue):
+    """Запросы без секретного токена отклоняются."""
+    response = await telegram.post("/telegram", json=make_update(1, 1, "привет"))
+
+    assert response.status_code == 403
+    assert queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_bad_payload(telegram, queue):
+    """Некорректное тело запроса не ломает приём обновлений."""
+    response = await telegram.post(
+        "/telegram",
+        content=b"not json",
+        headers={"X-Telegram-Bot-Api-Secret-Token": "secret"},
+    )
+
+    assert response.status_code == 400
+    assert queue.empty()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("content", [b"[]", b"1", b'"x"'])
+async def test_non_object_payload(telegram, queue, content):
+    """JSON, который не является объектом, отклоняется с кодом 400."""
+    response = await telegram.post(
+        "/telegram",
+        content=content,
+        headers={"X-Telegram-Bot-Api-Secret-Token": "secret"},
+    )
+
+    assert response.status_code == 400
+    assert queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_oversized_payload(telegram, queue):
+    """Слишком большое тело запроса отклоняется с кодом 413."""
+    response = await telegram.post(
+        "/telegram",
+        content=b" " * (MAX_BODY_SIZE + 1),
+        headers={"X-Telegram-Bot-Api-Secret-Token": "secret"},
+    )
+
+    assert response.status_code == 413
+    assert queue.empty()